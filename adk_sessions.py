@@ -0,0 +1,183 @@
+"""ADK session lifecycle: delete after each request, TTL/size caps, memory accounting for /health."""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+
+from google.adk.sessions import InMemorySessionService
+
+logger = logging.getLogger("clearsign.sessions")
+
+
+class BoundedInMemorySessionService(InMemorySessionService):
+    """InMemorySessionService that cleans up per-user maps on delete.
+
+    Every ADK request uses a fresh random user_id, so the stock service
+    would otherwise keep one empty user dict per request forever.
+    """
+
+    def _delete_session_impl(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        users = self.sessions.get(app_name, {})
+        user_sessions = users.get(user_id)
+        if user_sessions is None:
+            return
+        user_sessions.pop(session_id, None)
+        if not user_sessions:
+            users.pop(user_id, None)
+            self.user_state.get(app_name, {}).pop(user_id, None)
+
+    def session_bytes(self, app_name: str, user_id: str, session_id: str) -> int:
+        """Approximate retained size of one session (state JSON + event payloads)."""
+        session = self.sessions.get(app_name, {}).get(user_id, {}).get(session_id)
+        if session is None:
+            return 0
+        return _estimate_session_bytes(session)
+
+
+def _estimate_session_bytes(session) -> int:
+    try:
+        size = len(json.dumps(session.state, ensure_ascii=False, default=str).encode("utf-8"))
+    except Exception:
+        size = 0
+    for event in getattr(session, "events", None) or []:
+        content = getattr(event, "content", None)
+        for part in (getattr(content, "parts", None) or []):
+            inline = getattr(part, "inline_data", None)
+            if inline is not None and inline.data:
+                size += len(inline.data)
+            if getattr(part, "text", None):
+                size += len(part.text.encode("utf-8"))
+        actions = getattr(event, "actions", None)
+        delta = getattr(actions, "state_delta", None) if actions else None
+        if delta:
+            size += len(json.dumps(delta, ensure_ascii=False, default=str).encode("utf-8"))
+    return size
+
+
+def create_session_service(backend: str, db_path: str):
+    """Build the configured ADK session backend ("memory" or "sqlite")."""
+    backend = (backend or "memory").strip().lower()
+    if backend == "sqlite":
+        from google.adk.sessions import DatabaseSessionService
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        return DatabaseSessionService(db_url=f"sqlite:///{db_path}")
+    if backend != "memory":
+        logger.warning(f"Unknown ADK_SESSION_BACKEND '{backend}' — using memory")
+    return BoundedInMemorySessionService()
+
+
+class SessionRegistry:
+    """Tracks sessions created for ADK runs and bounds how many may linger.
+
+    Sessions are deleted on :meth:`release` once the result has been read.
+    Anything that was never released (crashed or cancelled runs) is evicted
+    after ``ttl_seconds``. Above ``max_sessions``, the oldest released (retained)
+    sessions are evicted first; sessions whose runs are still in flight are never
+    deleted — :meth:`create` waits for one to be released instead.
+    """
+
+    def __init__(
+        self,
+        service,
+        app_name: str,
+        ttl_seconds: float,
+        max_sessions: int,
+        retain: bool = False,
+        db_path: str | None = None,
+    ):
+        self.service = service
+        self.app_name = app_name
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.retain = retain
+        self.db_path = db_path
+        self._live: OrderedDict[tuple[str, str], float] = OrderedDict()
+        self._active: set[tuple[str, str]] = set()  # created, run not released yet
+        self._retained: dict[tuple[str, str], int] = {}  # released but kept (retain) → size measured at release
+        self._retained_bytes = 0
+        self._slots = asyncio.Condition()
+        self.counters = {"created": 0, "released": 0, "evicted": 0, "waited": 0}
+
+    async def create(self, user_id: str, state: dict | None = None):
+        """New session for one run; waits while ``max_sessions`` runs are in flight."""
+        async with self._slots:
+            await self.evict(room=1)
+            if len(self._active) >= self.max_sessions:
+                self.counters["waited"] += 1
+                await self._slots.wait_for(lambda: len(self._active) < self.max_sessions)
+            session = await self.service.create_session(
+                app_name=self.app_name,
+                user_id=user_id,
+                state=state,
+            )
+            self._live[(user_id, session.id)] = time.monotonic()
+            self._active.add((user_id, session.id))
+        self.counters["created"] += 1
+        return session
+
+    async def release(self, user_id: str, session_id: str) -> None:
+        """Delete a finished session (kept until TTL when ``retain`` is set)."""
+        key = (user_id, session_id)
+        async with self._slots:
+            self._active.discard(key)
+            if not self.retain and self._live.pop(key, None) is not None:
+                await self._delete(user_id, session_id)
+                self.counters["released"] += 1
+            elif key in self._live and isinstance(self.service, BoundedInMemorySessionService):
+                # Measured once here: the run is over, so the session no longer grows
+                size = self.service.session_bytes(self.app_name, user_id, session_id)
+                self._retained[key] = size
+                self._retained_bytes += size
+            self._slots.notify()
+
+    async def evict(self, room: int = 0) -> int:
+        """Drop expired sessions, then the oldest released ones beyond ``max_sessions`` - ``room``."""
+        now = time.monotonic()
+        # Past the TTL even an unreleased session is a leak: no run lasts that long
+        stale = [key for key, created_at in self._live.items() if now - created_at > self.ttl_seconds]
+        excess = len(self._live) - len(stale) - (self.max_sessions - room)
+        if excess > 0:
+            stale += [key for key in self._live if key not in self._active and key not in stale][:excess]
+        for user_id, session_id in stale:
+            self._live.pop((user_id, session_id), None)
+            self._active.discard((user_id, session_id))
+            self._retained_bytes -= self._retained.pop((user_id, session_id), 0)
+            await self._delete(user_id, session_id)
+        evicted = len(stale)
+        if evicted:
+            self.counters["evicted"] += evicted
+            logger.info(f"Evicted {evicted} ADK session(s)")
+        return evicted
+
+    async def _delete(self, user_id: str, session_id: str) -> None:
+        try:
+            await self.service.delete_session(
+                app_name=self.app_name,
+                user_id=user_id,
+                session_id=session_id,
+            )
+        except Exception as e:
+            logger.warning(f"ADK session delete failed: {e}")
+
+    def stats(self) -> dict:
+        """Memory accounting for /health (O(1): sizes are taken on release, not per probe)."""
+        result = {
+            "backend": "sqlite" if self.db_path else "memory",
+            "live": len(self._live),
+            "active": len(self._active),
+            "ttlSeconds": self.ttl_seconds,
+            "maxSessions": self.max_sessions,
+            "retain": self.retain,
+            **self.counters,
+        }
+        if isinstance(self.service, BoundedInMemorySessionService):
+            result["retainedBytes"] = self._retained_bytes
+        elif self.db_path and os.path.exists(self.db_path):
+            result["dbBytes"] = os.path.getsize(self.db_path)
+        if self._live:
+            result["oldestAgeSeconds"] = round(time.monotonic() - next(iter(self._live.values())), 1)
+        return result
@@ -1,21 +1,25 @@
 """ClearSign ADK 3-Agent Pipeline — 임대차 계약서 위험 분석 (최적화)"""
 
 import json
-import os
+import logging
 
 from google.adk.agents import Agent, SequentialAgent
 from google.genai import types
 
+from model_router import adk_after_model, adk_before_model, get_router
+from reference_templates import get_registry
+
+logger = logging.getLogger("clearsign.agents")
+
 # ---------------------------------------------------------------------------
 # Constants
 # ---------------------------------------------------------------------------
-STANDARD_CONTRACT_PATH = os.path.join(os.path.dirname(__file__), "data", "standard_contract.json")
-
-MODEL_FLASH = "gemini-3-flash-preview"
+# Default model; per-document routing happens in adk_before_model (data/model_routes.json)
+MODEL_FLASH = get_router().default_model
 
-# Pre-load standard contract at module level (avoids tool call overhead)
-with open(STANDARD_CONTRACT_PATH, "r", encoding="utf-8") as _f:
-    STANDARD_CONTRACT_TEXT = json.dumps(json.load(_f), ensure_ascii=False, indent=2)
+# Pre-load reference contracts at module level (avoids tool call overhead).
+# The Docker build precomputes their prompt text (build_assets.py); see reference_templates.py.
+TEMPLATES = get_registry()
 
 # ---------------------------------------------------------------------------
 # Agent 1: DocumentParser (unchanged)
@@ -26,6 +30,7 @@ PARSER_INSTRUCTION = """당신은 임대차 계약서 파싱 전문가입니다.
 반드시 아래 JSON 형식으로 출력하세요:
 {
   "title": "계약서 제목",
+  "property_address": "임차 목적물 소재지 (부동산의 표시에 적힌 주소, 없으면 빈 문자열)",
   "deposit_amount": 보증금(숫자),
   "monthly_rent": 월세(숫자),
   "clauses": [
@@ -44,6 +49,16 @@ PARSER_INSTRUCTION = """당신은 임대차 계약서 파싱 전문가입니다.
 - 보증금/월세 금액이 명시되지 않으면 기본값 50000000/500000을 사용하세요.
 - JSON만 출력하세요. 다른 텍스트는 포함하지 마세요."""
 
+def skip_parse_if_preparsed(callback_context):
+    """before_agent_callback: long documents are parsed in page groups before the run
+    (main.run_chunked_parse) and seeded as parsed_document, so the parser is skipped."""
+    parsed = callback_context.state.get("parsed_document")
+    if not parsed:
+        return None
+    text = parsed if isinstance(parsed, str) else json.dumps(parsed, ensure_ascii=False)
+    return types.Content(role="model", parts=[types.Part.from_text(text=text)])
+
+
 parser_agent = Agent(
     name="document_parser",
     model=MODEL_FLASH,
@@ -53,20 +68,35 @@ parser_agent = Agent(
         response_mime_type="application/json",
     ),
     output_key="parsed_document",
+    before_agent_callback=skip_parse_if_preparsed,
+    before_model_callback=adk_before_model,
+    after_model_callback=adk_after_model,
 )
 
 # ---------------------------------------------------------------------------
 # Agent 2: RiskAnalyzer (tools removed → prompt inline + JSON mode)
 # ---------------------------------------------------------------------------
+def select_reference_template(callback_context):
+    """before_agent_callback: pick the reference contract from the parsed title and
+    clause headings (local keyword match, no model call) before the analyzer runs."""
+    if callback_context.state.get("reference_template"):
+        return None  # already chosen (text uploads / chunked parsing classify before the run)
+    template, detection = TEMPLATES.classify(callback_context.state.get("parsed_document"))
+    callback_context.state["reference_template"] = template.id
+    logger.info(f"Reference template: {template.id} (score {detection['score']})")
+    return None
+
+
 def analyzer_instruction(context):
-    """Agent 2 instruction — 표준 계약서와 위험 금액 산출 기준을 프롬프트에 직접 삽입."""
+    """Agent 2 instruction — 비교 기준 계약서와 위험 금액 산출 기준을 프롬프트에 직접 삽입."""
     parsed = context.state.get("parsed_document", "{}")
+    template = TEMPLATES.get(context.state.get("reference_template"))
     return f"""당신은 임대차 계약서 위험 분석 전문가입니다.
-아래 파싱된 계약서를 국토교통부 표준 계약서와 비교하여 위험 조항을 분석하세요.
+아래 파싱된 계약서를 비교 기준 계약서와 비교하여 위험 조항을 분석하세요.
 
-## 국토교통부 표준 주택임대차계약서 (비교 기준)
+## 비교 기준: {template.name}
 
-{STANDARD_CONTRACT_TEXT}
+{template.prompt_text}
 
 ## 파싱된 계약서
 
@@ -93,8 +123,7 @@ def analyzer_instruction(context):
       "deviationScore": 0-100 (표준 대비 이탈 정도),
       "riskAmount": 위험금액(숫자),
       "direction": "이탈 방향 요약 (1줄)",
-      "original": "이 계약서의 해당 조항 원문",
-      "standard": "표준 계약서의 해당 조항 원문"
+      "standardRef": "비교한 표준 계약서 조항 번호 (예: 제4조)"
     }}
   ],
   "safe_clauses": [
@@ -116,6 +145,7 @@ def analyzer_instruction(context):
 - deviationScore 61-100: danger (심각한 이탈)
 - 임차인에게 불리한 방향의 변경만 위험으로 판정
 - deviationScore 41 이상인 조항만 deviated_clauses에 포함
+- 조항 원문과 표준 조항 원문은 출력하지 마세요. number/standardRef로 서버가 채웁니다.
 - JSON만 출력하세요."""
 
 
@@ -129,15 +159,23 @@ analyzer_agent = Agent(
         response_mime_type="application/json",
     ),
     output_key="risk_analysis",
+    before_agent_callback=select_reference_template,
+    before_model_callback=adk_before_model,
+    after_model_callback=adk_after_model,
 )
 
 # ---------------------------------------------------------------------------
 # Agent 3: UnifiedTranslatorAction (Agent 3+4 병합)
 # ---------------------------------------------------------------------------
 def unified_instruction(context):
-    """Agent 3 instruction — 인지적 변환 + 행동 스크립트 + 최종 JSON 생성을 통합."""
+    """Agent 3 instruction — 인지적 변환 + 행동 스크립트 + 최종 JSON 생성을 통합.
+
+    detail_level "core" (tiered generation): level1만 생성, 상세 설명은 조항을 펼칠 때 main.clause_detail.
+    """
     risk = context.state.get("risk_analysis", "{}")
     parsed = context.state.get("parsed_document", "{}")
+    if context.state.get("detail_level") == "core":
+        return _unified_core_instruction(risk, parsed)
     return f"""위험 분석 결과를 바탕으로 쉬운 한국어 변환 + 행동 스크립트 + 최종 보고서를 생성하세요.
 
 ## 7대 변환 원칙 (간략)
@@ -161,14 +199,14 @@ def unified_instruction(context):
 {{
   "summary": {{"totalMaxRisk":합계,"riskLevel":"high/medium/low","deviatedClauseCount":N,"totalClauseCount":N,"riskGrade":"위험/주의/안전","headline":"이 계약서에서 잃을 수 있는 최대 금액"}},
   "clauses": [
-    {{"number":"제N조","title":"제목","deviationScore":N,"riskAmount":N,"direction":"이탈요약","original":"원문","standard":"표준원문",
+    {{"number":"제N조","title":"제목","deviationScore":N,"riskAmount":N,"direction":"이탈요약","standardRef":"제N조",
       "easyKorean":{{"level1":"핵심 1-2문장(7원칙적용)","level2":"일상비유","level3":"구체적 금액/상황 시나리오"}},
       "structuredBreakdown":{{"who":"주체","what":"내용","when":"시기","condition":"조건","result":"결과","risk":"위험"}},
       "termGlossary":[{{"original":"용어","simple":"설명","context":"의미"}}],
       "action":{{"type":"danger/negotiate","priority":"urgent/high","message":"행동스크립트"}}
     }}
   ],
-  "safeClausesSummary": [{{"number":"제N조","title":"제목","deviationScore":N,"status":"safe/caution","body":"원문"}}],
+  "safeClausesSummary": [{{"number":"제N조","title":"제목","deviationScore":N,"status":"safe/caution"}}],
   "overallAction": {{"type":"warning","message":"위험조항수+최대손실+체크리스트"}}
 }}
 
@@ -178,9 +216,102 @@ def unified_instruction(context):
 - level3: 실제 금액/기간 포함 시나리오
 - action.message: danger는 "⚠️"+수정요청, negotiate는 "📋 수정 요청:"+근거법. 존댓말.
 - termGlossary: 조항당 2개+
+- number는 파싱 원본의 조항 번호 그대로. 조항 원문(original/standard/body)은 출력 금지 — 서버가 채움.
+- JSON만 출력."""
+
+
+def _unified_core_instruction(risk, parsed) -> str:
+    return f"""위험 분석 결과를 바탕으로 쉬운 한국어 핵심 설명(level1) + 최종 보고서를 생성하세요.
+비유·시나리오·용어 풀이·행동 스크립트는 사용자가 조항을 펼칠 때 따로 생성하므로 출력하지 마세요.
+
+## 7대 변환 원칙 (간략)
+1. 복합문→단문, 수동→능동 ("보증금이 반환된다"→"집주인이 보증금을 돌려줍니다")
+2. 조사 의존 감소: "누가/무엇을/누구에게" 명시 분리
+3. 중첩 조건→번호 매긴 개별 조건+결과 쌍
+4. 시간 전치: 기한을 문장 맨 앞 배치
+5. 한자어→일상어 (원상회복→처음 상태로 고치기, 대항력→권리 주장 힘, 전대→다시 빌려주기, 채무불이행→약속 안 지키기, 해지→계약 끝내기, 위약금→벌금, 갱신→연장, 임차인→세입자, 임대인→집주인)
+6. 모든 문장에 명시적 주어 포함
+7. "누가|무엇을|언제|결과" 구조화
+
+## 입력
+위험 분석: {risk}
+파싱 원본: {parsed}
+
+## 출력 JSON
+{{
+  "summary": {{"totalMaxRisk":합계,"riskLevel":"high/medium/low","deviatedClauseCount":N,"totalClauseCount":N,"riskGrade":"위험/주의/안전","headline":"이 계약서에서 잃을 수 있는 최대 금액"}},
+  "clauses": [
+    {{"number":"제N조","title":"제목","deviationScore":N,"riskAmount":N,"direction":"이탈요약","standardRef":"제N조",
+      "easyKorean":{{"level1":"핵심 1-2문장(7원칙적용)"}}
+    }}
+  ],
+  "safeClausesSummary": [{{"number":"제N조","title":"제목","deviationScore":N,"status":"safe/caution"}}],
+  "overallAction": {{"type":"warning","message":"위험조항수+최대손실+체크리스트"}}
+}}
+
+## 규칙
+- level1: 법률용어 0개, ~합니다 체, 1문장 1아이디어
+- number는 파싱 원본의 조항 번호 그대로. 조항 원문(original/standard/body)은 출력 금지 — 서버가 채움.
 - JSON만 출력."""
 
 
+def _load_state_json(value):
+    if isinstance(value, dict):
+        return value
+    try:
+        return json.loads(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def build_clean_report(risk: dict, parsed: dict | None) -> dict:
+    """Final report for a contract with no deviated clauses (no model call needed)."""
+    safe = [
+        {k: c[k] for k in ("number", "title", "deviationScore", "status") if k in c}
+        for c in risk.get("safe_clauses", [])
+    ]
+    parsed_count = len((parsed or {}).get("clauses", []))
+    caution = [c["number"] for c in safe if c.get("status") == "caution"]
+    message = "✅ 표준 계약서 대비 임차인에게 불리하게 바뀐 조항이 발견되지 않았습니다."
+    if caution:
+        message += f"\n\n🟡 경미한 차이가 있는 조항: {', '.join(caution)}"
+    message += (
+        "\n\n계약 전 확인하세요:\n"
+        "① 등기부등본 열람 (인터넷등기소: iros.go.kr)\n"
+        "② 전입신고 + 확정일자 (주민센터)\n"
+        "③ 보증금 반환보증 가입 가능 여부 (HUG/HF/SGI)"
+    )
+    return {
+        "summary": {
+            "totalMaxRisk": 0,
+            "riskLevel": "low",
+            "deviatedClauseCount": 0,
+            "totalClauseCount": max(parsed_count, len(safe)),
+            "riskGrade": "안전",
+            "headline": "이 계약서에서 잃을 수 있는 최대 금액",
+        },
+        "clauses": [],
+        "safeClausesSummary": safe,
+        "overallAction": {"type": "info", "message": message},
+    }
+
+
+def skip_translation_if_clean(callback_context):
+    """before_agent_callback: when nothing deviates, assemble the report locally.
+
+    Returning content here makes ADK skip the translator's model call; the
+    report is stored under the agent's output_key like a normal run.
+    """
+    risk = _load_state_json(callback_context.state.get("risk_analysis"))
+    if not isinstance(risk, dict) or risk.get("deviated_clauses") != []:
+        return None
+    report = build_clean_report(risk, _load_state_json(callback_context.state.get("parsed_document")))
+    text = json.dumps(report, ensure_ascii=False)
+    callback_context.state["final_result"] = text
+    logger.info("No deviated clauses — skipping unified_translator_action")
+    return types.Content(role="model", parts=[types.Part.from_text(text=text)])
+
+
 unified_agent = Agent(
     name="unified_translator_action",
     model=MODEL_FLASH,
@@ -191,6 +322,9 @@ unified_agent = Agent(
         response_mime_type="application/json",
     ),
     output_key="final_result",
+    before_agent_callback=skip_translation_if_clean,
+    before_model_callback=adk_before_model,
+    after_model_callback=adk_after_model,
 )
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,418 @@
+"""Local Gemini stand-in for load tests (latency, errors, truncated/invalid JSON).
+
+The google-genai SDK honours GOOGLE_GEMINI_BASE_URL, so the app and the ADK agents can be pointed here:
+
+    python bench/fake_gemini.py --port 8765 --latency lognormal:median=2.0,sigma=0.4 \
+        --error-rate 0.05 --truncate-rate 0.02 --invalid-json-rate 0.02 --timeout-rate 0.01
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import time
+from collections import Counter
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT_DIR, "data")
+
+# ---------------------------------------------------------------------------
+# Latency distributions
+# ---------------------------------------------------------------------------
+
+def parse_latency(spec: str):
+    """Parse a latency spec into a zero-arg sampler returning seconds.
+
+    Supported forms: ``fixed:0.5``, ``uniform:0.2,1.5``,
+    ``normal:mean=1.0,sd=0.3``, ``lognormal:median=2.0,sigma=0.4``,
+    ``exp:mean=1.0``.
+    """
+    kind, _, raw = (spec or "fixed:0").partition(":")
+    kind = kind.strip().lower()
+    params = {}
+    positional = []
+    for item in filter(None, (p.strip() for p in raw.split(","))):
+        if "=" in item:
+            k, v = item.split("=", 1)
+            params[k.strip()] = float(v)
+        else:
+            positional.append(float(item))
+
+    if kind == "fixed":
+        value = positional[0] if positional else params.get("value", 0.0)
+        return lambda: value
+    if kind == "uniform":
+        low = positional[0] if positional else params.get("low", 0.0)
+        high = positional[1] if len(positional) > 1 else params.get("high", low)
+        return lambda: random.uniform(low, high)
+    if kind == "normal":
+        mean = params.get("mean", positional[0] if positional else 1.0)
+        sd = params.get("sd", positional[1] if len(positional) > 1 else 0.0)
+        return lambda: max(0.0, random.gauss(mean, sd))
+    if kind == "lognormal":
+        median = params.get("median", positional[0] if positional else 1.0)
+        sigma = params.get("sigma", positional[1] if len(positional) > 1 else 0.5)
+        mu = math.log(max(median, 1e-6))
+        return lambda: random.lognormvariate(mu, sigma)
+    if kind in ("exp", "exponential"):
+        mean = params.get("mean", positional[0] if positional else 1.0)
+        return lambda: random.expovariate(1.0 / max(mean, 1e-6))
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+# ---------------------------------------------------------------------------
+# Canned responses per pipeline stage
+# ---------------------------------------------------------------------------
+
+def _load(name: str) -> dict:
+    with open(os.path.join(DATA_DIR, name), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _id_referenced(report: dict, keep_text: bool) -> dict:
+    """Report in the ID-referenced output schema (the server fills clause text back in)."""
+    report = json.loads(json.dumps(report))
+    for clause in report.get("clauses", []):
+        clause.pop("standard", None)
+        clause["standardRef"] = clause["number"]
+        if not keep_text:
+            clause.pop("original", None)
+    if not keep_text:
+        for safe in report.get("safeClausesSummary", []):
+            safe.pop("body", None)
+    return report
+
+
+def _core(report: dict) -> dict:
+    """Report in the tiered core schema (level1 only; detail is generated per clause)."""
+    report = json.loads(json.dumps(report))
+    for clause in report.get("clauses", []):
+        clause["easyKorean"] = {"level1": clause.get("easyKorean", {}).get("level1", "")}
+        for key in ("structuredBreakdown", "termGlossary", "action"):
+            clause.pop(key, None)
+    return report
+
+
+def build_canned_responses() -> dict:
+    """Build one valid response body per stage from the sample data in data/."""
+    fallback = _load("fallback_analysis.json")
+    sample = _load("sample_risky_contract.json")
+
+    parsed = {
+        "title": sample.get("title", "주택임대차계약서"),
+        "property_address": "서울특별시 관악구 신림로29길 12, 3층 301호",
+        "deposit_amount": 50000000,
+        "monthly_rent": 500000,
+        "clauses": [
+            {"number": c["number"], "title": c["title"], "body": c["body"]}
+            for c in sample.get("clauses", [])
+        ],
+    }
+    risk = {
+        "deviated_clauses": [
+            {
+                "number": c["number"],
+                "title": c["title"],
+                "deviationScore": c["deviationScore"],
+                "riskAmount": c["riskAmount"],
+                "direction": c.get("direction", ""),
+                "standardRef": c["number"],
+            }
+            for c in fallback.get("clauses", [])
+        ],
+        "safe_clauses": [
+            {k: s[k] for k in ("number", "title", "deviationScore", "status") if k in s}
+            for s in fallback.get("safeClausesSummary", [])
+        ],
+        "deposit_amount": 50000000,
+        "monthly_rent": 500000,
+    }
+    final = {k: v for k, v in fallback.items() if k != "comprehension"}
+    first = fallback["clauses"][0]
+    detail = {
+        "easyKorean": {k: first["easyKorean"][k] for k in ("level2", "level3")},
+        "structuredBreakdown": first.get("structuredBreakdown", {}),
+        "termGlossary": first.get("termGlossary", []),
+        "action": {"message": first["action"]["message"]},
+    }
+    fraud = (
+        "검색 결과, 해당 지역에서 최근 전세보증금 미반환 관련 보도가 일부 확인됩니다. "
+        "계약 전 등기부등본의 근저당 설정 여부와 HUG 보증보험 가입 가능 여부를 확인하세요."
+    )
+    return {
+        "parse": json.dumps(parsed, ensure_ascii=False),
+        "analyze": json.dumps(risk, ensure_ascii=False),
+        "translate": json.dumps(_id_referenced(final, keep_text=False), ensure_ascii=False),
+        "single": json.dumps(_id_referenced(final, keep_text=True), ensure_ascii=False),
+        "single_indexed": json.dumps(_id_referenced(final, keep_text=False), ensure_ascii=False),
+        "translate_core": json.dumps(_core(_id_referenced(final, keep_text=False)), ensure_ascii=False),
+        "single_core": json.dumps(_core(_id_referenced(final, keep_text=True)), ensure_ascii=False),
+        "single_core_indexed": json.dumps(_core(_id_referenced(final, keep_text=False)), ensure_ascii=False),
+        "detail": json.dumps(detail, ensure_ascii=False),
+        "quiz": json.dumps({"comprehension": fallback.get("comprehension", {})}, ensure_ascii=False),
+        "fraud": fraud,
+        "ping": "pong",
+    }
+
+
+# Single-call prompts that carry a local clause index get an ID-only response.
+CLAUSE_INDEX_MARKER = "조항 ID 목록"
+# Tiered generation prompts (single call / translator) ask for the core report only.
+CORE_MARKER = "핵심 설명(level1)"
+
+# Stage detection — first marker found in the prompt text wins (order matters).
+STAGE_MARKERS = [
+    ("detail", "조항 상세 설명"),
+    ("parse", "임대차 계약서 파싱 전문가"),
+    ("analyze", "임대차 계약서 위험 분석 전문가"),
+    ("translate", "쉬운 한국어 변환 + 행동 스크립트"),
+    ("translate", "핵심 설명(level1) + 최종 보고서"),
+    ("quiz", "이해도 검증"),
+    ("fraud", "전세사기"),
+    ("single", "임대차 계약서 위험 분석 AI"),
+]
+
+
+def _collect_text(body: dict) -> str:
+    texts = []
+    sys_inst = body.get("systemInstruction") or body.get("system_instruction") or {}
+    for part in sys_inst.get("parts", []) or []:
+        if isinstance(part, dict) and part.get("text"):
+            texts.append(part["text"])
+    for content in body.get("contents", []) or []:
+        for part in content.get("parts", []) or []:
+            if isinstance(part, dict) and part.get("text"):
+                texts.append(part["text"])
+    return "\n".join(texts)
+
+
+def detect_stage(body: dict) -> str:
+    text = _collect_text(body)
+    for stage, marker in STAGE_MARKERS:
+        if marker in text:
+            return stage
+    return "ping"
+
+
+def _grounding_metadata() -> dict:
+    return {
+        "groundingChunks": [
+            {"web": {"uri": "https://example.invalid/news/1", "title": "전세사기 피해 주의보 (모의)"}},
+            {"web": {"uri": "https://example.invalid/news/2", "title": "보증금 미반환 사례 (모의)"}},
+        ],
+    }
+
+
+def _response_body(text: str, stage: str) -> dict:
+    candidate = {
+        "content": {"role": "model", "parts": [{"text": text}]},
+        "finishReason": "STOP",
+        "index": 0,
+    }
+    if stage == "fraud":
+        candidate["groundingMetadata"] = _grounding_metadata()
+    return {
+        "candidates": [candidate],
+        "usageMetadata": {
+            "promptTokenCount": 0,
+            "candidatesTokenCount": max(1, len(text) // 3),
+            "totalTokenCount": max(1, len(text) // 3),
+        },
+        "modelVersion": "fake-gemini",
+    }
+
+
+def _inline_bytes(body: dict) -> int:
+    """Size of base64-inlined file data in a generate request."""
+    return sum(
+        len(part["inlineData"].get("data", ""))
+        for content in body.get("contents", []) or []
+        for part in content.get("parts", []) or []
+        if isinstance(part, dict) and isinstance(part.get("inlineData"), dict)
+    )
+
+
+def _file_uris(body: dict) -> list[str]:
+    return [
+        part["fileData"].get("fileUri", "")
+        for content in body.get("contents", []) or []
+        for part in content.get("parts", []) or []
+        if isinstance(part, dict) and isinstance(part.get("fileData"), dict)
+    ]
+
+
+def _error_body(code: int) -> dict:
+    status = {403: "PERMISSION_DENIED", 429: "RESOURCE_EXHAUSTED", 500: "INTERNAL", 503: "UNAVAILABLE"}.get(code, "UNKNOWN")
+    return {"error": {"code": code, "message": f"Simulated {status}", "status": status}}
+
+
+# ---------------------------------------------------------------------------
+# App factory
+# ---------------------------------------------------------------------------
+
+def create_app(
+    latency: str = "fixed:0",
+    error_rate: float = 0.0,
+    truncate_rate: float = 0.0,
+    invalid_json_rate: float = 0.0,
+    timeout_rate: float = 0.0,
+    hang_seconds: float = 600.0,
+    stage_latency: dict | None = None,
+    seed: int | None = None,
+) -> FastAPI:
+    """Create the fake Gemini app.
+
+    ``stage_latency`` optionally overrides ``latency`` per stage
+    (e.g. ``{"parse": "fixed:3"}``). Rates are independent probabilities
+    evaluated in order: timeout → error → truncated → invalid JSON.
+    """
+    rng = random.Random(seed)
+    default_sampler = parse_latency(latency)
+    samplers = {stage: parse_latency(spec) for stage, spec in (stage_latency or {}).items()}
+    canned = build_canned_responses()
+    stats = {"requests": Counter(), "outcomes": Counter(), "bytes": Counter(), "started": time.time()}
+    # Files API stand-in: resumable upload sessions and the files they produced
+    uploads: dict[str, dict] = {}
+    files: dict[str, dict] = {}
+
+    app = FastAPI(title="fake-gemini")
+
+    @app.post("/{api_version}/models/{model_action:path}")
+    async def generate(api_version: str, model_action: str, request: Request):
+        body = await request.json()
+        stage = detect_stage(body)
+        stats["requests"][stage] += 1
+        stats["bytes"]["inline"] += _inline_bytes(body)
+        missing = [uri for uri in _file_uris(body) if uri.rsplit("/files/", 1)[-1] not in files]
+        if missing:
+            stats["outcomes"]["missing_file"] += 1
+            return JSONResponse(status_code=403, content=_error_body(403))
+
+        await asyncio.sleep(samplers.get(stage, default_sampler)())
+
+        roll = rng.random()
+        if roll < timeout_rate:
+            stats["outcomes"]["timeout"] += 1
+            await asyncio.sleep(hang_seconds)
+        roll = rng.random()
+        if roll < error_rate:
+            code = rng.choice([429, 500, 503])
+            stats["outcomes"][f"error_{code}"] += 1
+            return JSONResponse(status_code=code, content=_error_body(code))
+
+        prompt = _collect_text(body)
+        variant = stage
+        if stage in ("single", "translate") and CORE_MARKER in prompt:
+            variant += "_core"
+        if stage == "single" and CLAUSE_INDEX_MARKER in prompt:
+            variant += "_indexed"
+        text = canned[variant]
+        roll = rng.random()
+        if roll < truncate_rate:
+            stats["outcomes"]["truncated"] += 1
+            text = text[: max(1, len(text) // 2)]
+        elif roll < truncate_rate + invalid_json_rate:
+            stats["outcomes"]["invalid_json"] += 1
+            text = "```json\n" + text.replace("\"", "'", 5)
+        else:
+            stats["outcomes"]["ok"] += 1
+        return JSONResponse(content=_response_body(text, stage))
+
+    @app.post("/upload/{api_version}/files")
+    async def upload_start(api_version: str, request: Request):
+        meta = (await request.json()).get("file", {})
+        upload_id = f"{len(uploads) + 1:06d}"
+        uploads[upload_id] = {"meta": meta, "data": bytearray()}
+        url = f"{str(request.base_url).rstrip('/')}/upload/{api_version}/files/session/{upload_id}"
+        return JSONResponse(content={}, headers={"X-Goog-Upload-URL": url, "X-Goog-Upload-Status": "active"})
+
+    @app.post("/upload/{api_version}/files/session/{upload_id}")
+    async def upload_chunk(api_version: str, upload_id: str, request: Request):
+        session = uploads[upload_id]
+        session["data"] += await request.body()
+        if "finalize" not in request.headers.get("X-Goog-Upload-Command", ""):
+            return JSONResponse(content={}, headers={"X-Goog-Upload-Status": "active"})
+        uploads.pop(upload_id)
+        file_id = f"fake{upload_id}"
+        file = {
+            "name": f"files/{file_id}",
+            "displayName": session["meta"].get("displayName", ""),
+            "mimeType": session["meta"].get("mimeType", "application/octet-stream"),
+            "sizeBytes": str(len(session["data"])),
+            "uri": f"{str(request.base_url).rstrip('/')}/{api_version}/files/{file_id}",
+            "state": "ACTIVE",
+        }
+        files[file_id] = file
+        stats["requests"]["upload"] += 1
+        stats["bytes"]["uploaded"] += len(session["data"])
+        return JSONResponse(content={"file": file}, headers={"X-Goog-Upload-Status": "final"})
+
+    @app.get("/{api_version}/files/{file_id}")
+    async def get_file(api_version: str, file_id: str):
+        if file_id not in files:
+            return JSONResponse(status_code=403, content=_error_body(403))
+        return JSONResponse(content=files[file_id])
+
+    @app.delete("/{api_version}/files/{file_id}")
+    async def delete_file(api_version: str, file_id: str):
+        if files.pop(file_id, None) is None:
+            return JSONResponse(status_code=403, content=_error_body(403))
+        stats["requests"]["delete_file"] += 1
+        return JSONResponse(content={})
+
+    @app.get("/__stats")
+    async def get_stats():
+        return {
+            "uptimeSeconds": round(time.time() - stats["started"], 3),
+            "requests": dict(stats["requests"]),
+            "outcomes": dict(stats["outcomes"]),
+            "bytes": dict(stats["bytes"]),
+            "files": len(files),
+        }
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Gemini server for ClearSign load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="fixed:0.2", help="default latency distribution")
+    parser.add_argument(
+        "--stage-latency",
+        action="append",
+        default=[],
+        metavar="STAGE=SPEC",
+        help="per-stage latency override, e.g. parse=uniform:1,3 (repeatable)",
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--truncate-rate", type=float, default=0.0)
+    parser.add_argument("--invalid-json-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--hang-seconds", type=float, default=600.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    stage_latency = dict(item.split("=", 1) for item in args.stage_latency)
+    app = create_app(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        truncate_rate=args.truncate_rate,
+        invalid_json_rate=args.invalid_json_rate,
+        timeout_rate=args.timeout_rate,
+        hang_seconds=args.hang_seconds,
+        stage_latency=stage_latency,
+        seed=args.seed,
+    )
+
+    import uvicorn
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
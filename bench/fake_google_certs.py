@@ -0,0 +1,117 @@
+"""Fake Google signing-key endpoint for testing the certificate cache and key rotation.
+
+    python bench/fake_google_certs.py --port 8766 --max-age 300 --latency 0.2
+
+    GET  /oauth2/v1/certs          current + previous key
+    GET  /__token?aud=...&sub=...  ID token signed with the active key
+    POST /__rotate                 activate a new key (the old one stays published once more)
+    GET  /__stats                  certificate request count
+"""
+
+import argparse
+import asyncio
+import datetime
+import time
+import uuid
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from google.auth import crypt, jwt
+
+
+def _new_key() -> dict:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "fake-google-certs")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=30))
+        .sign(key, hashes.SHA256())
+    )
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    kid = uuid.uuid4().hex
+    return {
+        "kid": kid,
+        "signer": crypt.RSASigner.from_string(private_pem, key_id=kid),
+        "cert": cert.public_bytes(serialization.Encoding.PEM).decode("ascii"),
+    }
+
+
+def create_app(max_age: int, latency: float) -> FastAPI:
+    keys = [_new_key()]  # newest first; at most [active, previous]
+    stats = {"certRequests": 0, "rotations": 0, "tokens": 0}
+
+    app = FastAPI(title="fake-google-certs")
+
+    @app.get("/oauth2/v1/certs")
+    async def certs():
+        stats["certRequests"] += 1
+        await asyncio.sleep(latency)
+        return JSONResponse(
+            content={k["kid"]: k["cert"] for k in keys},
+            headers={"Cache-Control": f"public, max-age={max_age}, must-revalidate, no-transform"},
+        )
+
+    @app.get("/__token")
+    async def token(
+        aud: str,
+        sub: str = "10000000000000000001",
+        email: str = "tester@example.com",
+        name: str = "Tester",
+        ttl: int = 3600,
+    ):
+        stats["tokens"] += 1
+        now = int(time.time())
+        payload = {
+            "iss": "https://accounts.google.com",
+            "aud": aud,
+            "sub": sub,
+            "email": email,
+            "email_verified": True,
+            "name": name,
+            "iat": now,
+            "exp": now + ttl,
+        }
+        return {"credential": jwt.encode(keys[0]["signer"], payload).decode("ascii"), "kid": keys[0]["kid"]}
+
+    @app.post("/__rotate")
+    async def rotate():
+        keys.insert(0, _new_key())
+        del keys[2:]
+        stats["rotations"] += 1
+        return {"active": keys[0]["kid"], "published": [k["kid"] for k in keys]}
+
+    @app.get("/__stats")
+    async def get_stats():
+        return {**stats, "published": [k["kid"] for k in keys]}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Google signing-key server for ClearSign login tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--max-age", type=int, default=300, help="Cache-Control max-age on the certs response")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to each certs response")
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run(create_app(args.max_age, args.latency), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,421 @@
+"""Offline load test: fake Gemini server + uvicorn app, concurrent calls to the API endpoints.
+
+    python bench/loadtest.py --concurrency 50 --requests 200 --latency lognormal:median=2,sigma=0.4 \
+        --error-rate 0.05 --output bench_results/run.json
+    python bench/loadtest.py --compare bench_results/base.json bench_results/run.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+import httpx
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT_DIR, "data")
+ENDPOINTS = ("analyze", "comprehension", "fraud-check", "demo")
+SAMPLE_ADDRESSES = [
+    "서울특별시 강서구 화곡동 123-45",
+    "인천광역시 미추홀구 주안동 678-9",
+    "경기도 수원시 팔달구 인계동 1011",
+]
+
+# ---------------------------------------------------------------------------
+# Sample payloads
+# ---------------------------------------------------------------------------
+
+def _contract_text(path: str) -> bytes:
+    """Render a data/*.json contract as the plain-text document a tenant would upload."""
+    with open(path, "r", encoding="utf-8") as f:
+        doc = json.load(f)
+    lines = [doc.get("title", "주택임대차계약서"), ""]
+    for clause in doc.get("clauses", []):
+        lines.append(f"{clause['number']} ({clause['title']}) {clause['body']}")
+    return "\n".join(lines).encode("utf-8")
+
+
+def load_upload_samples() -> list[tuple[str, bytes, str]]:
+    """(filename, bytes, mime) tuples built from the sample contracts in data/."""
+    samples = [
+        ("sample_risky_contract.txt", _contract_text(os.path.join(DATA_DIR, "sample_risky_contract.json")), "text/plain"),
+        ("standard_contract.txt", _contract_text(os.path.join(DATA_DIR, "standard_contract.json")), "text/plain"),
+    ]
+    html_path = os.path.join(DATA_DIR, "test_risky_contract_v2.html")
+    if os.path.exists(html_path):
+        with open(html_path, "rb") as f:
+            samples.append(("test_risky_contract_v2.html", f.read(), "text/html"))
+    return samples
+
+
+def load_comprehension_payload() -> dict:
+    with open(os.path.join(DATA_DIR, "fallback_analysis.json"), "r", encoding="utf-8") as f:
+        final = json.load(f)
+    final.pop("comprehension", None)
+    risk = {
+        "deviated_clauses": [
+            {k: c.get(k) for k in ("number", "title", "deviationScore", "riskAmount", "direction")}
+            for c in final.get("clauses", [])
+        ],
+    }
+    return {"risk_analysis": risk, "final_result": final}
+
+
+# ---------------------------------------------------------------------------
+# Process management
+# ---------------------------------------------------------------------------
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _wait_ready(url: str, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                res = await client.get(url, timeout=1.0)
+                if res.status_code < 500:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"Server at {url} did not become ready within {timeout}s")
+
+
+def start_fake_server(args, port: int) -> subprocess.Popen:
+    cmd = [
+        sys.executable, os.path.join(ROOT_DIR, "bench", "fake_gemini.py"),
+        "--port", str(port),
+        "--latency", args.latency,
+        "--error-rate", str(args.error_rate),
+        "--truncate-rate", str(args.truncate_rate),
+        "--invalid-json-rate", str(args.invalid_json_rate),
+        "--timeout-rate", str(args.timeout_rate),
+        "--hang-seconds", str(args.hang_seconds),
+    ]
+    for item in args.stage_latency:
+        cmd += ["--stage-latency", item]
+    if args.seed is not None:
+        cmd += ["--seed", str(args.seed)]
+    return subprocess.Popen(cmd, cwd=ROOT_DIR)
+
+
+def start_app(args, port: int, fake_url: str) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        "GEMINI_API_KEY": "fake-load-test-key",
+        "GOOGLE_GEMINI_BASE_URL": fake_url,
+        "PORT": str(port),
+        # Measure the pipeline itself, not the shared result caches (override with --app-env)
+        "ANALYSIS_CACHE_TTL_SECONDS": "0",
+        "FRAUD_CACHE_TTL_SECONDS": "0",
+        # All bench traffic comes from one address; per-identity quotas would cap it at a few requests
+        "QUOTA_ENABLED": "false",
+        "SHARED_STORE_PATH": os.path.join(tempfile.gettempdir(), f"clearsign-bench-{port}.db"),
+    })
+    for item in args.app_env:
+        key, _, value = item.partition("=")
+        env[key] = value
+    cmd = [
+        sys.executable, "-m", "uvicorn", "main:app",
+        "--host", "127.0.0.1", "--port", str(port),
+        "--log-level", "warning",
+    ]
+    return subprocess.Popen(cmd, cwd=ROOT_DIR, env=env)
+
+
+class RssSampler:
+    """Sample a process's resident set size from /proc (Linux) in a background thread."""
+
+    def __init__(self, pid: int | None, interval: float = 0.1):
+        self.pid = pid
+        self.interval = interval
+        self.peak_kb = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _read_status(self, field: str) -> int:
+        try:
+            with open(f"/proc/{self.pid}/status", "r") as f:
+                for line in f:
+                    if line.startswith(field + ":"):
+                        return int(line.split()[1])
+        except (OSError, ValueError, IndexError):
+            pass
+        return 0
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_kb = max(self.peak_kb, self._read_status("VmRSS"))
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self.pid and os.path.exists(f"/proc/{self.pid}/status"):
+            self._thread.start()
+        return self
+
+    def stop(self) -> float | None:
+        """Stop sampling and return peak RSS in MB (VmHWM when available)."""
+        if not self._thread.is_alive():
+            return None
+        self._stop.set()
+        self._thread.join()
+        self.peak_kb = max(self.peak_kb, self._read_status("VmHWM"))
+        return round(self.peak_kb / 1024, 1)
+
+
+# ---------------------------------------------------------------------------
+# Load driver
+# ---------------------------------------------------------------------------
+
+def _percentile(sorted_values: list[float], pct: float) -> float | None:
+    if not sorted_values:
+        return None
+    idx = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return round(sorted_values[idx], 1)
+
+
+def _is_fallback(endpoint: str, status: int, body) -> bool:
+    if status != 200 or not isinstance(body, dict):
+        return endpoint != "demo"
+    if endpoint == "analyze":
+        return body.get("analysisMode") != "real"
+    if endpoint == "fraud-check":
+        return not body.get("searchPerformed", False)
+    return False
+
+
+async def _one_request(client: httpx.AsyncClient, endpoint: str, i: int, samples, comp_payload):
+    if endpoint == "analyze":
+        name, data, mime = samples[i % len(samples)]
+        return await client.post("/api/analyze", files={"file": (name, data, mime)})
+    if endpoint == "comprehension":
+        return await client.post("/api/comprehension", json=comp_payload)
+    if endpoint == "fraud-check":
+        return await client.get("/api/fraud-check", params={"address": SAMPLE_ADDRESSES[i % len(SAMPLE_ADDRESSES)]})
+    return await client.get("/api/demo")
+
+
+async def run_endpoint(base_url: str, endpoint: str, total: int, concurrency: int, timeout: float) -> dict:
+    """Fire ``total`` requests at one endpoint with at most ``concurrency`` in flight."""
+    samples = load_upload_samples()
+    comp_payload = load_comprehension_payload()
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    fallbacks = 0
+    counter = iter(range(total))
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+
+        async def worker():
+            nonlocal fallbacks
+            for i in counter:
+                t0 = time.perf_counter()
+                try:
+                    res = await _one_request(client, endpoint, i, samples, comp_payload)
+                    status = res.status_code
+                    try:
+                        body = res.json()
+                    except ValueError:
+                        body = None
+                except httpx.HTTPError as e:
+                    status, body = f"client_error:{type(e).__name__}", None
+                latencies.append((time.perf_counter() - t0) * 1000)
+                statuses[str(status)] += 1
+                if _is_fallback(endpoint, status if isinstance(status, int) else 0, body):
+                    fallbacks += 1
+
+        t_start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+        wall = time.perf_counter() - t_start
+
+    latencies.sort()
+    ok = statuses.get("200", 0)
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "ok": ok,
+        "errors": total - ok,
+        "statusCodes": dict(statuses),
+        "wallSeconds": round(wall, 3),
+        "throughputRps": round(total / wall, 2) if wall else None,
+        "latencyMs": {
+            "p50": _percentile(latencies, 50),
+            "p95": _percentile(latencies, 95),
+            "p99": _percentile(latencies, 99),
+            "mean": round(sum(latencies) / len(latencies), 1) if latencies else None,
+            "max": round(latencies[-1], 1) if latencies else None,
+        },
+        "fallbackRate": round(fallbacks / total, 4) if total else 0.0,
+    }
+
+
+async def run(args) -> dict:
+    fake_proc = app_proc = None
+    base_url = args.app_url
+    fake_stats = None
+    try:
+        if not base_url:
+            fake_port, app_port = _free_port(), _free_port()
+            fake_url = f"http://127.0.0.1:{fake_port}"
+            fake_proc = start_fake_server(args, fake_port)
+            await _wait_ready(f"{fake_url}/__stats", 30)
+            app_proc = start_app(args, app_port, fake_url)
+            base_url = f"http://127.0.0.1:{app_port}"
+        await _wait_ready(f"{base_url}/health", args.startup_timeout)
+
+        pid = app_proc.pid if app_proc else args.app_pid
+        sampler = RssSampler(pid).start()
+        results = {}
+        for endpoint in args.endpoints:
+            per_endpoint = args.requests_per_endpoint.get(endpoint, args.requests)
+            print(f"[bench] {endpoint}: {per_endpoint} requests @ concurrency {args.concurrency}", file=sys.stderr)
+            results[endpoint] = await run_endpoint(
+                base_url, endpoint, per_endpoint, args.concurrency, args.request_timeout,
+            )
+        peak_rss = sampler.stop()
+
+        if fake_proc:
+            async with httpx.AsyncClient() as client:
+                fake_stats = (await client.get(f"{fake_url}/__stats")).json()
+    finally:
+        for proc in (app_proc, fake_proc):
+            if proc and proc.poll() is None:
+                proc.terminate()
+                try:
+                    proc.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "host": platform.node(),
+            "gitRev": _git_rev(),
+            "config": {
+                "concurrency": args.concurrency,
+                "requests": args.requests,
+                "latency": args.latency,
+                "stageLatency": args.stage_latency,
+                "errorRate": args.error_rate,
+                "truncateRate": args.truncate_rate,
+                "invalidJsonRate": args.invalid_json_rate,
+                "timeoutRate": args.timeout_rate,
+                "appEnv": args.app_env,
+                "appUrl": args.app_url,
+            },
+        },
+        "results": results,
+        "peakRssMb": peak_rss,
+        "fakeServer": fake_stats,
+    }
+
+
+def _git_rev() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, stderr=subprocess.DEVNULL,
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Run comparison
+# ---------------------------------------------------------------------------
+
+def compare(base_path: str, new_path: str) -> dict:
+    """Diff two result files: per-endpoint throughput, latency percentiles and fallback rate."""
+    with open(base_path, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    with open(new_path, "r", encoding="utf-8") as f:
+        new = json.load(f)
+
+    def delta(a, b):
+        if a is None or b is None:
+            return None
+        return {"base": a, "new": b, "change": round(b - a, 2), "pct": round((b - a) / a * 100, 1) if a else None}
+
+    out = {"base": base_path, "new": new_path, "endpoints": {}}
+    for endpoint in sorted(set(base.get("results", {})) | set(new.get("results", {}))):
+        b = base.get("results", {}).get(endpoint, {})
+        n = new.get("results", {}).get(endpoint, {})
+        out["endpoints"][endpoint] = {
+            "throughputRps": delta(b.get("throughputRps"), n.get("throughputRps")),
+            "p50": delta(b.get("latencyMs", {}).get("p50"), n.get("latencyMs", {}).get("p50")),
+            "p95": delta(b.get("latencyMs", {}).get("p95"), n.get("latencyMs", {}).get("p95")),
+            "p99": delta(b.get("latencyMs", {}).get("p99"), n.get("latencyMs", {}).get("p99")),
+            "fallbackRate": delta(b.get("fallbackRate"), n.get("fallbackRate")),
+        }
+    out["peakRssMb"] = delta(base.get("peakRssMb"), new.get("peakRssMb"))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ClearSign offline load test")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help="comma-separated subset of " + ",".join(ENDPOINTS))
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=100, help="requests per endpoint")
+    parser.add_argument(
+        "--endpoint-requests",
+        action="append",
+        default=[],
+        metavar="ENDPOINT=N",
+        help="override request count for one endpoint (repeatable)",
+    )
+    parser.add_argument("--request-timeout", type=float, default=600.0)
+    parser.add_argument("--startup-timeout", type=float, default=120.0)
+    parser.add_argument("--app-url", default=None, help="target an already-running app instead of spawning one")
+    parser.add_argument("--app-pid", type=int, default=None, help="pid of --app-url process for RSS sampling")
+    parser.add_argument("--app-env", action="append", default=[], metavar="KEY=VALUE", help="extra env for the spawned app")
+    # Fake model server knobs (forwarded to bench/fake_gemini.py)
+    parser.add_argument("--latency", default="lognormal:median=1.5,sigma=0.4")
+    parser.add_argument("--stage-latency", action="append", default=[], metavar="STAGE=SPEC")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--truncate-rate", type=float, default=0.0)
+    parser.add_argument("--invalid-json-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--hang-seconds", type=float, default=600.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", default=None, help="write JSON results here (default: stdout)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="diff two result files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        print(json.dumps(compare(*args.compare), ensure_ascii=False, indent=2))
+        return
+
+    args.endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    unknown = set(args.endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+    args.requests_per_endpoint = {
+        k: int(v) for k, v in (item.split("=", 1) for item in args.endpoint_requests)
+    }
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"[bench] results written to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
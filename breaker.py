@@ -0,0 +1,185 @@
+"""Per-path circuit breakers for model calls (closed / open / half-open), one set per worker process."""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+
+logger = logging.getLogger("clearsign.breaker")
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a model path whose breaker is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit '{name}' is open (retry in {retry_after:.0f}s)")
+        self.name = name
+        self.retry_after = retry_after
+
+
+def is_outage(exc: BaseException) -> bool:
+    """Whether an error says the model path is unhealthy (vs. a bad request)."""
+    code = getattr(exc, "code", None)
+    if isinstance(code, int) and 400 <= code < 500:
+        return code in (408, 429)  # request timeout / quota exhausted
+    return True
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = 0.5,
+        min_calls: int = 4,
+        window_seconds: float = 60,
+        open_seconds: float = 30,
+        max_open_seconds: float = 300,
+        half_open_probes: int = 1,
+        enabled: bool = True,
+    ):
+        self.name = name
+        self.enabled = enabled
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.half_open_probes = half_open_probes
+        self.state = CLOSED
+        self.generation = 0  # bumped on open/close; results admitted in an earlier generation are ignored
+        self._outcomes: deque[tuple[float, bool]] = deque()
+        self._opened_at = 0.0
+        self._cooldown = open_seconds
+        self._probes = 0
+        self._lock = threading.Lock()
+        self.counters: Counter = Counter()
+
+    # -- state transitions (caller holds the lock) -------------------------
+
+    def _trim(self, now: float) -> None:
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+
+    def _open(self, now: float, reason: str) -> None:
+        self.state = OPEN
+        self.generation += 1
+        self._opened_at = now
+        self._probes = 0
+        self.counters["opened"] += 1
+        logger.warning(f"Circuit '{self.name}' opened ({reason}) — skipping for {self._cooldown:.0f}s")
+
+    def _close(self) -> None:
+        self.state = CLOSED
+        self.generation += 1
+        self._outcomes.clear()
+        self._cooldown = self.open_seconds
+        self._probes = 0
+        logger.info(f"Circuit '{self.name}' closed — probe succeeded")
+
+    def _retry_after(self, now: float) -> float:
+        return max(0.0, self._opened_at + self._cooldown - now)
+
+    # -- public API -------------------------------------------------------
+
+    def acquire(self) -> tuple[bool, int]:
+        """Admit one call; returns (is half-open probe, generation). Raises CircuitOpenError."""
+        now = time.monotonic()
+        with self._lock:
+            if self.state == OPEN and self._retry_after(now) <= 0:
+                self.state = HALF_OPEN
+                logger.info(f"Circuit '{self.name}' half-open — sending probe")
+            if self.state == CLOSED:
+                return False, self.generation
+            if self.state == HALF_OPEN and self._probes < self.half_open_probes:
+                self._probes += 1
+                self.counters["probes"] += 1
+                return True, self.generation
+            self.counters["rejected"] += 1
+            raise CircuitOpenError(self.name, self._retry_after(now) if self.state == OPEN else 1.0)
+
+    def record(self, ok: bool, probe: bool = False, reason: str = "error", generation: int | None = None) -> None:
+        """Outcome of one call; ``generation`` is the one it was admitted in (None: current)."""
+        now = time.monotonic()
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                # Admitted before the last open/close: e.g. a slow success from before the outage
+                # must not close a half-open circuit whose probe hasn't answered yet
+                self.counters["stale"] += 1
+                return
+            if probe:
+                self._probes = max(0, self._probes - 1)
+            if self.state == HALF_OPEN:
+                if ok:
+                    self._close()
+                else:
+                    self._cooldown = min(self.max_open_seconds, self._cooldown * 2)
+                    self._open(now, f"probe failed: {reason}")
+                return
+            if self.state == OPEN:
+                return  # late result of a call admitted before the breaker opened
+            self._outcomes.append((now, ok))
+            self._trim(now)
+            if not ok:
+                self.counters[reason] += 1
+                failures = sum(1 for _, success in self._outcomes if not success)
+                tripped = len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate
+                if tripped and self.enabled:
+                    self._open(now, f"{failures}/{len(self._outcomes)} failed in {self.window_seconds:.0f}s")
+
+    def release(self, probe: bool, generation: int | None = None) -> None:
+        """Give back a probe slot for a call cancelled before it finished (no outcome)."""
+        if probe:
+            with self._lock:
+                if generation is None or generation == self.generation:
+                    self._probes = max(0, self._probes - 1)
+
+    def record_timeout(self, generation: int | None = None) -> None:
+        """An attempt admitted by guard() ran out of time (outer asyncio.wait_for).
+
+        Pass the ``generation`` read before the attempt started, so a timeout from before
+        the last open/close is ignored like any other late result.
+        """
+        self.record(False, reason="timeout", generation=generation)
+
+    @contextmanager
+    def guard(self):
+        """Wrap one model call: raises CircuitOpenError when open, records the outcome otherwise.
+
+        Cancellation (client disconnect, outer timeout) records nothing here; callers
+        report outer timeouts with record_timeout().
+        """
+        probe, generation = self.acquire()
+        try:
+            yield
+        except asyncio.CancelledError:
+            self.release(probe, generation)
+            raise
+        except Exception as e:
+            if is_outage(e):
+                timed_out = isinstance(e, TimeoutError) or "Timeout" in type(e).__name__  # httpx.ReadTimeout etc.
+                self.record(False, probe, reason="timeout" if timed_out else "error", generation=generation)
+            else:
+                self.record(True, probe, generation=generation)  # the model path answered; the request itself was bad
+            raise
+        else:
+            self.record(True, probe, generation=generation)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            result = {
+                "state": self.state,
+                "generation": self.generation,
+                "recentCalls": len(self._outcomes),
+                "recentFailureRate": round(failures / len(self._outcomes), 3) if self._outcomes else 0.0,
+                **self.counters,
+            }
+            if self.state == OPEN:
+                result["retryInSeconds"] = round(self._retry_after(now), 1)
+            return result
@@ -0,0 +1,52 @@
+"""Build-time assets (run in the Docker build): reference-contract prompt text and gzipped static files."""
+
+import gzip
+import os
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(ROOT_DIR, "data")
+BUILD_DIR = os.path.join(DATA_DIR, "build")
+
+GZIP_SOURCES = {
+    "index.html": os.path.join(ROOT_DIR, "static", "index.html"),
+    "fallback.json": os.path.join(DATA_DIR, "fallback_analysis.json"),
+}
+
+
+def gzip_path(name: str) -> str:
+    return os.path.join(BUILD_DIR, f"{name}.gz")
+
+
+def read_if_fresh(build_path: str, source_path: str | list[str], mode: str = "rb"):
+    """Return a build artifact only if it is newer than its source(s), else None."""
+    sources = [source_path] if isinstance(source_path, str) else source_path
+    try:
+        if os.path.getmtime(build_path) < max(os.path.getmtime(s) for s in sources):
+            return None
+        with open(build_path, mode, **({"encoding": "utf-8"} if "b" not in mode else {})) as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def main():
+    os.makedirs(BUILD_DIR, exist_ok=True)
+
+    from reference_templates import get_registry, prompt_build_path
+
+    for template in get_registry().templates.values():
+        with open(prompt_build_path(template.id), "w", encoding="utf-8") as f:
+            f.write(template.prompt_text)
+        print(f"wrote {os.path.relpath(prompt_build_path(template.id), ROOT_DIR)}")
+
+    for name, source in GZIP_SOURCES.items():
+        with open(source, "rb") as f:
+            raw = f.read()
+        out = gzip_path(name)
+        with open(out, "wb") as f:
+            f.write(gzip.compress(raw, compresslevel=9, mtime=0))
+        print(f"wrote {os.path.relpath(out, ROOT_DIR)} ({len(raw)} → {os.path.getsize(out)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""Record/replay of google-genai generate_content calls, keyed by request content (CASSETTE_MODE)."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from file_staging import content_digest
+
+logger = logging.getLogger("clearsign.cassette")
+
+CASSETTE_FORMAT_VERSION = 1
+# Replay never reaches the network, but the SDK refuses to build a client without a key
+REPLAY_API_KEY = "cassette-replay"
+
+# Config fields that vary per process/SDK version but do not change the model's answer.
+_VOLATILE_CONFIG_KEYS = ("http_options", "labels")
+
+
+class CassetteMissError(RuntimeError):
+    """Raised in replay mode when no cassette exists for a request."""
+
+
+# ---------------------------------------------------------------------------
+# Request canonicalization
+# ---------------------------------------------------------------------------
+
+def _canonical(obj):
+    """Reduce SDK request objects to JSON-safe data with stable ordering.
+
+    Raw bytes (uploaded contracts) are replaced by their SHA-256 so the key
+    is content-addressed without embedding the document itself. Staged file
+    handles (file_staging) key like the inline bytes they stand for, so a
+    recording made with uploads replays with inline bytes and vice versa.
+    """
+    if hasattr(obj, "model_dump"):
+        obj = obj.model_dump(exclude_none=True)
+    if isinstance(obj, dict):
+        file_data = obj.get("file_data")
+        digest = content_digest(file_data.get("file_uri")) if isinstance(file_data, dict) else None
+        if digest:
+            obj = {k: v for k, v in obj.items() if k != "file_data"}
+            obj["inline_data"] = {"data": f"sha256:{digest}", "mime_type": file_data.get("mime_type")}
+        return {str(k): _canonical(v) for k, v in obj.items() if v is not None}
+    if isinstance(obj, (list, tuple)):
+        return [_canonical(v) for v in obj]
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return "sha256:" + hashlib.sha256(bytes(obj)).hexdigest()
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+    return str(obj)
+
+
+def request_key(model: str, contents, config) -> str:
+    """Content address of a generate_content request."""
+    config_data = _canonical(config) if config is not None else {}
+    if isinstance(config_data, dict):
+        for key in _VOLATILE_CONFIG_KEYS:
+            config_data.pop(key, None)
+    payload = {
+        "v": CASSETTE_FORMAT_VERSION,
+        "model": model,
+        "contents": _canonical(contents),
+        "config": config_data,
+    }
+    blob = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _prompt_preview(contents, limit: int = 160) -> str:
+    """First text part of the request, for humans browsing the cassette directory."""
+    data = _canonical(contents)
+    stack = [data]
+    while stack:
+        item = stack.pop(0)
+        if isinstance(item, str):
+            return item[:limit]
+        if isinstance(item, dict):
+            if isinstance(item.get("text"), str):
+                return item["text"][:limit]
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+    return ""
+
+
+# ---------------------------------------------------------------------------
+# Store
+# ---------------------------------------------------------------------------
+
+class CassetteStore:
+    """One JSON file per request key: ``<dir>/<key[:2]>/<key>.json``."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "recorded": 0}
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> dict | None:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+        with self._lock:
+            self.stats["hits"] += 1
+        return entry
+
+    def put(self, key: str, entry: dict) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, path)
+        with self._lock:
+            self.stats["recorded"] += 1
+
+
+# ---------------------------------------------------------------------------
+# SDK patching
+# ---------------------------------------------------------------------------
+
+_state = {"mode": None, "store": None, "speed": 0.0}
+
+
+def _make_entry(model: str, contents, key: str, response, latency: float) -> dict:
+    return {
+        "version": CASSETTE_FORMAT_VERSION,
+        "key": key,
+        "model": model,
+        "promptPreview": _prompt_preview(contents),
+        "latencySeconds": round(latency, 4),
+        "recordedAt": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "response": response.model_dump(mode="json", exclude_none=True),
+    }
+
+
+def _replay_delay(entry: dict) -> float:
+    speed = _state["speed"]
+    if speed <= 0:
+        return 0.0
+    return float(entry.get("latencySeconds", 0.0)) / speed
+
+
+def _load_response(entry: dict):
+    from google.genai import types
+
+    return types.GenerateContentResponse.model_validate(entry["response"])
+
+
+def _lookup(model: str, contents, config):
+    key = request_key(model, contents, config)
+    entry = _state["store"].get(key)
+    if entry is None:
+        raise CassetteMissError(f"No cassette for {model} request {key[:12]} ({_prompt_preview(contents, 60)!r})")
+    return entry
+
+
+def install(mode: str, directory: str, speed: float = 0.0) -> None:
+    """Patch google-genai generate_content (sync + async) for record or replay.
+
+    ``speed`` only applies to replay: 0 serves instantly, 1.0 reproduces
+    recorded latency, N > 1 replays N times faster.
+    """
+    mode = (mode or "").strip().lower()
+    if mode not in ("record", "replay"):
+        raise ValueError(f"Unknown CASSETTE_MODE: {mode}")
+    if _state["mode"]:
+        return
+
+    from google.genai import models
+
+    _state.update(mode=mode, store=CassetteStore(directory), speed=speed)
+    sync_orig = models.Models.generate_content
+    async_orig = models.AsyncModels.generate_content
+
+    if mode == "record":
+
+        def generate_content(self, *, model, contents, config=None):
+            t0 = time.perf_counter()
+            response = sync_orig(self, model=model, contents=contents, config=config)
+            key = request_key(model, contents, config)
+            _state["store"].put(key, _make_entry(model, contents, key, response, time.perf_counter() - t0))
+            return response
+
+        async def agenerate_content(self, *, model, contents, config=None):
+            t0 = time.perf_counter()
+            response = await async_orig(self, model=model, contents=contents, config=config)
+            key = request_key(model, contents, config)
+            entry = _make_entry(model, contents, key, response, time.perf_counter() - t0)
+            await asyncio.to_thread(_state["store"].put, key, entry)
+            return response
+
+    else:
+
+        def generate_content(self, *, model, contents, config=None):
+            entry = _lookup(model, contents, config)
+            delay = _replay_delay(entry)
+            if delay:
+                time.sleep(delay)
+            return _load_response(entry)
+
+        async def agenerate_content(self, *, model, contents, config=None):
+            entry = await asyncio.to_thread(_lookup, model, contents, config)
+            delay = _replay_delay(entry)
+            if delay:
+                await asyncio.sleep(delay)
+            return _load_response(entry)
+
+    models.Models.generate_content = generate_content
+    models.AsyncModels.generate_content = agenerate_content
+    if mode == "replay":
+        _default_replay_key()
+    logger.info(f"Cassette {mode} mode enabled (dir={directory}, speed={speed})")
+
+
+def _default_replay_key() -> None:
+    """Let clients built without a key (ADK agents read it from the environment) use REPLAY_API_KEY."""
+    from google.genai import client
+
+    init_orig = client.Client.__init__
+
+    def __init__(self, *args, api_key=None, **kwargs):
+        if not api_key and not kwargs.get("vertexai") and not (
+            os.environ.get("GOOGLE_API_KEY") or os.environ.get("GEMINI_API_KEY")
+        ):
+            api_key = REPLAY_API_KEY
+        init_orig(self, *args, api_key=api_key, **kwargs)
+
+    client.Client.__init__ = __init__
+
+
+def status() -> dict | None:
+    """Mode and hit/miss counters for /health, or None when disabled."""
+    if not _state["mode"]:
+        return None
+    return {"mode": _state["mode"], "speed": _state["speed"], **_state["store"].stats}
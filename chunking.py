@@ -0,0 +1,141 @@
+"""Page-group splitting of long uploads and merging of the per-group parser outputs (pypdf optional)."""
+
+import io
+import logging
+from dataclasses import dataclass, field
+
+from clauses import normalize_number
+
+logger = logging.getLogger("clearsign.chunking")
+
+CONTINUATION = "(이어짐)"
+
+CHUNK_PARSER_INSTRUCTION = """당신은 임대차 계약서 파싱 전문가입니다.
+아래 입력은 한 계약서의 {first_page}~{last_page}쪽입니다 (전체 {total_pages}쪽 중 일부).
+이 페이지들에 있는 모든 조항을 추출하세요.
+
+반드시 아래 JSON 형식으로 출력하세요:
+{{
+  "title": "계약서 제목 (이 페이지에 없으면 빈 문자열)",
+  "property_address": "임차 목적물 소재지 (이 페이지에 없으면 빈 문자열)",
+  "deposit_amount": 보증금(숫자, 이 페이지에 없으면 null),
+  "monthly_rent": 월세(숫자, 이 페이지에 없으면 null),
+  "clauses": [
+    {{
+      "number": "제N조",
+      "title": "조항 제목",
+      "body": "조항 전문"
+    }}
+  ]
+}}
+
+주의사항:
+- 첫 페이지 맨 앞이 앞쪽에서 이어지는 조항 본문이면, number를 "{continuation}"으로 하고 그 본문을 첫 항목으로 출력하세요.
+- 조항 번호가 없는 반복 머리글/바닥글(계약서 제목, 쪽 번호, 서명란 안내)은 제외하세요.
+- 특약사항은 number를 "특약사항"으로 하세요.
+- body에는 원문 그대로 기재하세요.
+- JSON만 출력하세요. 다른 텍스트는 포함하지 마세요."""
+
+
+@dataclass
+class Chunk:
+    """One page group: the parts to send and the 1-based page range they cover."""
+    parts: list[tuple[bytes, str]] = field(default_factory=list)
+    first_page: int = 1
+    last_page: int = 1
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(len(data) for data, _ in self.parts)
+
+    def prompt(self, total_pages: int) -> str:
+        return CHUNK_PARSER_INSTRUCTION.format(
+            first_page=self.first_page,
+            last_page=self.last_page,
+            total_pages=total_pages,
+            continuation=CONTINUATION,
+        )
+
+
+def split_pdf(pdf_bytes: bytes, pages_per_chunk: int) -> list[Chunk] | None:
+    """Split a PDF into page groups; None if pypdf is missing or the file can't be read."""
+    try:
+        from pypdf import PdfReader, PdfWriter
+    except ImportError:
+        logger.info("pypdf not installed — PDFs are parsed whole")
+        return None
+    try:
+        reader = PdfReader(io.BytesIO(pdf_bytes))
+        total = len(reader.pages)
+        chunks = []
+        for start in range(0, total, pages_per_chunk):
+            writer = PdfWriter()
+            for index in range(start, min(start + pages_per_chunk, total)):
+                writer.add_page(reader.pages[index])
+            out = io.BytesIO()
+            writer.write(out)
+            chunks.append(Chunk([(out.getvalue(), "application/pdf")], start + 1, min(start + pages_per_chunk, total)))
+        return chunks
+    except Exception as e:
+        logger.warning(f"PDF split failed ({e}) — parsing whole document")
+        return None
+
+
+def plan_chunks(uploads: list[tuple[bytes, str]], page_count: int, pages_per_chunk: int, min_pages: int) -> list[Chunk] | None:
+    """Page groups for chunked parsing, or None when the upload should be parsed whole.
+
+    Multi-image uploads are always chunked (one image = one page); a single PDF is
+    chunked once it reaches ``min_pages``.
+    """
+    pages_per_chunk = max(1, pages_per_chunk)
+    if len(uploads) > 1:
+        return [
+            Chunk(uploads[i:i + pages_per_chunk], i + 1, min(i + pages_per_chunk, len(uploads)))
+            for i in range(0, len(uploads), pages_per_chunk)
+        ]
+    data, mime_type = uploads[0]
+    if mime_type == "application/pdf" and page_count >= max(2, min_pages):
+        chunks = split_pdf(data, pages_per_chunk)
+        if chunks and len(chunks) > 1:
+            return chunks
+    return None
+
+
+def _is_continuation(number: str) -> bool:
+    return not number or "이어짐" in number
+
+
+def merge_parsed(parts: list[dict]) -> dict:
+    """Merge per-chunk parser outputs (in page order) into one parsed_document."""
+    merged = {"title": "", "property_address": "", "deposit_amount": None, "monthly_rent": None, "clauses": []}
+    by_number: dict[str, dict] = {}
+    for parsed in parts:
+        for key in ("title", "property_address", "deposit_amount", "monthly_rent"):
+            if not merged[key] and parsed.get(key):
+                merged[key] = parsed[key]
+        for clause in parsed.get("clauses", []) or []:
+            if not isinstance(clause, dict):
+                continue
+            number = normalize_number(clause.get("number"))
+            body = (clause.get("body") or "").strip()
+            last = merged["clauses"][-1] if merged["clauses"] else None
+            if _is_continuation(number):
+                # Article that runs across a page-group boundary
+                if last is not None and body:
+                    last["body"] = f"{last['body']}\n{body}".strip()
+                continue
+            existing = by_number.get(number)
+            if existing is not None:
+                # Repeated header (same article restated on the next page, page furniture) —
+                # keep one copy, appending only text not already present
+                if body and body not in existing["body"]:
+                    existing["body"] = f"{existing['body']}\n{body}".strip()
+                continue
+            entry = {"number": number, "title": (clause.get("title") or "").strip(), "body": body}
+            merged["clauses"].append(entry)
+            by_number[number] = entry
+    if merged["deposit_amount"] is None:
+        merged["deposit_amount"] = 50000000
+    if merged["monthly_rent"] is None:
+        merged["monthly_rent"] = 500000
+    return merged
@@ -0,0 +1,233 @@
+"""Clause index — 조항 번호로 원문(original / standard / body)을 서버에서 채움"""
+
+import io
+import json
+import os
+import re
+from html.parser import HTMLParser
+
+STANDARD_CONTRACT_PATH = os.path.join(os.path.dirname(__file__), "data", "standard_contract.json")
+
+TEXT_MIME_TYPES = ("text/plain", "text/html", "text/csv", "text/rtf")
+
+# "제4조 (임대차 보증금의 반환)", "제 4 조【보증금】", "제4조 보증금의 반환" ...
+_ARTICLE_RE = re.compile(
+    r"(?m)^[ \t]*(제\s*(\d+)\s*조(?:\s*의\s*\d+)?)[ \t]*"
+    r"(?:[\(（【\[]\s*([^)）】\]\n]{1,40}?)\s*[\)）】\]])?"
+)
+_SPECIAL_RE = re.compile(r"(?m)^[ \t]*[\[【<]?\s*(특\s*약\s*사\s*항)\s*[\]】>]?[ \t]*:?")
+
+
+def normalize_number(number) -> str:
+    """Canonical clause ID: "제 4 조" → "제4조", "4" → "제4조"."""
+    text = re.sub(r"\s+", "", str(number or ""))
+    if text.isdigit():
+        return f"제{text}조"
+    return text
+
+
+# ---------------------------------------------------------------------------
+# Text extraction
+# ---------------------------------------------------------------------------
+
+class _HTMLText(HTMLParser):
+    _SKIP = {"style", "script", "head", "title"}
+    _BLOCK = {"p", "div", "br", "tr", "li", "h1", "h2", "h3", "h4", "table", "section"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: list[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._SKIP:
+            self._skip_depth += 1
+        elif tag in self._BLOCK:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in self._SKIP and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in self._BLOCK:
+            self.parts.append("\n")
+        elif tag in ("td", "th"):
+            self.parts.append(" ")
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+
+def extract_text(file_bytes: bytes, mime_type: str) -> str | None:
+    """Plain text of a text-based upload, or None for PDFs/images."""
+    if mime_type not in TEXT_MIME_TYPES:
+        return None
+    text = file_bytes.decode("utf-8", errors="replace")
+    if mime_type == "text/html":
+        parser = _HTMLText()
+        parser.feed(text)
+        parser.close()
+        text = "".join(parser.parts)
+    lines = (re.sub(r"[ \t ]+", " ", line).strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def pdf_text(file_bytes: bytes, max_pages: int = 2) -> str | None:
+    """Text layer of the first pages of a PDF (pypdf, optional); None for scans or without pypdf."""
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return None
+    try:
+        reader = PdfReader(io.BytesIO(file_bytes))
+        text = "\n".join(page.extract_text() or "" for page in reader.pages[:max_pages])
+    except Exception:
+        return None
+    lines = (re.sub(r"[ \t ]+", " ", line).strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line) or None
+
+
+def document_text(file_bytes: bytes, mime_type: str, max_pdf_pages: int = 2) -> str | None:
+    """Text of a text upload or of the first PDF pages' text layer; None for scans and images."""
+    if mime_type in TEXT_MIME_TYPES:
+        return extract_text(file_bytes, mime_type)
+    if mime_type == "application/pdf":
+        return pdf_text(file_bytes, max_pdf_pages)
+    return None
+
+
+def split_clauses(text: str) -> list[dict]:
+    """Split contract text into [{number, title, body}] on 제N조 / 특약사항 headings."""
+    marks = []
+    for m in _ARTICLE_RE.finditer(text):
+        marks.append((m.start(), m.end(), normalize_number(m.group(1)), (m.group(3) or "").strip()))
+    for m in _SPECIAL_RE.finditer(text):
+        if not any(start <= m.start() < end for start, end, _, _ in marks):
+            marks.append((m.start(), m.end(), "특약사항", "특약사항"))
+    marks.sort()
+    # A repeated number is a cross-reference ("제2조 제③항에 따라 ..."), not a heading
+    seen = set()
+    headings = []
+    for mark in marks:
+        if mark[2] not in seen:
+            seen.add(mark[2])
+            headings.append(mark)
+
+    clauses = []
+    for i, (start, end, number, title) in enumerate(headings):
+        stop = headings[i + 1][0] if i + 1 < len(headings) else len(text)
+        body = text[end:stop].strip()
+        if not title:
+            # "제4조 보증금의 반환\n본문..." — first short line is the title
+            first, _, rest = body.partition("\n")
+            if rest and len(first) <= 30:
+                title, body = first.strip(), rest.strip()
+        if body:
+            clauses.append({"number": number, "title": title, "body": body})
+    return clauses
+
+
+def parse_document_clauses(file_bytes: bytes, mime_type: str, min_clauses: int = 3) -> list[dict] | None:
+    """Local clause index for text uploads; None when it cannot be built reliably."""
+    text = extract_text(file_bytes, mime_type)
+    if not text:
+        return None
+    clauses = split_clauses(text)
+    return clauses if len(clauses) >= min_clauses else None
+
+
+def clauses_from_parsed(parsed) -> list[dict]:
+    """Clause list from the parser agent's parsed_document (dict or JSON text)."""
+    if isinstance(parsed, str):
+        try:
+            parsed = json.loads(parsed)
+        except ValueError:
+            return []
+    if not isinstance(parsed, dict):
+        return []
+    return [c for c in parsed.get("clauses", []) if isinstance(c, dict)]
+
+
+# ---------------------------------------------------------------------------
+# Standard contract index
+# ---------------------------------------------------------------------------
+
+_standard_cache: dict[str, dict[str, dict]] = {}
+
+
+def load_standard_clauses(path: str = STANDARD_CONTRACT_PATH) -> dict[str, dict]:
+    """Standard contract clauses keyed by normalized number (loaded once)."""
+    index = _standard_cache.get(path)
+    if index is None:
+        with open(path, "r", encoding="utf-8") as f:
+            doc = json.load(f)
+        index = {normalize_number(c["number"]): c for c in doc.get("clauses", [])}
+        _standard_cache[path] = index
+    return index
+
+
+def match_by_title(title: str, index: dict[str, dict]) -> dict | None:
+    """Best standard clause for a title by shared 2-character shingles."""
+    def shingles(s):
+        s = re.sub(r"\s+", "", s or "")
+        return {s[i:i + 2] for i in range(len(s) - 1)}
+
+    target = shingles(title)
+    if not target:
+        return None
+    best, best_score = None, 0.0
+    for clause in index.values():
+        other = shingles(clause.get("title", ""))
+        if not other:
+            continue
+        score = len(target & other) / len(target | other)
+        if score > best_score:
+            best, best_score = clause, score
+    return best if best_score >= 0.3 else None
+
+
+# ---------------------------------------------------------------------------
+# Hydration
+# ---------------------------------------------------------------------------
+
+def hydrate_report(data: dict, document_clauses: list[dict] | None, standard: dict[str, dict] | None = None) -> dict:
+    """Fill original/standard/body from source documents into an ID-referenced report.
+
+    Server-side text wins over anything the model echoed; the model's text is
+    kept only when the clause cannot be found in the source. Helper fields
+    (standardRef, documentClauses) are removed so the frontend schema is unchanged.
+    """
+    standard = standard if standard is not None else load_standard_clauses()
+    doc_index = {normalize_number(c.get("number")): c for c in (document_clauses or []) if c.get("number")}
+
+    for clause in data.get("clauses", []):
+        number = normalize_number(clause.get("number"))
+        source = doc_index.get(number)
+        if source and source.get("body"):
+            clause["original"] = source["body"]
+        clause.setdefault("original", "")
+
+        ref = normalize_number(clause.pop("standardRef", "") or "")
+        std = standard.get(ref) or (
+            standard.get(number) if _titles_agree(clause, standard.get(number)) else None
+        ) or match_by_title(clause.get("title", ""), standard)
+        if std:
+            clause["standard"] = std["body"]
+        clause.setdefault("standard", "")
+
+    for safe in data.get("safeClausesSummary", []):
+        source = doc_index.get(normalize_number(safe.get("number")))
+        if source and source.get("body"):
+            safe["body"] = source["body"]
+        safe.setdefault("body", "")
+
+    data.pop("documentClauses", None)
+    return data
+
+
+def _titles_agree(clause: dict, std: dict | None) -> bool:
+    if not std:
+        return False
+    if not clause.get("title"):
+        return True
+    return match_by_title(clause["title"], {"x": std}) is not None
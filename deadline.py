@@ -0,0 +1,98 @@
+"""Per-request deadline shared by every model attempt, with cancellation on client disconnect."""
+
+import asyncio
+import contextvars
+import logging
+import time
+
+logger = logging.getLogger("clearsign.deadline")
+
+# Headroom kept for validation/serialization after the last model call
+RESPONSE_RESERVE_SECONDS = 1.0
+
+_current: contextvars.ContextVar["Deadline | None"] = contextvars.ContextVar("clearsign_deadline", default=None)
+
+
+class ClientDisconnected(Exception):
+    """The client went away before the response was ready."""
+
+
+class Deadline:
+    def __init__(self, budget_seconds: float):
+        self.budget = budget_seconds
+        self.expires_at = time.monotonic() + budget_seconds
+
+    def elapsed(self) -> float:
+        return time.monotonic() - (self.expires_at - self.budget)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic() - RESPONSE_RESERVE_SECONDS)
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def allot(self, share: float = 1.0, cap: float | None = None) -> float:
+        """Seconds for the next attempt: ``share`` of what is left, at most ``cap``."""
+        seconds = self.remaining() * share
+        return min(seconds, cap) if cap else seconds
+
+    def activate(self) -> contextvars.Token:
+        return _current.set(self)
+
+    @staticmethod
+    def reset(token: contextvars.Token) -> None:
+        _current.reset(token)
+
+
+def current() -> Deadline | None:
+    return _current.get()
+
+
+def detached(coro, budget_seconds: float | None = None) -> asyncio.Task:
+    """Background task that outlives the request: it gets its own deadline, not the request's.
+
+    Tasks copy the creating context, so without this a prefetch started during /api/analyze
+    would have its model calls capped by (and time out against) the analysis budget.
+    """
+    context = contextvars.copy_context()
+    context.run(_current.set, Deadline(budget_seconds) if budget_seconds else None)
+    return asyncio.get_running_loop().create_task(coro, context=context)
+
+
+def http_options(floor_seconds: float = 1.0):
+    """HttpOptions capping one model call at the current request's remaining time (None if unbounded)."""
+    deadline = _current.get()
+    if deadline is None:
+        return None
+    from google.genai import types
+
+    # google-genai takes the timeout in milliseconds
+    return types.HttpOptions(timeout=int(max(floor_seconds, deadline.remaining()) * 1000))
+
+
+async def _wait_for_disconnect(request) -> None:
+    # The body is already read, so the next ASGI message is the disconnect. Polling
+    # request.is_disconnected() misses it behind BaseHTTPMiddleware (enforce_quota).
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+
+async def run_until_disconnected(request, coro):
+    """Await ``coro``, cancelling it (and every model call under it) if the client disconnects."""
+    task = asyncio.ensure_future(coro)
+    watcher = asyncio.ensure_future(_wait_for_disconnect(request))
+    try:
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+        if task.done():
+            return task.result()
+        task.cancel()
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
+        raise ClientDisconnected()
+    finally:
+        for pending in (task, watcher):
+            if not pending.done():
+                pending.cancel()
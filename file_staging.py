@@ -0,0 +1,161 @@
+"""Upload a contract to the Gemini Files API once and reuse the file handle across attempts and agents."""
+
+import asyncio
+import hashlib
+import io
+import logging
+import time
+from collections import Counter
+
+logger = logging.getLogger("clearsign.staging")
+
+NAMESPACE = "files"
+# Gemini deletes uploaded files after 48h; our handles must expire before that
+PROVIDER_RETENTION_SECONDS = 47 * 60 * 60
+SWEEP_INTERVAL_SECONDS = 60
+ACTIVE_POLL_SECONDS = 0.5
+
+# file_uri -> (sha256 hex, expires_at) for handles this process has handed out (see cassette._canonical)
+_staged: dict[str, tuple[str, float]] = {}
+
+
+def content_digest(file_uri: str | None) -> str | None:
+    """SHA-256 of the document behind a staged file URI, if this process staged it."""
+    item = _staged.get(file_uri or "")
+    return item[0] if item else None
+
+
+class FileStager:
+    """Turns an uploaded document into a Part, uploading it at most once per content hash."""
+
+    def __init__(
+        self,
+        store,
+        ttl_seconds: float = 3600,
+        min_bytes: int = 1024 * 1024,
+        reuse_margin_seconds: float = 180,
+        enabled: bool = True,
+    ):
+        self.store = store
+        self.ttl_seconds = min(ttl_seconds, PROVIDER_RETENTION_SECONDS)
+        self.min_bytes = min_bytes
+        self.reuse_margin_seconds = reuse_margin_seconds
+        self.enabled = enabled
+        self._owned: dict[str, float] = {}  # uploaded file name -> expires_at
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._last_sweep = time.monotonic()
+        self._tasks: set[asyncio.Task] = set()
+        self.counters: Counter = Counter()
+
+    # -- staging ----------------------------------------------------------
+
+    async def part(self, client, data: bytes, mime_type: str, timeout: float | None = None):
+        """Part referencing ``data``: a reusable file handle, or inline bytes as the fallback.
+
+        ``timeout`` bounds this caller's wait, whether it uploads or joins an upload in flight.
+        """
+        from google.genai import types
+
+        if not self.enabled or len(data) < self.min_bytes or getattr(client, "vertexai", False):
+            self.counters["inline"] += 1
+            return types.Part.from_bytes(data=data, mime_type=mime_type)
+
+        digest = hashlib.sha256(data).hexdigest()
+        key = f"{digest}:{mime_type}"
+        try:
+            handle = await self._handle(client, key, data, mime_type, timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.counters["uploadFailed"] += 1
+            logger.warning(f"File staging failed ({type(e).__name__}: {e}) — inlining {len(data)} bytes")
+            return types.Part.from_bytes(data=data, mime_type=mime_type)
+
+        _staged[handle["uri"]] = (digest, handle["expiresAt"])
+        self._schedule_sweep(client)
+        return types.Part.from_uri(file_uri=handle["uri"], mime_type=mime_type)
+
+    async def _handle(self, client, key: str, data: bytes, mime_type: str, timeout: float | None) -> dict:
+        cached = await asyncio.to_thread(self.store.get_json, NAMESPACE, key)
+        if cached and cached["expiresAt"] - time.time() > self.reuse_margin_seconds:
+            self.counters["reused"] += 1
+            return cached
+        # Concurrent requests for the same document in this worker share one upload, but each
+        # waits only as long as its own budget allows (the upload runs on the first caller's)
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.counters["reused"] += 1
+            return await asyncio.wait_for(asyncio.shield(pending), timeout)
+        pending = asyncio.ensure_future(asyncio.wait_for(self._upload(client, key, data, mime_type), timeout))
+        self._inflight[key] = pending
+        pending.add_done_callback(lambda f: self._upload_done(key, f))
+        return await asyncio.shield(pending)
+
+    def _upload_done(self, key: str, future: asyncio.Future) -> None:
+        self._inflight.pop(key, None)
+        if not future.cancelled():
+            future.exception()  # retrieved here in case every waiter was cancelled
+
+    async def _upload(self, client, key: str, data: bytes, mime_type: str) -> dict:
+        from google.genai import types
+
+        t0 = time.perf_counter()
+        file = await client.aio.files.upload(
+            file=io.BytesIO(data),
+            config=types.UploadFileConfig(mime_type=mime_type, display_name=f"clearsign-{key[:16]}"),
+        )
+        # Documents are usually ACTIVE at once; wait out a short PROCESSING state otherwise
+        while file.state and file.state.name == "PROCESSING":
+            await asyncio.sleep(ACTIVE_POLL_SECONDS)
+            file = await client.aio.files.get(name=file.name)
+        if file.state and file.state.name == "FAILED":
+            raise RuntimeError(f"Provider could not process {file.name}")
+
+        expires_at = time.time() + self.ttl_seconds
+        handle = {"name": file.name, "uri": file.uri, "mimeType": mime_type, "expiresAt": expires_at}
+        self._owned[file.name] = expires_at
+        await asyncio.to_thread(self.store.set_json, NAMESPACE, key, handle, self.ttl_seconds)
+        self.counters["uploads"] += 1
+        self.counters["uploadedBytes"] += len(data)
+        logger.info(f"Staged {len(data)} bytes as {file.name} in {time.perf_counter() - t0:.2f}s")
+        return handle
+
+    # -- expiry -----------------------------------------------------------
+
+    def _schedule_sweep(self, client) -> None:
+        if time.monotonic() - self._last_sweep < SWEEP_INTERVAL_SECONDS:
+            return
+        self._last_sweep = time.monotonic()
+        task = asyncio.create_task(self.sweep(client))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def sweep(self, client) -> int:
+        """Delete files this worker uploaded whose handles have expired."""
+        now = time.time()
+        for uri, (_, expires_at) in list(_staged.items()):
+            if expires_at <= now:
+                _staged.pop(uri, None)
+        expired = [name for name, expires_at in self._owned.items() if expires_at <= now]
+        deleted = 0
+        for name in expired:
+            try:
+                await client.aio.files.delete(name=name)
+                deleted += 1
+            except Exception as e:
+                # Already gone (provider retention) or transient; either way stop tracking it
+                logger.warning(f"Staged file delete failed for {name}: {e}")
+            self._owned.pop(name, None)  # the shared-store entry expires on its own TTL
+        if deleted:
+            self.counters["deleted"] += deleted
+            logger.info(f"Deleted {deleted} expired staged file(s)")
+        return deleted
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "minBytes": self.min_bytes,
+            "ttlSeconds": self.ttl_seconds,
+            "owned": len(self._owned),
+            **self.counters,
+        }
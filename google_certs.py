@@ -0,0 +1,128 @@
+"""Google ID token verification with a cached, background-refreshed signing-key set."""
+
+import asyncio
+import logging
+import re
+import time
+
+import httpx
+from google.auth import jwt
+
+logger = logging.getLogger("clearsign.google_certs")
+
+DEFAULT_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+def cache_lifetime(headers, default_ttl: float) -> float:
+    """Seconds the response may be cached: max-age minus Age, else ``default_ttl``."""
+    cache_control = headers.get("cache-control", "")
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return 0.0
+    match = _MAX_AGE_RE.search(cache_control)
+    if not match:
+        return default_ttl
+    try:
+        age = float(headers.get("age", 0))
+    except ValueError:
+        age = 0.0
+    return max(0.0, int(match.group(1)) - age)
+
+
+class GoogleCertCache:
+    def __init__(
+        self,
+        url: str = DEFAULT_CERTS_URL,
+        default_ttl: float = 3600,
+        min_ttl: float = 60,
+        refresh_ahead: float = 300,
+        unknown_kid_interval: float = 30,
+        timeout: float = 10.0,
+    ):
+        self.url = url
+        self.default_ttl = default_ttl
+        self.min_ttl = min_ttl
+        self.refresh_ahead = refresh_ahead
+        self.unknown_kid_interval = unknown_kid_interval
+        self.timeout = timeout
+        self._certs: dict[str, str] = {}
+        self._expires_at = 0.0
+        self._fetched_at = 0.0
+        self._ttl = 0.0
+        self._inflight: asyncio.Task | None = None
+        self._client: httpx.AsyncClient | None = None
+        self.counters = {"fetches": 0, "fetchErrors": 0, "hits": 0, "coalesced": 0}
+
+    async def _fetch(self) -> dict[str, str]:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+        self.counters["fetches"] += 1
+        try:
+            response = await self._client.get(self.url)
+            response.raise_for_status()
+            certs = response.json()
+        except Exception:
+            self.counters["fetchErrors"] += 1
+            raise
+        ttl = max(self.min_ttl, cache_lifetime(response.headers, self.default_ttl))
+        now = time.monotonic()
+        self._certs, self._fetched_at, self._expires_at, self._ttl = certs, now, now + ttl, ttl
+        logger.info(f"Fetched {len(certs)} Google signing cert(s), cached for {ttl:.0f}s")
+        return certs
+
+    def refresh(self) -> asyncio.Task:
+        """Start (or join) the single in-flight fetch."""
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.create_task(self._fetch())
+            self._inflight.add_done_callback(_log_background_failure)
+        else:
+            self.counters["coalesced"] += 1
+        return self._inflight
+
+    async def get_certs(self) -> dict[str, str]:
+        now = time.monotonic()
+        if self._certs and now < self._expires_at:
+            self.counters["hits"] += 1
+            # Refresh window is capped at 10% of the lifetime so short max-ages don't refetch on every hit
+            if self._expires_at - now < min(self.refresh_ahead, self._ttl * 0.1):
+                self.refresh()  # refresh ahead of expiry without blocking this login
+            return self._certs
+        try:
+            return await asyncio.shield(self.refresh())
+        except Exception as e:
+            if self._certs:
+                # Google unreachable: keep verifying with the last known keys
+                logger.warning(f"Google cert refresh failed ({e}) — using stale certs")
+                return self._certs
+            raise
+
+    async def verify(self, token: str, audience: str, clock_skew_seconds: int = 10) -> dict:
+        """Verify signature, exp/iat and audience locally; raises ValueError when invalid."""
+        certs = await self.get_certs()
+        kid = jwt.decode_header(token).get("kid")
+        if kid and kid not in certs and time.monotonic() - self._fetched_at > self.unknown_kid_interval:
+            # Keys rotated since the last fetch
+            certs = await asyncio.shield(self.refresh())
+        return jwt.decode(token, certs=certs, audience=audience, clock_skew_in_seconds=clock_skew_seconds)
+
+    async def close(self) -> None:
+        if self._inflight and not self._inflight.done():
+            self._inflight.cancel()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> dict:
+        remaining = self._expires_at - time.monotonic()
+        return {
+            "url": self.url,
+            "keys": sorted(self._certs),
+            "expiresInSeconds": round(remaining, 1) if self._certs else None,
+            **self.counters,
+        }
+
+
+def _log_background_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Google cert refresh failed: {task.exception()}")
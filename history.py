@@ -0,0 +1,180 @@
+"""Per-user analysis history in SQLite (zlib-compressed reports, cursor pagination)."""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+
+logger = logging.getLogger("clearsign.history")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    doc_sha256 TEXT NOT NULL,
+    filename TEXT NOT NULL DEFAULT '',
+    mime_type TEXT NOT NULL DEFAULT '',
+    risk_level TEXT NOT NULL DEFAULT '',
+    total_max_risk INTEGER NOT NULL DEFAULT 0,
+    deviated_count INTEGER NOT NULL DEFAULT 0,
+    result BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS analyses_user_time ON analyses (user_id, created_at DESC, id DESC);
+CREATE UNIQUE INDEX IF NOT EXISTS analyses_user_doc ON analyses (user_id, doc_sha256);
+"""
+
+_LIST_COLUMNS = "id, created_at, filename, mime_type, risk_level, total_max_risk, deviated_count, LENGTH(result)"
+
+
+def _encode_cursor(created_at: float, analysis_id: str) -> str:
+    return f"{created_at:.6f}_{analysis_id}"
+
+
+def _decode_cursor(cursor: str) -> tuple[float, str] | None:
+    created_at, _, analysis_id = (cursor or "").partition("_")
+    try:
+        return float(created_at), analysis_id
+    except ValueError:
+        return None
+
+
+def on_container_disk(path: str) -> bool:
+    """Whether ``path`` is on the container's own filesystem rather than a mounted volume.
+
+    On Cloud Run that filesystem is discarded with the instance (every scale-to-zero cold start)
+    and is not shared between instances.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    while not os.path.exists(directory):
+        directory = os.path.dirname(directory)
+    return os.stat(directory).st_dev == os.stat("/").st_dev
+
+
+class HistoryStore:
+    """Per-user analysis history with bounded retention."""
+
+    def __init__(self, path: str, max_per_user: int = 50, retention_days: float = 90):
+        self.path = path
+        self.max_per_user = max_per_user
+        self.retention_days = retention_days
+        self.persistent = not on_container_disk(path)
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(_SCHEMA)
+
+    def add(self, user_id: str, result: dict, doc_sha256: str, filename: str = "", mime_type: str = "") -> str:
+        """Store (or refresh) one analysis; re-analyzing the same document keeps its ID."""
+        summary = result.get("summary", {})
+        blob = zlib.compress(json.dumps(result, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 6)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM analyses WHERE user_id = ? AND doc_sha256 = ?",
+                (user_id, doc_sha256),
+            ).fetchone()
+            analysis_id = row[0] if row else uuid.uuid4().hex
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analyses "
+                "(id, user_id, created_at, doc_sha256, filename, mime_type, risk_level, total_max_risk, deviated_count, result) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    analysis_id, user_id, now, doc_sha256, filename or "", mime_type or "",
+                    str(summary.get("riskLevel", "")),
+                    int(summary.get("totalMaxRisk", 0) or 0),
+                    int(summary.get("deviatedClauseCount", 0) or 0),
+                    sqlite3.Binary(blob),
+                ),
+            )
+            if self.max_per_user > 0:
+                # Keep only the newest max_per_user rows for this user
+                self._conn.execute(
+                    "DELETE FROM analyses WHERE user_id = ? AND id NOT IN ("
+                    "SELECT id FROM analyses WHERE user_id = ? ORDER BY created_at DESC, id DESC LIMIT ?)",
+                    (user_id, user_id, self.max_per_user),
+                )
+        return analysis_id
+
+    def list(self, user_id: str, limit: int = 20, cursor: str | None = None) -> dict:
+        """One page of a user's analyses (newest first) without decompressing results."""
+        limit = max(1, min(int(limit), 100))
+        params: list = [user_id, self._cutoff()]
+        where = "user_id = ? AND created_at >= ?"
+        position = _decode_cursor(cursor) if cursor else None
+        if position:
+            where += " AND (created_at < ? OR (created_at = ? AND id < ?))"
+            params += [position[0], position[0], position[1]]
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_LIST_COLUMNS} FROM analyses WHERE {where} "
+                "ORDER BY created_at DESC, id DESC LIMIT ?",
+                (*params, limit + 1),
+            ).fetchall()
+        items = [
+            {
+                "id": r[0],
+                "createdAt": round(r[1], 3),
+                "filename": r[2],
+                "mimeType": r[3],
+                "riskLevel": r[4],
+                "totalMaxRisk": r[5],
+                "deviatedClauseCount": r[6],
+                "storedBytes": r[7],
+            }
+            for r in rows[:limit]
+        ]
+        next_cursor = _encode_cursor(rows[limit - 1][1], rows[limit - 1][0]) if len(rows) > limit else None
+        return {"items": items, "nextCursor": next_cursor}
+
+    def get(self, user_id: str, analysis_id: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, created_at FROM analyses WHERE id = ? AND user_id = ?",
+                (analysis_id, user_id),
+            ).fetchone()
+        if row is None or row[1] < self._cutoff():
+            return None
+        try:
+            return json.loads(zlib.decompress(row[0]))
+        except (zlib.error, ValueError):
+            return None
+
+    def delete(self, user_id: str, analysis_id: str) -> bool:
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM analyses WHERE id = ? AND user_id = ?", (analysis_id, user_id))
+        return cur.rowcount == 1
+
+    def _cutoff(self) -> float:
+        return time.time() - self.retention_days * 86400 if self.retention_days > 0 else 0.0
+
+    def purge_expired(self) -> int:
+        """Delete analyses older than the retention period."""
+        if self.retention_days <= 0:
+            return 0
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM analyses WHERE created_at < ?", (self._cutoff(),))
+        if cur.rowcount:
+            logger.info(f"Purged {cur.rowcount} expired history entries")
+        return cur.rowcount
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, users, size = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT user_id), COALESCE(SUM(LENGTH(result)), 0) FROM analyses"
+            ).fetchone()
+        return {
+            "entries": count,
+            "users": users,
+            "bytes": size,
+            "persistent": self.persistent,
+            "maxPerUser": self.max_per_user,
+            "retentionDays": self.retention_days,
+        }
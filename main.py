@@ -1,18 +1,41 @@
 """ClearSign — FastAPI Backend with ADK Pipeline + Fallback Chain"""
 
 import asyncio
+import gzip
+import hashlib
 import json
 import logging
 import os
+import sqlite3
+import time
 import traceback
 import uuid
+from collections import Counter
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, File, Request, UploadFile
+from fastapi import FastAPI, File, Query, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
+
+from breaker import OPEN, CircuitBreaker, CircuitOpenError
+from build_assets import gzip_path, read_if_fresh
+from chunking import Chunk, merge_parsed, plan_chunks
+from clauses import clauses_from_parsed, document_text, hydrate_report, parse_document_clauses
+from deadline import ClientDisconnected, Deadline, detached, run_until_disconnected
+from file_staging import FileStager
+from history import HistoryStore
+from model_router import DocumentProfile, get_router, profile_document
+from offline_engine import analyze_text, get_rules
+from property_address import address_from_parsed, cache_key as fraud_cache_key, extract_property_address
+from quota import QuotaLimiter, parse_limit
+from reference_templates import ReferenceTemplate, get_registry
+from scoring import score_quiz
+from shared_store import SharedStore
+from tiered import detail_key, find_clause, mark_pending, merge_detail, pending_count, prefetch_targets, validate_detail
+
+_STARTUP_T0 = time.perf_counter()  # import cost is in processAgeAtReady
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("clearsign")
@@ -20,13 +43,23 @@ logger = logging.getLogger("clearsign")
 # ---------------------------------------------------------------------------
 # Config
 # ---------------------------------------------------------------------------
+def _env_flag(name: str, default: bool) -> bool:
+    """Boolean environment variable: 1/true/yes/on (any case) is True, anything else False."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY", "")
-if not GEMINI_API_KEY:
+# Record/replay of model interactions (see cassette.py)
+CASSETTE_MODE = os.environ.get("CASSETTE_MODE", "").strip().lower()
+if not GEMINI_API_KEY and CASSETTE_MODE != "replay":
     logging.warning("GEMINI_API_KEY is not set — AI analysis will fall back to static data")
 GOOGLE_CLIENT_ID = os.environ.get("GOOGLE_CLIENT_ID", "")
 SESSION_SECRET = os.environ.get("SESSION_SECRET", "")
 SESSION_MAX_AGE_SECONDS = int(os.environ.get("SESSION_MAX_AGE_SECONDS", 7 * 24 * 60 * 60))
-COOKIE_SECURE = os.environ.get("COOKIE_SECURE", "true").strip().lower() in ("1", "true", "yes", "on")
+COOKIE_SECURE = _env_flag("COOKIE_SECURE", True)
 COOKIE_SAMESITE = os.environ.get("COOKIE_SAMESITE", "lax").strip().lower()
 if COOKIE_SAMESITE not in ("lax", "strict", "none"):
     COOKIE_SAMESITE = "lax"
@@ -44,6 +77,7 @@ CORS_ORIGINS = [origin.strip() for origin in CORS_ORIGINS_ENV.split(",") if orig
 SESSION_COOKIE_NAME = "clearsign_session"
 SESSION_COOKIE_SALT = "clearsign-auth-v1"
 GOOGLE_ISSUERS = {"accounts.google.com", "https://accounts.google.com"}
+GOOGLE_CERTS_URL = os.environ.get("GOOGLE_CERTS_URL", "https://www.googleapis.com/oauth2/v1/certs")
 
 if not GOOGLE_CLIENT_ID:
     logging.warning("GOOGLE_CLIENT_ID is not set — Google login disabled")
@@ -55,23 +89,203 @@ STATIC_DIR = os.path.join(os.path.dirname(__file__), "static")
 FALLBACK_PATH = os.path.join(DATA_DIR, "fallback_analysis.json")
 TIMEOUT_SECONDS = int(os.environ.get("TIMEOUT_SECONDS", 180))
 SINGLE_CALL_TIMEOUT = int(os.environ.get("SINGLE_CALL_TIMEOUT", 120))
+# One budget for the whole /api/analyze chain (below the frontend's 180s abort), split across attempts
+ANALYZE_DEADLINE_SECONDS = float(os.environ.get("ANALYZE_DEADLINE_SECONDS", 170))
+CHUNKED_PARSE_SHARE = 0.4  # of the remaining budget
+SINGLE_CALL_SHARE = 0.5  # of the remaining budget; the rest is left for the ADK pipeline
+MIN_ATTEMPT_SECONDS = 10  # don't start an attempt that can't finish
+ADK_SESSION_BACKEND = os.environ.get("ADK_SESSION_BACKEND", "memory")
+ADK_SESSION_DB_PATH = os.environ.get("ADK_SESSION_DB_PATH", os.path.join(DATA_DIR, "runtime", "adk_sessions.db"))
+ADK_SESSION_TTL_SECONDS = int(os.environ.get("ADK_SESSION_TTL_SECONDS", 600))
+ADK_SESSION_MAX = int(os.environ.get("ADK_SESSION_MAX", 64))
+ADK_SESSION_RETAIN = _env_flag("ADK_SESSION_RETAIN", False)
+
+# Fast cold-start mode for scale-to-zero: defer ADK import to first use, warm up in the background
+FAST_START = _env_flag("FAST_START", False)
+
+# Multi-worker serving: workers on one host share caches through a SQLite (WAL) file
+WEB_CONCURRENCY = os.environ.get("WEB_CONCURRENCY", "1").strip().lower()
+WORKER_MEMORY_MB = int(os.environ.get("WORKER_MEMORY_MB", 400))
+SHARED_STORE_PATH = os.environ.get("SHARED_STORE_PATH", os.path.join(DATA_DIR, "runtime", "shared.db"))
+SHARED_STORE_MAX_ENTRIES = int(os.environ.get("SHARED_STORE_MAX_ENTRIES", 10000))
+ANALYSIS_CACHE_TTL_SECONDS = int(os.environ.get("ANALYSIS_CACHE_TTL_SECONDS", 24 * 60 * 60))
+FRAUD_CACHE_TTL_SECONDS = int(os.environ.get("FRAUD_CACHE_TTL_SECONDS", 6 * 60 * 60))
+# Speculative fraud check: start the search as soon as the property address is known (see property_address.py)
+FRAUD_PREFETCH = _env_flag("FRAUD_PREFETCH", True)
+FRAUD_PREFETCH_CONCURRENCY = int(os.environ.get("FRAUD_PREFETCH_CONCURRENCY", 2))
+FRAUD_PREFETCH_TIMEOUT = 60  # seconds; a search nobody may ask for must not hold a slot for long
+# Bump when prompts or the output schema change so cached analyses are not reused
+CACHE_SCHEMA_VERSION = "4"
+
+# Tiered generation: core report first, per-clause detail when a clause is opened (see tiered.py)
+TIERED_ANALYSIS = _env_flag("TIERED_ANALYSIS", True)
+DETAIL_PREFETCH_COUNT = int(os.environ.get("DETAIL_PREFETCH_COUNT", 2))
+CLAUSE_DETAIL_TTL_SECONDS = int(os.environ.get("CLAUSE_DETAIL_TTL_SECONDS", 24 * 60 * 60))
+
+# Rule-based analysis of the actual upload when every model attempt fails (see offline_engine.py)
+OFFLINE_ANALYSIS = _env_flag("OFFLINE_ANALYSIS", True)
+OFFLINE_PDF_PAGES = 20  # text layer pages read for offline analysis (template selection reads 2)
+
+# Chunked parsing of long PDFs / multi-image uploads (see chunking.py)
+CHUNKED_PARSE_MIN_PAGES = int(os.environ.get("CHUNKED_PARSE_MIN_PAGES", 6))
+CHUNK_PAGES = int(os.environ.get("CHUNK_PAGES", 3))
+PARSE_CONCURRENCY = int(os.environ.get("PARSE_CONCURRENCY", 4))
+
+# Per-user analysis history for signed-in users (see history.py)
+HISTORY_DB_PATH = os.environ.get("HISTORY_DB_PATH", os.path.join(DATA_DIR, "runtime", "history.db"))
+HISTORY_MAX_PER_USER = int(os.environ.get("HISTORY_MAX_PER_USER", 50))
+HISTORY_RETENTION_DAYS = float(os.environ.get("HISTORY_RETENTION_DAYS", 90))
+# Cloud Run (K_SERVICE set) discards the container filesystem on every cold start: history needs a mounted volume
+HISTORY_REQUIRE_VOLUME = _env_flag("HISTORY_REQUIRE_VOLUME", bool(os.environ.get("K_SERVICE")))
+
+# Per-identity request quotas on model-backed endpoints (see quota.py); "N/S" = N requests per S seconds
+QUOTA_ENABLED = _env_flag("QUOTA_ENABLED", True)
+QUOTA_ANALYZE = os.environ.get("QUOTA_ANALYZE", "10/60")
+QUOTA_COMPREHENSION = os.environ.get("QUOTA_COMPREHENSION", "30/60")
+QUOTA_FRAUD_CHECK = os.environ.get("QUOTA_FRAUD_CHECK", "20/60")
+QUOTA_CLAUSE_DETAIL = os.environ.get("QUOTA_CLAUSE_DETAIL", "60/60")
+QUOTA_GLOBAL = os.environ.get("QUOTA_GLOBAL", "120/60")
+QUOTA_MAX_KEYS = int(os.environ.get("QUOTA_MAX_KEYS", 10000))
+QUOTA_IDLE_SECONDS = int(os.environ.get("QUOTA_IDLE_SECONDS", 600))
+# Number of trusted proxies in front of the app; 0 = use the socket peer address. Cloud Run (K_SERVICE set)
+# connects through its front end, so there the default is 1 — otherwise every anonymous client shares one bucket
+QUOTA_PROXY_HOPS = int(os.environ.get("QUOTA_PROXY_HOPS", 1 if os.environ.get("K_SERVICE") else 0))
+
+# Circuit breakers per model path (see breaker.py)
+BREAKER_ENABLED = _env_flag("BREAKER_ENABLED", True)
+BREAKER_FAILURE_RATE = float(os.environ.get("BREAKER_FAILURE_RATE", 0.5))
+BREAKER_MIN_CALLS = int(os.environ.get("BREAKER_MIN_CALLS", 4))
+BREAKER_WINDOW_SECONDS = float(os.environ.get("BREAKER_WINDOW_SECONDS", 60))
+BREAKER_OPEN_SECONDS = float(os.environ.get("BREAKER_OPEN_SECONDS", 30))
+BREAKER_MAX_OPEN_SECONDS = float(os.environ.get("BREAKER_MAX_OPEN_SECONDS", 300))
+
+# Upload-once file handles shared by every attempt and agent (see file_staging.py)
+FILE_STAGING_ENABLED = _env_flag("FILE_STAGING_ENABLED", True)
+FILE_STAGING_MIN_BYTES = int(os.environ.get("FILE_STAGING_MIN_BYTES", 1024 * 1024))
+FILE_STAGING_TTL_SECONDS = int(os.environ.get("FILE_STAGING_TTL_SECONDS", 60 * 60))
+FILE_STAGING_SHARE = 0.2  # of the remaining budget; uploads that take longer are inlined instead
+
+CASSETTE_DIR = os.environ.get("CASSETTE_DIR", os.path.join(os.path.dirname(__file__), "cassettes"))
+CASSETTE_REPLAY_SPEED = float(os.environ.get("CASSETTE_REPLAY_SPEED", 0))
+
+if CASSETTE_MODE:
+    import cassette
+
+    cassette.install(CASSETTE_MODE, CASSETTE_DIR, speed=CASSETTE_REPLAY_SPEED)
+# Key handed to the SDK clients; replay needs none, so it gets a placeholder instead of a real one
+MODEL_API_KEY = GEMINI_API_KEY or (cassette.REPLAY_API_KEY if CASSETTE_MODE == "replay" else "")
+
+_shared_store = SharedStore(SHARED_STORE_PATH, max_entries=SHARED_STORE_MAX_ENTRIES)
+try:
+    _history = HistoryStore(HISTORY_DB_PATH, HISTORY_MAX_PER_USER, HISTORY_RETENTION_DAYS)
+except sqlite3.Error as e:
+    logging.warning(f"History store unavailable at {HISTORY_DB_PATH} ({e}) — analysis history disabled")
+    _history = None
+if _history is not None and not _history.persistent:
+    if HISTORY_REQUIRE_VOLUME:
+        # Entries would vanish on the next cold start and differ between instances
+        logging.error(
+            f"History DB {HISTORY_DB_PATH} is on the container filesystem, not a mounted volume — "
+            f"analysis history disabled (mount a volume and point HISTORY_DB_PATH at it)"
+        )
+        _history = None
+    elif os.environ.get("K_SERVICE"):
+        logging.warning(
+            f"History DB {HISTORY_DB_PATH} is on the container filesystem — "
+            f"entries are lost on every cold start and not shared between instances"
+        )
+_router = get_router()
+_breakers = {
+    name: CircuitBreaker(
+        name,
+        failure_rate=BREAKER_FAILURE_RATE,
+        min_calls=BREAKER_MIN_CALLS,
+        window_seconds=BREAKER_WINDOW_SECONDS,
+        open_seconds=BREAKER_OPEN_SECONDS,
+        max_open_seconds=BREAKER_MAX_OPEN_SECONDS,
+        enabled=BREAKER_ENABLED,  # disabled: outcomes are still counted, the circuit never opens
+    )
+    for name in ("single", "parse", "adk", "search", "comprehension", "detail")
+}
+_file_stager = FileStager(
+    _shared_store,
+    ttl_seconds=FILE_STAGING_TTL_SECONDS,
+    min_bytes=FILE_STAGING_MIN_BYTES,
+    reuse_margin_seconds=ANALYZE_DEADLINE_SECONDS,  # a reused handle must outlive the request using it
+    enabled=FILE_STAGING_ENABLED and CASSETTE_MODE != "replay",  # replay never reaches the network
+)
+# Reference contracts (표준계약서 등), precompiled once per worker — see reference_templates.py
+_templates = get_registry()
+_risk_rules = get_rules()
+_quota = QuotaLimiter(
+    {
+        "analyze": parse_limit(QUOTA_ANALYZE),
+        "comprehension": parse_limit(QUOTA_COMPREHENSION),
+        "fraud-check": parse_limit(QUOTA_FRAUD_CHECK),
+        "clause-detail": parse_limit(QUOTA_CLAUSE_DETAIL),
+    },
+    parse_limit(QUOTA_GLOBAL),
+    max_keys=QUOTA_MAX_KEYS,
+    idle_seconds=QUOTA_IDLE_SECONDS,
+) if QUOTA_ENABLED else None
+
+# Startup phase timings (ms), reported in /health — time-to-first-/health-OK is what autoscalers see
+STARTUP_PHASES: dict[str, float] = {}
+
+
+def _mark_phase(name: str, started: float) -> None:
+    STARTUP_PHASES[name] = round((time.perf_counter() - started) * 1000, 1)
+
+
+def _process_age_ms() -> float | None:
+    """Milliseconds since the OS started this process (Linux only), covering interpreter/uvicorn boot."""
+    try:
+        with open("/proc/self/stat", "r") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime", "r") as f:
+            uptime = float(f.read().split()[0])
+        return round((uptime - start_ticks / os.sysconf("SC_CLK_TCK")) * 1000, 1)
+    except (OSError, ValueError, IndexError):
+        return None
 
 # ---------------------------------------------------------------------------
 # Pre-initialize ADK & Gemini (eliminate cold-start per request)
 # ---------------------------------------------------------------------------
 _adk_runner = None
 _adk_session_service = None
+_adk_sessions = None
+_adk_init_lock = asyncio.Lock()
+_google_certs = None
+# Bounds concurrent page-group parse calls across all requests in this worker
+_parse_semaphore = asyncio.Semaphore(max(1, PARSE_CONCURRENCY))
+# /api/analyze requests abandoned by the client / cut short by the request budget
+_analyze_counters = Counter({"cancelledOnDisconnect": 0, "deadlineExceeded": 0, "offline": 0})
+# On-demand clause details: one generation per detail key in this worker, prefetches kept referenced
+_detail_inflight: dict[str, asyncio.Future] = {}
+_detail_tasks: set[asyncio.Task] = set()
+_detail_counters = Counter({"generated": 0, "cacheHits": 0, "prefetched": 0, "failed": 0})
+# Speculative fraud checks: one search per address in this worker, at most FRAUD_PREFETCH_CONCURRENCY at once
+_fraud_inflight: dict[str, asyncio.Future] = {}
+_fraud_counters = Counter({"started": 0, "searched": 0, "alreadyCached": 0, "joined": 0, "skippedBusy": 0, "skippedOpen": 0})
 
 
 def _init_adk():
-    global _adk_runner, _adk_session_service
+    global _adk_runner, _adk_session_service, _adk_sessions
     try:
         from google.adk.runners import Runner
-        from google.adk.sessions import InMemorySessionService
 
+        from adk_sessions import SessionRegistry, create_session_service
         from agents import pipeline
 
-        _adk_session_service = InMemorySessionService()
+        _adk_session_service = create_session_service(ADK_SESSION_BACKEND, ADK_SESSION_DB_PATH)
+        _adk_sessions = SessionRegistry(
+            _adk_session_service,
+            app_name="clearsign",
+            ttl_seconds=ADK_SESSION_TTL_SECONDS,
+            max_sessions=ADK_SESSION_MAX,
+            retain=ADK_SESSION_RETAIN,
+            db_path=ADK_SESSION_DB_PATH if ADK_SESSION_BACKEND.strip().lower() == "sqlite" else None,
+        )
         _adk_runner = Runner(
             agent=pipeline,
             app_name="clearsign",
@@ -90,37 +304,83 @@ def _init_genai_client():
     try:
         from google import genai
 
-        _genai_client = genai.Client(api_key=GEMINI_API_KEY)
+        _genai_client = genai.Client(api_key=MODEL_API_KEY)
         logger.info("Gemini client pre-initialized")
     except Exception as e:
         logger.warning(f"Gemini client pre-init failed: {e}")
 
 
-if GEMINI_API_KEY:
+if MODEL_API_KEY and not FAST_START:
+    _t = time.perf_counter()
     _init_adk()
+    _mark_phase("adkInit", _t)
+    _t = time.perf_counter()
     _init_genai_client()
+    _mark_phase("genaiInit", _t)
 
 # ---------------------------------------------------------------------------
 # FastAPI App (with lifespan for Gemini warmup)
 # ---------------------------------------------------------------------------
 
 
+async def _warmup():
+    """Send a tiny request to prime the connection (creating the client first in fast-start mode)."""
+    if not MODEL_API_KEY:
+        return
+    t = time.perf_counter()
+    if _genai_client is None:
+        await asyncio.to_thread(_init_genai_client)
+        _mark_phase("genaiInit", t)
+    if _genai_client is None:
+        return
+    try:
+        route = _router.route("warmup")
+        await _genai_client.aio.models.generate_content(
+            model=route.model,
+            contents="ping",
+            config=_router.generate_config(route, max_output_tokens=1),
+        )
+        logger.info("Gemini warmup completed")
+    except Exception:
+        logger.warning("Gemini warmup failed (non-fatal)")
+    _mark_phase("warmup", t)
+
+
 @asynccontextmanager
 async def lifespan(app):
-    # Warmup: send a tiny request to prime the connection
-    if GEMINI_API_KEY and _genai_client:
-        try:
-            from google.genai import types
-
-            await _genai_client.aio.models.generate_content(
-                model="gemini-3-flash-preview",
-                contents="ping",
-                config=types.GenerateContentConfig(max_output_tokens=1),
-            )
-            logger.info("Gemini warmup completed")
-        except Exception:
-            logger.warning("Gemini warmup failed (non-fatal)")
+    STARTUP_PHASES["moduleInit"] = round((_MODULE_READY - _STARTUP_T0) * 1000, 1)
+    # Only one worker per host builds the shared artifacts; the rest reuse them
+    t = time.perf_counter()
+    if _shared_store.claim("startup", "assets", ttl=60):
+        _shared_store.purge_expired()
+        if _history is not None:
+            _history.purge_expired()
+        for name in SHARED_ASSETS:
+            _load_shared_asset(name)
+        logger.info(f"Shared assets primed by worker {os.getpid()}")
+    _mark_phase("sharedAssets", t)
+
+    warmup_task = None
+    if FAST_START:
+        # Serve /health immediately; the warmup finishes while the first requests arrive
+        warmup_task = asyncio.create_task(_warmup())
+    else:
+        await _warmup()
+    if is_google_login_enabled():
+        # Fetch signing keys before the first login; failures are retried on demand
+        _get_google_certs().refresh()
+    _mark_phase("ready", _STARTUP_T0)
+    STARTUP_PHASES["processAgeAtReady"] = _process_age_ms()
+    logger.info(f"[STARTUP] fast_start={FAST_START} phases(ms)={STARTUP_PHASES}")
     yield
+    if warmup_task and not warmup_task.done():
+        warmup_task.cancel()
+    for pending in list(_fraud_inflight.values()):
+        pending.cancel()
+    if _genai_client is not None:
+        await _file_stager.sweep(_genai_client)
+    if _google_certs is not None:
+        await _google_certs.close()
 
 
 app = FastAPI(title="ClearSign", version="1.0.0", lifespan=lifespan)
@@ -130,20 +390,109 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["RateLimit-Limit", "RateLimit-Remaining", "RateLimit-Reset", "RateLimit-Policy", "Retry-After"],
 )
 
+# Model-backed endpoints guarded by per-identity quotas
+QUOTA_ENDPOINTS = {
+    ("POST", "/api/analyze"): "analyze",
+    ("POST", "/api/comprehension"): "comprehension",
+    ("GET", "/api/fraud-check"): "fraud-check",
+}
+CLAUSE_DETAIL_PATH_PREFIX = "/api/analysis/"
+
+
+def _client_identity(request: Request) -> str:
+    """Quota key: signed-in user ID, else the client IP (behind QUOTA_PROXY_HOPS proxies)."""
+    user = _read_session_user(request)
+    if user:
+        return f"user:{user['id']}"
+    if QUOTA_PROXY_HOPS > 0:
+        forwarded = [p.strip() for p in request.headers.get("x-forwarded-for", "").split(",") if p.strip()]
+        if len(forwarded) >= QUOTA_PROXY_HOPS:
+            return f"ip:{forwarded[-QUOTA_PROXY_HOPS]}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+@app.middleware("http")
+async def enforce_quota(request: Request, call_next):
+    endpoint = QUOTA_ENDPOINTS.get((request.method, request.url.path)) if _quota else None
+    if _quota and request.method == "GET" and request.url.path.startswith(CLAUSE_DETAIL_PATH_PREFIX):
+        endpoint = "clause-detail"
+    if endpoint is None:
+        return await call_next(request)
+    decision = _quota.check(endpoint, _client_identity(request))
+    if not decision.allowed:
+        logger.info(f"Quota exceeded on {endpoint} ({decision.reason})")
+        return JSONResponse(
+            status_code=429,
+            content={"error": "요청이 너무 많습니다. 잠시 후 다시 시도해주세요.", "retryAfter": decision.retry_after},
+            headers=decision.headers(),
+        )
+    response = await call_next(request)
+    response.headers.update(decision.headers())
+    return response
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
+SHARED_ASSETS = {
+    "index.html": (os.path.join(STATIC_DIR, "index.html"), "text/html"),
+    "fallback.json": (FALLBACK_PATH, "application/json"),
+}
+_asset_cache: dict[str, tuple[str, tuple[bytes, bytes]]] = {}
+
+
+def _load_shared_asset(name: str) -> tuple[bytes, bytes]:
+    """Return (raw, gzip) bytes for a static asset, built once per host.
+
+    Keyed by file size + mtime so a redeploy invalidates the shared copy.
+    """
+    path, _ = SHARED_ASSETS[name]
+    st = os.stat(path)
+    key = f"{name}:{st.st_size}:{int(st.st_mtime)}"
+    cached = _asset_cache.get(name)
+    if cached and cached[0] == key:
+        return cached[1]
+
+    raw = _shared_store.get("assets", key + ":raw")
+    gz = _shared_store.get("assets", key + ":gz")
+    if raw is None or gz is None:
+        with open(path, "rb") as f:
+            raw = f.read()
+        gz = read_if_fresh(gzip_path(name), path) or gzip.compress(raw, compresslevel=9)
+        _shared_store.set("assets", key + ":raw", raw)
+        _shared_store.set("assets", key + ":gz", gz)
+    _asset_cache[name] = (key, (raw, gz))
+    return raw, gz
+
+
+def _asset_response(request: Request, name: str) -> Response:
+    """Serve a shared asset, gzip-encoded when the client accepts it."""
+    raw, gz = _load_shared_asset(name)
+    media_type = SHARED_ASSETS[name][1]
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        return Response(
+            content=gz,
+            media_type=media_type,
+            headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+        )
+    return Response(content=raw, media_type=media_type, headers={"Vary": "Accept-Encoding"})
+
+
 def load_fallback() -> dict:
     """Load pre-built fallback analysis JSON."""
-    with open(FALLBACK_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+    raw, _ = _load_shared_asset("fallback.json")
+    return json.loads(raw)
+
 
+def validate_output(data: dict, core: bool = False) -> bool:
+    """Validate that output matches the frontend-expected schema.
 
-def validate_output(data: dict) -> bool:
-    """Validate that output matches the frontend-expected schema."""
+    ``core`` reports (tiered generation) carry only level1 and the action type/priority;
+    the rest of each clause is filled in on demand.
+    """
     if not isinstance(data, dict):
         return False
     if "summary" not in data or "clauses" not in data:
@@ -157,12 +506,12 @@ def validate_output(data: dict) -> bool:
         if "easyKorean" not in clause:
             return False
         ek = clause["easyKorean"]
-        if not all(k in ek for k in ("level1", "level2", "level3")):
+        if not all(k in ek for k in (("level1",) if core else ("level1", "level2", "level3"))):
             return False
         if "action" not in clause:
             return False
         act = clause["action"]
-        if not all(k in act for k in ("type", "priority", "message")):
+        if not all(k in act for k in (("type", "priority") if core else ("type", "priority", "message"))):
             return False
     if "overallAction" not in data:
         return False
@@ -196,6 +545,74 @@ class GoogleAuthRequest(BaseModel):
     credential: str
 
 
+# Quiz text comes from the model, which sometimes emits numbers ("answer": 2 for "2개월")
+QuizText = str | int | float
+
+
+def _as_text(value):
+    """Numbers (and lists of them) as the strings the scorer compares; 2.0 → "2"."""
+    if isinstance(value, list):
+        return [_as_text(v) for v in value]
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class ClozeQuestion(BaseModel):
+    answer: QuizText = ""
+    acceptableSynonyms: list[QuizText] = []
+
+    _text = field_validator("answer", "acceptableSynonyms")(_as_text)
+
+
+class ScenarioChoice(BaseModel):
+    label: QuizText = ""
+    text: QuizText = ""
+
+    _text = field_validator("label", "text")(_as_text)
+
+
+class ScenarioQuestion(BaseModel):
+    correctAnswer: QuizText = ""
+    choices: list[ScenarioChoice] = []
+
+    _text = field_validator("correctAnswer")(_as_text)
+
+
+class RecallQuestion(BaseModel):
+    goldStandardIdeas: list[QuizText] = []
+    scoringNote: str = ""
+
+    _text = field_validator("goldStandardIdeas")(_as_text)
+
+
+class ComprehensionQuiz(BaseModel):
+    clozeQuestions: list[ClozeQuestion] = []
+    scenarioQuestions: list[ScenarioQuestion] = []
+    recallQuestions: list[RecallQuestion] = []
+
+
+class QuizAnswers(BaseModel):
+    cloze: list[QuizText] = []
+    scenario: list[QuizText] = []
+    recall: list[QuizText] = []
+
+    _text = field_validator("cloze", "scenario", "recall")(_as_text)
+
+
+class ComprehensionScoreRequest(BaseModel):
+    comprehension: ComprehensionQuiz
+    answers: QuizAnswers
+
+    @field_validator("comprehension", mode="before")
+    @classmethod
+    def _unwrap_report(cls, value):
+        # A whole analysis report (or its {"comprehension": ...} part) is accepted as the quiz
+        if isinstance(value, dict) and isinstance(value.get("comprehension"), dict):
+            return value["comprehension"]
+        return value
+
+
 def is_google_login_enabled() -> bool:
     return bool(GOOGLE_CLIENT_ID and SESSION_SECRET)
 
@@ -260,24 +677,29 @@ def _read_session_user(request: Request) -> dict | None:
     }
 
 
+def _get_google_certs():
+    """Process-wide Google signing-key cache (google-auth/httpx imported on first login)."""
+    global _google_certs
+    if _google_certs is None:
+        from google_certs import GoogleCertCache
+
+        _google_certs = GoogleCertCache(GOOGLE_CERTS_URL)
+    return _google_certs
+
+
 async def _verify_google_credential(credential: str) -> dict | None:
     if not credential or not GOOGLE_CLIENT_ID:
         return None
 
     try:
-        from google.auth.transport import requests as google_requests
-        from google.oauth2 import id_token
+        certs = _get_google_certs()
     except Exception as e:
         logger.error(f"google-auth import error: {e}")
         return None
 
     try:
-        token_info = await asyncio.to_thread(
-            id_token.verify_oauth2_token,
-            credential,
-            google_requests.Request(),
-            GOOGLE_CLIENT_ID,
-        )
+        # Signature/exp/aud checked locally against cached Google signing keys
+        token_info = await certs.verify(credential, GOOGLE_CLIENT_ID)
     except Exception as e:
         logger.warning(f"Google credential verification failed: {e}")
         return None
@@ -317,79 +739,150 @@ async def _verify_google_credential(credential: str) -> dict | None:
 # ADK Pipeline Runner (Attempt 1)
 # ---------------------------------------------------------------------------
 
-async def run_adk_pipeline(file_bytes: bytes, mime_type: str) -> dict | None:
-    """Run the ADK 3-agent pipeline. Returns parsed JSON or None on failure."""
-    global _adk_runner, _adk_session_service
+async def _run_adk_session(
+    user_id: str,
+    session_id: str,
+    file_bytes: bytes,
+    mime_type: str,
+    preparsed: bool = False,
+    document=None,
+    on_parsed=None,
+) -> tuple[str | None, dict]:
+    """Drive one ADK run to completion; returns the final JSON text and the state it wrote.
+
+    ``document`` is the staged file Part (file_staging); the bytes are inlined only without it.
+    ``on_parsed`` is called with the parser agent's parsed_document as soon as it is written.
+    """
+    from google.genai import types
+
+    parts = [
+        types.Part.from_text(text="이 임대차 계약서를 분석해주세요. 모든 조항을 추출하고, 표준 계약서와 비교하여 위험 조항을 찾고, 쉬운 한국어로 변환하고, 행동 스크립트를 생성하세요."),
+    ]
+    if not preparsed:
+        # Pre-parsed (chunked) runs skip the parser agent, so the document itself isn't needed
+        parts.insert(0, document or types.Part.from_bytes(data=file_bytes, mime_type=mime_type))
+    user_content = types.Content(role="user", parts=parts)
+
+    result_text = None
+    state: dict = {}
+    t0 = time.time()
+    last_agent = None
+    async for event in _adk_runner.run_async(
+        user_id=user_id,
+        session_id=session_id,
+        new_message=user_content,
+    ):
+        # Log agent transitions
+        agent_name = getattr(event, 'author', None) or ''
+        if agent_name and agent_name != last_agent:
+            elapsed = time.time() - t0
+            if last_agent:
+                logger.info(f"[TIMING] Agent '{last_agent}' done at {elapsed:.1f}s")
+            logger.info(f"[TIMING] Agent '{agent_name}' started at {elapsed:.1f}s")
+            last_agent = agent_name
+        if event.actions and event.actions.state_delta:
+            state.update(event.actions.state_delta)
+            if on_parsed and "parsed_document" in event.actions.state_delta:
+                on_parsed(event.actions.state_delta["parsed_document"])
+        if event.is_final_response() and event.content and event.content.parts:
+            result_text = event.content.parts[0].text
+    total = time.time() - t0
+    logger.info(f"[TIMING] Pipeline total: {total:.1f}s (last agent: {last_agent})")
+
+    # If no final response text, try session state
+    if not result_text:
+        session = await _adk_session_service.get_session(
+            app_name="clearsign",
+            user_id=user_id,
+            session_id=session_id,
+        )
+        if session:
+            state = {**session.state, **state}
+        final = state.get("final_result")
+        if final:
+            result_text = final if isinstance(final, str) else json.dumps(final)
+
+    return result_text, state
+
+
+async def run_adk_pipeline(
+    file_bytes: bytes,
+    mime_type: str,
+    profile: DocumentProfile | None = None,
+    parsed: dict | None = None,
+    template: ReferenceTemplate | None = None,
+    document=None,
+    on_parsed=None,
+) -> dict | None:
+    """Run the ADK 3-agent pipeline. Returns parsed JSON or None on failure.
+
+    With ``parsed`` (chunked parsing already done) the parser agent is skipped. Without
+    ``template`` the reference contract is picked from the parser's output
+    (agents.select_reference_template). ``document`` is the staged file Part to reference;
+    ``on_parsed`` receives the parser's output while the later agents are still running.
+    """
     try:
-        from google.genai import types
-
         if _adk_runner is None:
-            _init_adk()
+            # Deferred ADK import (fast-start mode): ~5s of imports, kept off the event loop
+            async with _adk_init_lock:
+                if _adk_runner is None:
+                    await asyncio.to_thread(_init_adk)
         if _adk_runner is None:
             return None
 
         user_id = str(uuid.uuid4())
 
-        session = await _adk_session_service.create_session(
-            app_name="clearsign",
-            user_id=user_id,
-        )
-
-        user_content = types.Content(
-            role="user",
-            parts=[
-                types.Part.from_bytes(data=file_bytes, mime_type=mime_type),
-                types.Part.from_text(text="이 임대차 계약서를 분석해주세요. 모든 조항을 추출하고, 표준 계약서와 비교하여 위험 조항을 찾고, 쉬운 한국어로 변환하고, 행동 스크립트를 생성하세요."),
-            ],
-        )
-
-        import time
-        result_text = None
-        t0 = time.time()
-        last_agent = None
-        async for event in _adk_runner.run_async(
-            user_id=user_id,
-            session_id=session.id,
-            new_message=user_content,
-        ):
-            # Log agent transitions
-            agent_name = getattr(event, 'author', None) or ''
-            if agent_name and agent_name != last_agent:
-                elapsed = time.time() - t0
-                if last_agent:
-                    logger.info(f"[TIMING] Agent '{last_agent}' done at {elapsed:.1f}s")
-                logger.info(f"[TIMING] Agent '{agent_name}' started at {elapsed:.1f}s")
-                last_agent = agent_name
-            if event.is_final_response() and event.content and event.content.parts:
-                result_text = event.content.parts[0].text
-        total = time.time() - t0
-        logger.info(f"[TIMING] Pipeline total: {total:.1f}s (last agent: {last_agent})")
-
-        # If no final response text, try session state
-        if not result_text:
-            session = await _adk_session_service.get_session(
-                app_name="clearsign",
-                user_id=user_id,
-                session_id=session.id,
-            )
-            final = session.state.get("final_result")
-            if final:
-                result_text = final if isinstance(final, str) else json.dumps(final)
+        profile = profile or profile_document(file_bytes, mime_type)
+        # Read by model_router.adk_before_model to route each agent for this document
+        route_state = {"route_profile": profile.to_dict(), "route_key": user_id}
+        if parsed is not None:
+            route_state["parsed_document"] = json.dumps(parsed, ensure_ascii=False)
+        if template is not None:
+            route_state["reference_template"] = template.id
+        if TIERED_ANALYSIS:
+            route_state["detail_level"] = "core"  # agents.unified_instruction: level1 only
+        session = await _adk_sessions.create(user_id, state=route_state)
+        cancelled = False
+        try:
+            with _breakers["adk"].guard():
+                result_text, state = await _run_adk_session(
+                    user_id,
+                    session.id,
+                    file_bytes,
+                    mime_type,
+                    preparsed=parsed is not None,
+                    document=document,
+                    on_parsed=on_parsed,
+                )
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            _router.settle(user_id, cancelled=cancelled)
+            await _adk_sessions.release(user_id, session.id)
 
         if not result_text:
             logger.warning("ADK pipeline returned no result")
             return None
 
         data = json.loads(result_text)
+        template = template or _templates.get(state.get("reference_template"))
+        data = hydrate_report(data, clauses_from_parsed(parsed or state.get("parsed_document")), template.clauses)
         data = ensure_risk_amounts(data)
+        if TIERED_ANALYSIS:
+            data = mark_pending(data)
 
-        if not validate_output(data):
+        if not validate_output(data, core=TIERED_ANALYSIS):
             logger.warning("ADK output failed schema validation")
             return None
+        data["referenceTemplate"] = template.summary()
 
         logger.info("ADK pipeline succeeded")
         return data
 
+    except CircuitOpenError as e:
+        logger.info(f"ADK pipeline skipped: {e}")
+        return None
     except Exception as e:
         logger.error(f"ADK pipeline error: {e}\n{traceback.format_exc()}")
         return None
@@ -442,7 +935,7 @@ SINGLE_CALL_PROMPT = """당신은 임대차 계약서 위험 분석 AI입니다.
       "riskAmount": 위험금액(숫자),
       "direction": "이탈 방향 1줄 요약",
       "original": "이 계약서 원문",
-      "standard": "표준 계약서 원문",
+      "standardRef": "비교한 표준 계약서 조항 번호 (예: 제4조)",
       "easyKorean": {
         "level1": "쉬운 설명 (핵심 1-2문장, 7대 원칙 적용)",
         "level2": "비유 설명 (일상 비유)",
@@ -485,54 +978,215 @@ SINGLE_CALL_PROMPT = """당신은 임대차 계약서 위험 분석 AI입니다.
   }
 }
 
+표준 계약서 원문은 출력하지 마세요. standardRef로 서버가 채웁니다.
 JSON만 출력하세요."""
 
+_SINGLE_ORIGINAL_LINE = '      "original": "이 계약서 원문",\n'
+_SINGLE_BODY_LINE = ',\n      "body": "조항 원문 전체"'
+
+
+_SINGLE_REFERENCE_LINE = "2. 국토교통부 표준 주택임대차계약서와 비교합니다.\n"
+_SINGLE_KEY_POINTS_HEADER = "표준 계약서 핵심 조항:\n"
+
+
+def _single_prompt_for(template: ReferenceTemplate | None) -> str:
+    """SINGLE_CALL_PROMPT with the reference contract and its key points swapped in."""
+    if template is None or template.id == _templates.default.id:
+        return SINGLE_CALL_PROMPT
+    start = SINGLE_CALL_PROMPT.index(_SINGLE_KEY_POINTS_HEADER)
+    end = SINGLE_CALL_PROMPT.index("\n\n", start)
+    key_points = "\n".join(f"- {point}" for point in template.key_points)
+    prompt = (
+        SINGLE_CALL_PROMPT[:start]
+        + f"비교 기준 계약서 핵심 조항 ({template.name}):\n{key_points}"
+        + SINGLE_CALL_PROMPT[end:]
+    )
+    return prompt.replace(_SINGLE_REFERENCE_LINE, f"2. 비교 기준 계약서({template.name})와 비교합니다.\n")
+
+
+_SINGLE_DETAIL_STEP = "4. 각 위험 조항에 대해 쉬운 한국어 3단계 설명과 행동 스크립트를 생성합니다.\n"
+_SINGLE_DETAIL_LEVELS = ',\n        "level2": "비유 설명 (일상 비유)",\n        "level3": "구체적 시나리오 (금액/상황 포함)"'
+_SINGLE_DETAIL_START = ',\n      "structuredBreakdown"'
+_SINGLE_CLAUSE_END = '\n    }\n  ],\n  "safeClausesSummary"'
 
-async def run_single_gemini(file_bytes: bytes, mime_type: str) -> dict | None:
-    """Fallback: single Gemini call with full prompt."""
+
+def _core_prompt(prompt: str) -> str:
+    """Drop the per-clause detail (level2/3, breakdown, glossary, action script) from the schema."""
+    start = prompt.index(_SINGLE_DETAIL_START)
+    prompt = prompt[:start] + prompt[prompt.index(_SINGLE_CLAUSE_END, start):]
+    return prompt.replace(_SINGLE_DETAIL_LEVELS, "").replace(
+        _SINGLE_DETAIL_STEP,
+        "4. 각 위험 조항에 대해 쉬운 한국어 핵심 설명(level1)만 생성합니다. "
+        "비유·시나리오·용어 풀이·행동 스크립트는 사용자가 조항을 펼칠 때 따로 생성하므로 출력하지 마세요.\n",
+    )
+
+
+def build_single_call_prompt(
+    clause_index: list[dict] | None = None, template: ReferenceTemplate | None = None, core: bool = False
+) -> str:
+    """Single-call prompt; with a local clause index the model returns clause IDs only.
+
+    ``core`` asks for the tiered core report (scores, amounts, directions, level1).
+    """
+    base = _single_prompt_for(template)
+    if core:
+        base = _core_prompt(base)
+    if not clause_index:
+        return base
+    listing = "\n".join(f"- {c['number']} {c.get('title', '')}".rstrip() for c in clause_index)
+    prompt = base.replace(_SINGLE_ORIGINAL_LINE, "").replace(_SINGLE_BODY_LINE, "")
+    return prompt.replace(
+        "출력 JSON 스키마:",
+        f"""이 계약서의 조항 목록 (조항 ID 목록):
+{listing}
+
+number에는 위 목록의 조항 ID를 그대로 쓰세요. 조항 원문(original/body)은 출력하지 마세요 — 서버가 채웁니다.
+
+출력 JSON 스키마:""",
+    )
+
+
+async def run_single_gemini(
+    file_bytes: bytes,
+    mime_type: str,
+    profile: DocumentProfile | None = None,
+    parsed: dict | None = None,
+    template: ReferenceTemplate | None = None,
+    document=None,
+) -> dict | None:
+    """Fallback: single Gemini call with full prompt.
+
+    With ``parsed`` (chunked parsing already done) the clause list is sent as text instead of the file.
+    ``template`` is the reference contract to compare against (default: 주택임대차 표준계약서).
+    ``document`` is the staged file Part (file_staging); the bytes are inlined only without it.
+    """
     try:
         from google.genai import types
 
         client = _genai_client
         if client is None:
             from google import genai
-            client = genai.Client(api_key=GEMINI_API_KEY)
+            client = genai.Client(api_key=MODEL_API_KEY)
 
-        response = await client.aio.models.generate_content(
-            model="gemini-3-flash-preview",
-            contents=types.Content(
-                role="user",
-                parts=[
-                    types.Part.from_bytes(data=file_bytes, mime_type=mime_type),
-                    types.Part.from_text(text=SINGLE_CALL_PROMPT),
-                ],
-            ),
-            config=types.GenerateContentConfig(
-                temperature=0.3,
-                response_mime_type="application/json",
-            ),
-        )
+        if parsed is not None:
+            local_clauses = clauses_from_parsed(parsed)
+            document_part = types.Part.from_text(
+                text="## 파싱된 계약서\n\n" + json.dumps(parsed, ensure_ascii=False)
+            )
+        else:
+            # Text uploads are split locally so the model never re-emits clause text
+            local_clauses = parse_document_clauses(file_bytes, mime_type)
+            document_part = document or types.Part.from_bytes(data=file_bytes, mime_type=mime_type)
+        route = _router.route("single", profile or profile_document(file_bytes, mime_type))
+        with _breakers["single"].guard(), _router.observe(route):
+            response = await client.aio.models.generate_content(
+                model=route.model,
+                contents=types.Content(
+                    role="user",
+                    parts=[
+                        document_part,
+                        types.Part.from_text(
+                            text=build_single_call_prompt(local_clauses, template, core=TIERED_ANALYSIS)
+                        ),
+                    ],
+                ),
+                config=_router.generate_config(
+                    route,
+                    temperature=0.3,
+                    response_mime_type="application/json",
+                ),
+            )
 
         result_text = response.text
         if not result_text:
             logger.warning("Single Gemini call returned empty")
             return None
 
+        template = template or _templates.default
         data = json.loads(result_text)
+        data = hydrate_report(data, local_clauses, template.clauses)
         data = ensure_risk_amounts(data)
+        if TIERED_ANALYSIS:
+            data = mark_pending(data)
 
-        if not validate_output(data):
+        if not validate_output(data, core=TIERED_ANALYSIS):
             logger.warning("Single Gemini output failed validation")
             return None
+        data["referenceTemplate"] = template.summary()
 
         logger.info("Single Gemini call succeeded")
         return data
 
+    except CircuitOpenError as e:
+        logger.info(f"Single Gemini skipped: {e}")
+        return None
     except Exception as e:
         logger.error(f"Single Gemini error: {e}\n{traceback.format_exc()}")
         return None
 
 
+# ---------------------------------------------------------------------------
+# Chunked parsing (long PDFs / multi-image uploads)
+# ---------------------------------------------------------------------------
+
+async def _parse_chunk(client, chunk: Chunk, total_pages: int) -> dict:
+    from google.genai import types
+
+    route = _router.route(
+        "parse",
+        DocumentProfile(chunk.size_bytes, chunk.parts[0][1], chunk.last_page - chunk.first_page + 1),
+    )
+    async with _parse_semaphore:
+        with _breakers["parse"].guard(), _router.observe(route):
+            response = await client.aio.models.generate_content(
+                model=route.model,
+                contents=types.Content(
+                    role="user",
+                    parts=[
+                        *(types.Part.from_bytes(data=data, mime_type=mime) for data, mime in chunk.parts),
+                        types.Part.from_text(text=chunk.prompt(total_pages)),
+                    ],
+                ),
+                config=_router.generate_config(
+                    route,
+                    temperature=0.1,
+                    response_mime_type="application/json",
+                ),
+            )
+    return json.loads(response.text)
+
+
+async def run_chunked_parse(chunks: list[Chunk]) -> dict | None:
+    """Parse page groups concurrently (bounded by PARSE_CONCURRENCY) and merge the clause lists."""
+    try:
+        client = _genai_client
+        if client is None:
+            from google import genai
+            client = genai.Client(api_key=MODEL_API_KEY)
+
+        total_pages = chunks[-1].last_page
+        t0 = time.time()
+        tasks = [asyncio.create_task(_parse_chunk(client, chunk, total_pages)) for chunk in chunks]
+        try:
+            parts = await asyncio.gather(*tasks)
+        finally:
+            # One failed group discards the whole parse: stop the others instead of letting them spend quota
+            for task in tasks:
+                task.cancel()
+        merged = merge_parsed(parts)
+        logger.info(
+            f"[TIMING] Chunked parse: {len(chunks)} group(s), {total_pages} pages, "
+            f"{len(merged['clauses'])} clauses in {time.time() - t0:.1f}s"
+        )
+        return merged if merged["clauses"] else None
+    except CircuitOpenError as e:
+        logger.info(f"Chunked parse skipped: {e}")
+        return None
+    except Exception as e:
+        logger.error(f"Chunked parse error: {e}\n{traceback.format_exc()}")
+        return None
+
+
 # ---------------------------------------------------------------------------
 # Fraud Check — Search Grounding (F6)
 # ---------------------------------------------------------------------------
@@ -543,7 +1197,7 @@ async def search_lease_fraud(address: str) -> dict:
         from google import genai
         from google.genai import types
 
-        client = genai.Client(api_key=GEMINI_API_KEY)
+        client = genai.Client(api_key=MODEL_API_KEY)
 
         prompt = f"""다음 주소 주변의 전세사기, 보증금 미반환, 임대차 분쟁 관련 최신 뉴스와 정보를 검색하세요.
 
@@ -558,15 +1212,18 @@ async def search_lease_fraud(address: str) -> dict:
 검색 결과를 바탕으로 해당 지역의 전세 거래 안전도를 평가하고,
 주의해야 할 사항을 알려주세요."""
 
-        response = await asyncio.to_thread(
-            client.models.generate_content,
-            model="gemini-3-flash-preview",
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                tools=[types.Tool(google_search=types.GoogleSearch())],
-                temperature=0.2,
-            ),
-        )
+        route = _router.route("fraud_search")
+        with _breakers["search"].guard(), _router.observe(route):
+            response = await asyncio.to_thread(
+                client.models.generate_content,
+                model=route.model,
+                contents=prompt,
+                config=_router.generate_config(
+                    route,
+                    tools=[types.Tool(google_search=types.GoogleSearch())],
+                    temperature=0.2,
+                ),
+            )
 
         result_text = response.text or ""
 
@@ -590,6 +1247,9 @@ async def search_lease_fraud(address: str) -> dict:
             "manualCheckLinks": _get_manual_links(),
         }
 
+    except CircuitOpenError as e:
+        logger.info(f"Search grounding skipped: {e}")
+        return _get_fraud_fallback(address)
     except Exception as e:
         logger.error(f"Search grounding error: {e}")
         return _get_fraud_fallback(address)
@@ -614,13 +1274,97 @@ def _get_fraud_fallback(address: str) -> dict:
     }
 
 
+async def _cache_fraud_result(key: str, result: dict) -> None:
+    if result.get("searchPerformed") and FRAUD_CACHE_TTL_SECONDS > 0:
+        await asyncio.to_thread(_shared_store.set_json, "fraud", key, result, FRAUD_CACHE_TTL_SECONDS)
+
+
+async def _prefetch_fraud(address: str, key: str) -> dict:
+    """One speculative search, stored in the shared cache like a requested one."""
+    if FRAUD_CACHE_TTL_SECONDS > 0:
+        cached = await asyncio.to_thread(_shared_store.get_json, "fraud", key)
+        if cached:
+            _fraud_counters["alreadyCached"] += 1
+            return cached
+    generation = _breakers["search"].generation
+    try:
+        result = await asyncio.wait_for(search_lease_fraud(address), timeout=FRAUD_PREFETCH_TIMEOUT)
+    except asyncio.TimeoutError:
+        _breakers["search"].record_timeout(generation)
+        logger.warning(f"Fraud check prefetch timed out after {FRAUD_PREFETCH_TIMEOUT}s")
+        raise
+    _fraud_counters["searched"] += 1
+    await _cache_fraud_result(key, result)
+    return result
+
+
+def _fraud_done(key: str, future: asyncio.Future) -> None:
+    _fraud_inflight.pop(key, None)
+    if not future.cancelled():
+        future.exception()  # retrieved here in case nobody asked for the result
+
+
+def start_fraud_prefetch(address: str | None) -> None:
+    """Start the fraud check for a property address in the background (no-op if already running).
+
+    Best effort: skipped when this worker already runs FRAUD_PREFETCH_CONCURRENCY prefetches, and
+    while the search breaker is open (a prefetch shouldn't be the half-open probe). If the user
+    never asks, the result just waits in the shared cache until FRAUD_CACHE_TTL_SECONDS.
+    """
+    if not (FRAUD_PREFETCH and MODEL_API_KEY and address):
+        return
+    key = fraud_cache_key(address)
+    if key in _fraud_inflight:
+        return
+    if len(_fraud_inflight) >= FRAUD_PREFETCH_CONCURRENCY:
+        _fraud_counters["skippedBusy"] += 1
+        return
+    if _breakers["search"].state == OPEN:
+        _fraud_counters["skippedOpen"] += 1
+        return
+    # Own budget: the analysis that found the address may finish (or time out) long before the search
+    pending = detached(_prefetch_fraud(address, key), FRAUD_PREFETCH_TIMEOUT)
+    _fraud_inflight[key] = pending
+    pending.add_done_callback(lambda f: _fraud_done(key, f))
+    _fraud_counters["started"] += 1
+    logger.info(f"Fraud check prefetch started ({len(_fraud_inflight)} in flight)")
+
+
 # ---------------------------------------------------------------------------
 # API Endpoints
 # ---------------------------------------------------------------------------
 
 @app.get("/health")
 async def health():
-    return {"status": "ok", "api_key_set": bool(GEMINI_API_KEY)}
+    if "firstHealth" not in STARTUP_PHASES:
+        _mark_phase("firstHealth", _STARTUP_T0)
+    result = {"status": "ok", "api_key_set": bool(GEMINI_API_KEY)}
+    if CASSETTE_MODE:
+        result["cassette"] = cassette.status()
+    if _adk_sessions is not None:
+        result["adkSessions"] = _adk_sessions.stats()
+    result["worker"] = os.getpid()
+    result["startup"] = {"fastStart": FAST_START, "phasesMs": STARTUP_PHASES}
+    result["modelRoutes"] = _router.stats()
+    result["sharedStore"] = _shared_store.stats()
+    if _history is not None:
+        result["history"] = _history.stats()
+    if _quota is not None:
+        result["quota"] = _quota.stats()
+    if _google_certs is not None:
+        result["googleCerts"] = _google_certs.stats()
+    result["referenceTemplates"] = _templates.stats()
+    result["fileStaging"] = _file_stager.stats()
+    result["clauseDetail"] = {"tiered": TIERED_ANALYSIS, "prefetchCount": DETAIL_PREFETCH_COUNT, **_detail_counters}
+    result["fraudPrefetch"] = {
+        "enabled": FRAUD_PREFETCH,
+        "concurrency": FRAUD_PREFETCH_CONCURRENCY,
+        "inflight": len(_fraud_inflight),
+        **_fraud_counters,
+    }
+    result["circuitBreakers"] = {name: breaker.stats() for name, breaker in _breakers.items()}
+    result["analyzeDeadline"] = {"budgetSeconds": ANALYZE_DEADLINE_SECONDS, **_analyze_counters}
+    return result
 
 
 @app.get("/api/config")
@@ -687,94 +1431,521 @@ async def auth_logout():
 
 
 @app.get("/api/demo")
-async def demo():
+async def demo(request: Request):
     """Return pre-built fallback analysis for demo."""
-    return JSONResponse(content=load_fallback())
+    return _asset_response(request, "fallback.json")
+
+
+async def _analysis_response(
+    result: dict, user: dict | None, owner: str, digest: str, filename: str, mime_type: str
+) -> JSONResponse:
+    """Return an analysis, recording it in the signed-in user's history first.
+
+    Core reports (tiered generation) and reports with a propertyAddress are also kept under
+    their analysisId, together with the requester's identity (``owner``), for the clause detail
+    and fraud check endpoints; the details of the riskiest clauses and the fraud check
+    (if not already running) start right away.
+    """
+    analysis_id = None
+    if user and _history is not None:
+        try:
+            analysis_id = await asyncio.to_thread(
+                _history.add, user["id"], result, digest, filename=filename, mime_type=mime_type
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"History write failed: {e}")
+    if pending_count(result) or result.get("propertyAddress"):
+        analysis_id = analysis_id or uuid.uuid4().hex
+        await asyncio.to_thread(
+            _shared_store.set_json, "report", analysis_id, {"owner": owner, "report": result}, CLAUSE_DETAIL_TTL_SECONDS
+        )
+    if pending_count(result):
+        _schedule_detail_prefetch(result)
+    start_fraud_prefetch(result.get("propertyAddress"))
+    if analysis_id:
+        result = {**result, "analysisId": analysis_id}
+    return JSONResponse(content=result)
+
+
+MAX_FILE_SIZE = 20 * 1024 * 1024  # 20MB (total across all uploaded pages)
+
+# Normalize mime types
+MIME_MAP = {
+    ".pdf": "application/pdf",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+    ".bmp": "image/bmp",
+    ".tif": "image/tiff",
+    ".tiff": "image/tiff",
+    ".heic": "image/heic",
+    ".heif": "image/heif",
+    ".html": "text/html",
+    ".htm": "text/html",
+    ".txt": "text/plain",
+    ".csv": "text/csv",
+    ".rtf": "text/rtf",
+}
+
+
+def _upload_mime_type(upload: UploadFile) -> str:
+    mime_type = upload.content_type or "application/pdf"
+    if mime_type == "application/octet-stream":
+        ext = os.path.splitext(upload.filename or "")[1].lower()
+        mime_type = MIME_MAP.get(ext, mime_type)
+    return mime_type
 
 
 @app.post("/api/analyze")
-async def analyze(file: UploadFile = File(...)):
-    """Upload contract file → ADK pipeline → fallback chain → JSON response."""
-    MAX_FILE_SIZE = 20 * 1024 * 1024  # 20MB
-    file_bytes = await file.read()
+async def analyze(request: Request, file: list[UploadFile] = File(...)):
+    """Upload contract file(s) → ADK pipeline → fallback chain → JSON response.
 
-    if len(file_bytes) > MAX_FILE_SIZE:
+    Several ``file`` fields are accepted for multi-page photo uploads (one image per page).
+    """
+    uploads = [(await upload.read(), _upload_mime_type(upload)) for upload in file]
+
+    if sum(len(data) for data, _ in uploads) > MAX_FILE_SIZE:
         return JSONResponse(
             status_code=413,
             content={"error": "파일이 너무 큽니다 (최대 20MB)"},
         )
+    if len(uploads) > 1 and not all(mime.startswith("image/") for _, mime in uploads):
+        return JSONResponse(
+            status_code=400,
+            content={"error": "여러 파일은 이미지(페이지별 사진)만 함께 올릴 수 있습니다"},
+        )
 
-    mime_type = file.content_type or "application/pdf"
-
-    # Normalize mime types
-    MIME_MAP = {
-        ".pdf": "application/pdf",
-        ".png": "image/png",
-        ".jpg": "image/jpeg",
-        ".jpeg": "image/jpeg",
-        ".gif": "image/gif",
-        ".webp": "image/webp",
-        ".bmp": "image/bmp",
-        ".tif": "image/tiff",
-        ".tiff": "image/tiff",
-        ".heic": "image/heic",
-        ".heif": "image/heif",
-        ".html": "text/html",
-        ".htm": "text/html",
-        ".txt": "text/plain",
-        ".csv": "text/csv",
-        ".rtf": "text/rtf",
-    }
-    if mime_type == "application/octet-stream":
-        ext = os.path.splitext(file.filename or "")[1].lower()
-        mime_type = MIME_MAP.get(ext, mime_type)
+    file_bytes, mime_type = uploads[0]
+    filename = file[0].filename or ""
+    if len(uploads) == 1:
+        profile = profile_document(file_bytes, mime_type)
+        digest = hashlib.sha256(file_bytes).hexdigest()
+    else:
+        profile = DocumentProfile(sum(len(data) for data, _ in uploads), mime_type, len(uploads))
+        digest = hashlib.sha256(b"".join(hashlib.sha256(data).digest() for data, _ in uploads)).hexdigest()
+        filename = f"{filename} 외 {len(uploads) - 1}장"
+    logger.info(
+        f"Analyzing file: {filename} ({mime_type}, {profile.size_bytes} bytes, ~{profile.page_count} pages)"
+    )
+
+    # Shared cache: an identical upload analyzed by any worker is served directly
+    user = _read_session_user(request)
+    owner = _client_identity(request)
+    cache_key = f"{CACHE_SCHEMA_VERSION}:{mime_type}:{digest}"
+    cached = None
+    if ANALYSIS_CACHE_TTL_SECONDS > 0:
+        cached = await asyncio.to_thread(_shared_store.get_json, "analysis", cache_key)
+    if cached:
+        logger.info("Analysis cache hit")
+        return await _analysis_response(cached, user, owner, digest, filename, mime_type)
+
+    deadline = Deadline(ANALYZE_DEADLINE_SECONDS)
+    token = deadline.activate()
+    try:
+        result = await run_until_disconnected(request, _run_analysis(uploads, profile, deadline))
+    except ClientDisconnected:
+        _analyze_counters["cancelledOnDisconnect"] += 1
+        logger.info(
+            f"Client disconnected after {deadline.elapsed():.1f}s — cancelled in-flight model calls"
+        )
+        return Response(status_code=499)
+    finally:
+        Deadline.reset(token)
+
+    if result:
+        result["analysisMode"] = "real"
+        if ANALYSIS_CACHE_TTL_SECONDS > 0:
+            await asyncio.to_thread(_shared_store.set_json, "analysis", cache_key, result, ANALYSIS_CACHE_TTL_SECONDS)
+        return await _analysis_response(result, user, owner, digest, filename, mime_type)
+
+    # Attempt 3: rule-based analysis of the upload itself (text uploads / PDF text layer, no model call).
+    # Not cached, so the next upload of the same contract tries the models again.
+    offline = await asyncio.to_thread(_offline_analysis, uploads) if OFFLINE_ANALYSIS else None
+    if offline:
+        _analyze_counters["offline"] += 1
+        return await _analysis_response(offline, user, owner, digest, filename, mime_type)
+
+    # Attempt 4: Static fallback (always succeeds)
+    logger.info("Returning static fallback")
+    fallback = load_fallback()
+    fallback["analysisMode"] = "fallback"
+    return JSONResponse(content=fallback)
 
-    logger.info(f"Analyzing file: {file.filename} ({mime_type}, {len(file_bytes)} bytes)")
+
+def _select_template(text: str | None, parsed: dict | None) -> ReferenceTemplate | None:
+    """Reference contract chosen locally before any analysis call (None = decide after parsing).
+
+    Uses the merged chunk parse, else the text of text uploads / the PDF text layer.
+    """
+    if parsed is not None:
+        template, detection = _templates.classify(parsed)
+    else:
+        if not text:
+            return None
+        template, detection = _templates.classify_text(text)
+    logger.info(f"Reference template: {template.id} (score {detection['score']}: {', '.join(detection['signals'])})")
+    return template
+
+
+def _offline_analysis(uploads: list[tuple[bytes, str]]) -> dict | None:
+    """Rule-based report for a text-extractable upload (None: scans, photos, unsplittable text)."""
+    if len(uploads) > 1:
+        return None
+    t = time.perf_counter()
+    text = document_text(*uploads[0], max_pdf_pages=OFFLINE_PDF_PAGES)
+    if not text:
+        return None
+    template, _ = _templates.classify_text(text)
+    report = analyze_text(text, template.clauses, _risk_rules)
+    if report is None or not validate_output(report):
+        logger.info("Offline analysis not possible for this upload")
+        return None
+    report["referenceTemplate"] = template.summary()
+    report["analysisMode"] = "offline"
+    address = extract_property_address(text)
+    if address:
+        report["propertyAddress"] = address
+    logger.info(
+        f"Offline analysis: {report['summary']['deviatedClauseCount']} deviated clause(s) "
+        f"in {(time.perf_counter() - t) * 1000:.1f}ms"
+    )
+    return report
+
+
+async def _stage_document(file_bytes: bytes, mime_type: str, deadline: Deadline):
+    """File Part for the whole-document attempts (None: each attempt inlines the bytes)."""
+    client = _genai_client
+    if client is None:
+        if not MODEL_API_KEY:
+            return None
+        from google import genai
+        client = genai.Client(api_key=MODEL_API_KEY)
+    return await _file_stager.part(
+        client, file_bytes, mime_type, timeout=deadline.allot(FILE_STAGING_SHARE, SINGLE_CALL_TIMEOUT)
+    )
+
+
+async def _run_analysis(uploads: list[tuple[bytes, str]], profile: DocumentProfile, deadline: Deadline) -> dict | None:
+    """Model attempts for one upload, each given its share of the request's remaining budget."""
+    file_bytes, mime_type = uploads[0]
+
+    # Long PDFs / multi-image uploads: parse page groups in parallel, then analyze the merged text
+    parsed = None
+    chunks = plan_chunks(uploads, profile.page_count, CHUNK_PAGES, CHUNKED_PARSE_MIN_PAGES)
+    if chunks:
+        generation = _breakers["parse"].generation  # timeouts count against the breaker state they started in
+        try:
+            parsed = await asyncio.wait_for(
+                run_chunked_parse(chunks), timeout=deadline.allot(CHUNKED_PARSE_SHARE, SINGLE_CALL_TIMEOUT)
+            )
+        except asyncio.TimeoutError:
+            _breakers["parse"].record_timeout(generation)
+            logger.warning("Chunked parse timed out")
+        if parsed is None and len(uploads) > 1:
+            # Whole-document attempts take one file; analyzing only the first page would mislead
+            logger.warning("Chunked parse failed for a multi-image upload — returning static fallback")
+            return None
+    text = None if parsed is not None else await asyncio.to_thread(document_text, file_bytes, mime_type)
+    template = _select_template(text, parsed)
+    # The property address is usually on the first page: the fraud check runs alongside the analysis
+    found = {"address": address_from_parsed(parsed) if parsed is not None else extract_property_address(text)}
+    start_fraud_prefetch(found["address"])
+
+    def with_address(result: dict) -> dict:
+        if found["address"]:
+            result["propertyAddress"] = found["address"]
+        return result
+
+    def on_parsed(parsed_document) -> None:
+        # Scans and photos: the ADK parser agent is the first to read the address
+        if not found["address"]:
+            found["address"] = address_from_parsed(parsed_document)
+            start_fraud_prefetch(found["address"])
+
+    # Upload the document once; both attempts (and every ADK agent) reference the same handle
+    document = None if parsed is not None else await _stage_document(file_bytes, mime_type, deadline)
 
     # Attempt 1: Single Gemini call (fast, no ADK overhead)
+    generation = _breakers["single"].generation
     try:
         result = await asyncio.wait_for(
-            run_single_gemini(file_bytes, mime_type),
-            timeout=SINGLE_CALL_TIMEOUT,
+            run_single_gemini(file_bytes, mime_type, profile, parsed, template, document),
+            timeout=deadline.allot(SINGLE_CALL_SHARE, SINGLE_CALL_TIMEOUT),
         )
         if result:
-            result["analysisMode"] = "real"
-            return JSONResponse(content=result)
+            return with_address(result)
     except asyncio.TimeoutError:
+        _breakers["single"].record_timeout(generation)
         logger.warning("Single Gemini timed out")
     except Exception as e:
         logger.error(f"Single Gemini attempt failed: {e}")
 
-    # Attempt 2: ADK Pipeline (slower but more thorough)
+    # Attempt 2: ADK Pipeline (slower but more thorough) — only if enough budget is left for it
+    if deadline.remaining() < MIN_ATTEMPT_SECONDS:
+        _analyze_counters["deadlineExceeded"] += 1
+        logger.warning(f"Skipping ADK pipeline: {deadline.remaining():.1f}s of the request budget left")
+        return None
+    generation = _breakers["adk"].generation
     try:
         result = await asyncio.wait_for(
-            run_adk_pipeline(file_bytes, mime_type),
-            timeout=TIMEOUT_SECONDS,
+            run_adk_pipeline(file_bytes, mime_type, profile, parsed, template, document, on_parsed),
+            timeout=deadline.allot(1.0, TIMEOUT_SECONDS),
         )
         if result:
-            result["analysisMode"] = "real"
-            return JSONResponse(content=result)
+            return with_address(result)
     except asyncio.TimeoutError:
+        _breakers["adk"].record_timeout(generation)
+        _analyze_counters["deadlineExceeded"] += 1
         logger.warning("ADK pipeline timed out")
     except Exception as e:
         logger.error(f"ADK attempt failed: {e}")
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Clause detail on demand (tiered generation, see tiered.py)
+# ---------------------------------------------------------------------------
+
+CLAUSE_DETAIL_PROMPT = """당신은 임대차 계약서 조항 상세 설명 작성 전문가입니다.
+아래 위험 조항 하나에 대해 쉬운 한국어 상세 설명과 행동 스크립트를 생성하세요.
+
+## 7대 변환 원칙 (간략)
+1. 복합문→단문, 수동→능동 ("보증금이 반환된다"→"집주인이 보증금을 돌려줍니다")
+2. 조사 의존 감소: "누가/무엇을/누구에게" 명시 분리
+3. 중첩 조건→번호 매긴 개별 조건+결과 쌍
+4. 시간 전치: 기한을 문장 맨 앞 배치
+5. 한자어→일상어 (원상회복→처음 상태로 고치기, 대항력→권리 주장 힘, 위약금→벌금, 임차인→세입자, 임대인→집주인)
+6. 모든 문장에 명시적 주어 포함
+7. "누가|무엇을|언제|결과" 구조화
+
+## 조항
+{number} {title}
+이탈도: {deviation_score} / 위험 금액: {risk_amount}원
+이탈 방향: {direction}
+핵심 설명(level1, 이미 제공됨): {level1}
+행동 유형: {action_type}
+
+이 계약서 원문:
+{original}
+
+비교 기준 조항 ({reference}):
+{standard}
+
+## 출력 JSON
+{{
+  "easyKorean": {{"level2": "일상 비유", "level3": "구체적 금액/상황 시나리오"}},
+  "structuredBreakdown": {{"who": "주체", "what": "내용", "when": "시기", "condition": "조건", "result": "결과", "risk": "위험"}},
+  "termGlossary": [{{"original": "용어", "simple": "설명", "context": "이 조항에서의 의미"}}],
+  "action": {{"message": "행동 스크립트"}}
+}}
+
+## 규칙
+- level2: "~와 같습니다" 비유. level1을 반복하지 마세요.
+- level3: 위험 금액과 기간을 넣은 실제 상황 시나리오
+- termGlossary: 2개 이상
+- action.message: danger는 "⚠️"+수정요청, negotiate는 "📋 수정 요청:"+근거법. 존댓말.
+- JSON만 출력."""
+
+
+async def _generate_clause_detail(clause: dict, template: ReferenceTemplate, key: str) -> dict:
+    client = _genai_client
+    if client is None:
+        from google import genai
+        client = genai.Client(api_key=MODEL_API_KEY)
+
+    prompt = CLAUSE_DETAIL_PROMPT.format(
+        number=clause.get("number", ""),
+        title=clause.get("title", ""),
+        deviation_score=clause.get("deviationScore", 0),
+        risk_amount=f"{clause.get('riskAmount', 0):,}",
+        direction=clause.get("direction", ""),
+        level1=(clause.get("easyKorean") or {}).get("level1", ""),
+        action_type=(clause.get("action") or {}).get("type", "negotiate"),
+        original=clause.get("original") or "(원문 없음)",
+        reference=template.name,
+        standard=clause.get("standard") or "(대응 조항 없음)",
+    )
+    route = _router.route("clause_detail")
+    t0 = time.time()
+    with _breakers["detail"].guard(), _router.observe(route):
+        response = await client.aio.models.generate_content(
+            model=route.model,
+            contents=prompt,
+            config=_router.generate_config(
+                route,
+                temperature=0.4,
+                response_mime_type="application/json",
+            ),
+        )
+    detail = json.loads(response.text or "")
+    if not validate_detail(detail):
+        raise ValueError("Clause detail failed validation")
+    await asyncio.to_thread(_shared_store.set_json, "clause_detail", key, detail, CLAUSE_DETAIL_TTL_SECONDS)
+    _detail_counters["generated"] += 1
+    logger.info(f"[TIMING] Clause detail {clause.get('number')}: {time.time() - t0:.1f}s")
+    return detail
+
+
+def _detail_done(key: str, future: asyncio.Future) -> None:
+    _detail_inflight.pop(key, None)
+    if not future.cancelled() and future.exception() is not None:
+        _detail_counters["failed"] += 1
+
+
+async def clause_detail_for(clause: dict, template: ReferenceTemplate) -> dict:
+    """Detail for one core clause: shared cache by clause content, else one generation per worker."""
+    key = detail_key(clause, template.id)
+    cached = await asyncio.to_thread(_shared_store.get_json, "clause_detail", key)
+    if cached is not None:
+        _detail_counters["cacheHits"] += 1
+        return cached
+    pending = _detail_inflight.get(key)
+    if pending is None:
+        pending = asyncio.ensure_future(_generate_clause_detail(clause, template, key))
+        _detail_inflight[key] = pending
+        pending.add_done_callback(lambda f: _detail_done(key, f))
+    # Shielded: a closed panel (or a prefetch racing a click) doesn't throw the generation away
+    return await asyncio.shield(pending)
+
+
+async def _prefetch_detail(clause: dict, template: ReferenceTemplate) -> None:
+    try:
+        await clause_detail_for(clause, template)
+        _detail_counters["prefetched"] += 1
+    except Exception as e:
+        logger.info(f"Clause detail prefetch for {clause.get('number')} skipped: {e}")
+
+
+def _schedule_detail_prefetch(report: dict) -> None:
+    """Start generating details for the clauses users are most likely to open first."""
+    if not MODEL_API_KEY or DETAIL_PREFETCH_COUNT <= 0:
+        return
+    template = _templates.get((report.get("referenceTemplate") or {}).get("id"))
+    for clause in prefetch_targets(report, DETAIL_PREFETCH_COUNT):
+        task = asyncio.create_task(_prefetch_detail(clause, template))
+        _detail_tasks.add(task)
+        task.add_done_callback(_detail_tasks.discard)
+
+
+async def _load_report(analysis_id: str, request: Request) -> dict | None:
+    """Report kept under ``analysis_id``, only for the identity that requested the analysis.
+
+    Reports hold the uploaded contract's text and property address, so knowing the ID is not enough.
+    """
+    entry = await asyncio.to_thread(_shared_store.get_json, "report", analysis_id)
+    if isinstance(entry, dict) and entry.get("owner") == _client_identity(request):
+        return entry["report"]
+    # Signed-in users can expand clauses of analyses reopened from history (owner-scoped too)
+    user = _read_session_user(request)
+    if user and _history is not None:
+        return await asyncio.to_thread(_history.get, user["id"], analysis_id)
+    return None
+
+
+@app.get("/api/analysis/{analysis_id}/clauses/{number}")
+async def clause_detail(analysis_id: str, number: str, request: Request):
+    """Full clause (level2/3, breakdown, glossary, action script) for a core report, generated on first open."""
+    report = await _load_report(analysis_id, request)
+    if report is None:
+        return JSONResponse(status_code=404, content={"error": "Analysis not found"})
+    clause = find_clause(report, number)
+    if clause is None:
+        return JSONResponse(status_code=404, content={"error": "Clause not found"})
+    if not clause.get("detailPending"):
+        return JSONResponse(content=clause)
+
+    template = _templates.get((report.get("referenceTemplate") or {}).get("id"))
+    try:
+        detail = await clause_detail_for(clause, template)
+    except CircuitOpenError as e:
+        logger.info(f"Clause detail skipped: {e}")
+        return JSONResponse(
+            status_code=503,
+            content={"error": "상세 설명 생성이 일시적으로 중단되었습니다. 잠시 후 다시 시도해주세요."},
+            headers={"Retry-After": str(max(1, round(e.retry_after)))},
+        )
+    except Exception as e:
+        logger.error(f"Clause detail error: {e}\n{traceback.format_exc()}")
+        return JSONResponse(status_code=500, content={"error": "상세 설명 생성에 실패했습니다."})
+    return JSONResponse(content=merge_detail(clause, detail))
 
-    # Attempt 3: Static fallback (always succeeds)
-    logger.info("Returning static fallback")
-    fallback = load_fallback()
-    fallback["analysisMode"] = "fallback"
-    return JSONResponse(content=fallback)
+
+@app.get("/api/history")
+async def history_list(request: Request, limit: int = 20, cursor: str = ""):
+    """Signed-in user's past analyses, newest first (pass nextCursor to page)."""
+    user = _read_session_user(request)
+    if not user:
+        return JSONResponse(status_code=401, content={"error": "Unauthorized"})
+    if _history is None:
+        return JSONResponse(status_code=503, content={"error": "History is not available"})
+    page = await asyncio.to_thread(_history.list, user["id"], limit, cursor or None)
+    return JSONResponse(content=page)
+
+
+@app.get("/api/history/{analysis_id}")
+async def history_get(analysis_id: str, request: Request):
+    """Re-open a stored analysis without re-running the pipeline."""
+    user = _read_session_user(request)
+    if not user:
+        return JSONResponse(status_code=401, content={"error": "Unauthorized"})
+    if _history is None:
+        return JSONResponse(status_code=503, content={"error": "History is not available"})
+    result = await asyncio.to_thread(_history.get, user["id"], analysis_id)
+    if result is None:
+        return JSONResponse(status_code=404, content={"error": "Analysis not found"})
+    return JSONResponse(content={**result, "analysisId": analysis_id})
+
+
+@app.delete("/api/history/{analysis_id}")
+async def history_delete(analysis_id: str, request: Request):
+    user = _read_session_user(request)
+    if not user:
+        return JSONResponse(status_code=401, content={"error": "Unauthorized"})
+    if _history is None:
+        return JSONResponse(status_code=503, content={"error": "History is not available"})
+    deleted = await asyncio.to_thread(_history.delete, user["id"], analysis_id)
+    if not deleted:
+        return JSONResponse(status_code=404, content={"error": "Analysis not found"})
+    return JSONResponse(content={"ok": True})
 
 
 @app.get("/api/fraud-check")
-async def fraud_check(address: str = ""):
-    """Google Search Grounding for lease fraud detection (F6)."""
+async def fraud_check(request: Request, address: str = "", analysis_id: str = Query("", alias="analysisId")):
+    """Google Search Grounding for lease fraud detection (F6).
+
+    With ``analysisId`` instead of ``address``, the property address found during that analysis
+    is used, and the search usually started (or finished) while the analysis was running.
+    """
+    if not address and analysis_id:
+        report = await _load_report(analysis_id, request)
+        if report is None:
+            return JSONResponse(status_code=404, content={"error": "Analysis not found"})
+        address = report.get("propertyAddress") or ""
+        if not address:
+            return JSONResponse(status_code=404, content={"error": "No property address found in this analysis"})
     if not address:
         return JSONResponse(
             status_code=400,
             content={"error": "address parameter required"},
         )
+    cache_key = fraud_cache_key(address)
+    cached = None
+    if FRAUD_CACHE_TTL_SECONDS > 0:
+        cached = await asyncio.to_thread(_shared_store.get_json, "fraud", cache_key)
+    if cached:
+        return JSONResponse(content=cached)
+    pending = _fraud_inflight.get(cache_key)
+    if pending is not None:
+        # Join the prefetch instead of searching twice; shielded so a closed tab doesn't cancel it
+        _fraud_counters["joined"] += 1
+        try:
+            return JSONResponse(content=await asyncio.shield(pending))
+        except Exception as e:
+            logger.info(f"Fraud check prefetch failed ({type(e).__name__}) — searching again")
     result = await search_lease_fraud(address)
+    await _cache_fraud_result(cache_key, result)
     return JSONResponse(content=result)
 
 
@@ -872,19 +2043,21 @@ async def comprehension(request: Request):
         )
 
         from google import genai
-        from google.genai import types
 
-        client = genai.Client(api_key=GEMINI_API_KEY)
-
-        response = await asyncio.to_thread(
-            client.models.generate_content,
-            model="gemini-3-flash-preview",
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                temperature=0.3,
-                response_mime_type="application/json",
-            ),
-        )
+        client = genai.Client(api_key=MODEL_API_KEY)
+
+        route = _router.route("quiz")
+        with _breakers["comprehension"].guard(), _router.observe(route):
+            response = await asyncio.to_thread(
+                client.models.generate_content,
+                model=route.model,
+                contents=prompt,
+                config=_router.generate_config(
+                    route,
+                    temperature=0.3,
+                    response_mime_type="application/json",
+                ),
+            )
 
         result_text = response.text
         if not result_text:
@@ -893,6 +2066,13 @@ async def comprehension(request: Request):
         data = json.loads(result_text)
         return JSONResponse(content=data)
 
+    except CircuitOpenError as e:
+        logger.info(f"Comprehension generation skipped: {e}")
+        return JSONResponse(
+            status_code=503,
+            content={"error": "이해도 문항 생성이 일시적으로 중단되었습니다. 잠시 후 다시 시도해주세요."},
+            headers={"Retry-After": str(max(1, round(e.retry_after)))},
+        )
     except Exception as e:
         logger.error(f"Comprehension generation error: {e}\n{traceback.format_exc()}")
         return JSONResponse(
@@ -901,10 +2081,22 @@ async def comprehension(request: Request):
         )
 
 
+@app.post("/api/comprehension/score")
+async def comprehension_score(payload: ComprehensionScoreRequest):
+    """Grade quiz answers locally (jamo-level fuzzy matching, no model call).
+
+    answers: {"cloze": [...], "scenario": [...], "recall": [...]} aligned with the quiz question lists.
+    """
+    t = time.perf_counter()
+    result = score_quiz(payload.comprehension.model_dump(), payload.answers.model_dump())
+    result["elapsedMs"] = round((time.perf_counter() - t) * 1000, 3)
+    return JSONResponse(content=result)
+
+
 @app.get("/static/fallback.json")
-async def static_fallback():
+async def static_fallback(request: Request):
     """Frontend triple-fallback: serve fallback JSON as static file."""
-    return FileResponse(FALLBACK_PATH, media_type="application/json")
+    return _asset_response(request, "fallback.json")
 
 
 # ---------------------------------------------------------------------------
@@ -912,10 +2104,9 @@ async def static_fallback():
 # ---------------------------------------------------------------------------
 
 @app.get("/")
-async def root():
+async def root(request: Request):
     """Serve frontend SPA."""
-    index_path = os.path.join(STATIC_DIR, "index.html")
-    return FileResponse(index_path, media_type="text/html")
+    return _asset_response(request, "index.html")
 
 
 # Mount static directory for any additional assets
@@ -923,9 +2114,39 @@ if os.path.isdir(STATIC_DIR):
     app.mount("/static-assets", StaticFiles(directory=STATIC_DIR), name="static-assets")
 
 
+_MODULE_READY = time.perf_counter()
+
+
 # ---------------------------------------------------------------------------
 # Entry point
 # ---------------------------------------------------------------------------
+def recommended_workers() -> int:
+    """Worker count for this host: one per vCPU, capped by the container memory limit.
+
+    Model calls are I/O bound, so one event loop per vCPU is enough to keep the
+    CPU busy with JSON work; each worker also holds its own ADK runner and SDK
+    clients (~WORKER_MEMORY_MB of RSS), which caps the count on small instances.
+    """
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    workers = max(1, cpus)
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            with open(path, "r") as f:
+                limit = f.read().strip()
+        except OSError:
+            continue
+        if limit.isdigit() and int(limit) < (1 << 60):
+            workers = min(workers, max(1, int(limit) // (WORKER_MEMORY_MB * 1024 * 1024)))
+        break
+    return workers
+
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=PORT)
+
+    workers = recommended_workers() if WEB_CONCURRENCY == "auto" else max(1, int(WEB_CONCURRENCY))
+    if workers > 1:
+        logger.info(f"Starting {workers} workers (shared store: {SHARED_STORE_PATH})")
+        uvicorn.run("main:app", host="0.0.0.0", port=PORT, workers=workers)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=PORT)
@@ -0,0 +1,327 @@
+"""Config-driven model routing per pipeline stage and document (data/model_routes.json).
+
+Route format — the first route whose "when" matches is used:
+    {"name": "...", "when": {"max_bytes": N, "min_bytes": N, "min_pages": N, "max_pages": N,
+                              "mime_prefix": ["text/", ...]},
+     "model": "...", "config": {GenerateContentConfig fields},
+     "budget": {"max_latency_ms": N, "max_error_rate": 0.5, "min_samples": 5, "retry_after_s": 60},
+     "fallback": {"model": "...", "config": {...}}}
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+import deadline
+
+logger = logging.getLogger("clearsign.router")
+
+DEFAULT_ROUTES_PATH = os.path.join(os.path.dirname(__file__), "data", "model_routes.json")
+DEFAULT_MODEL = "gemini-3-flash-preview"
+
+_PDF_PAGE_RE = re.compile(rb"/Type\s*/Page(?![a-zA-Z])")
+_PDF_COUNT_RE = re.compile(rb"/Type\s*/Pages\b[^>]*?/Count\s+(\d+)", re.S)
+_HTML_NOISE_RE = re.compile(rb"<(style|script)\b.*?</\1\s*>|<[^>]+>", re.S | re.I)
+
+
+# ---------------------------------------------------------------------------
+# Document profile
+# ---------------------------------------------------------------------------
+
+@dataclass
+class DocumentProfile:
+    size_bytes: int = 0
+    mime_type: str = ""
+    page_count: int = 1
+
+    def to_dict(self) -> dict:
+        return {"size_bytes": self.size_bytes, "mime_type": self.mime_type, "page_count": self.page_count}
+
+    @classmethod
+    def from_dict(cls, data: dict | None) -> "DocumentProfile | None":
+        if not data:
+            return None
+        return cls(
+            size_bytes=int(data.get("size_bytes", 0)),
+            mime_type=str(data.get("mime_type", "")),
+            page_count=int(data.get("page_count", 1)),
+        )
+
+
+def count_pages(file_bytes: bytes, mime_type: str) -> int:
+    """Cheap page estimate without a PDF library (no parsing, no decompression)."""
+    if mime_type == "application/pdf":
+        counts = [int(n) for n in _PDF_COUNT_RE.findall(file_bytes)]
+        if counts:
+            return max(1, max(counts))
+        return max(1, len(_PDF_PAGE_RE.findall(file_bytes)))
+    if mime_type.startswith("text/"):
+        if mime_type == "text/html":
+            file_bytes = _HTML_NOISE_RE.sub(b"", file_bytes)
+        # ~1,700 Hangul characters (≈5,000 UTF-8 bytes) per printed A4 page
+        return max(1, len(file_bytes) // 5000 + 1)
+    return 1
+
+
+def profile_document(file_bytes: bytes, mime_type: str) -> DocumentProfile:
+    return DocumentProfile(
+        size_bytes=len(file_bytes),
+        mime_type=mime_type or "",
+        page_count=count_pages(file_bytes, mime_type or ""),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Router
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Route:
+    stage: str
+    name: str
+    model: str
+    config: dict = field(default_factory=dict)
+    degraded: bool = False
+
+
+def _matches(when: dict, profile: DocumentProfile | None) -> bool:
+    if not when:
+        return True
+    if profile is None:
+        return False
+    if "min_bytes" in when and profile.size_bytes < when["min_bytes"]:
+        return False
+    if "max_bytes" in when and profile.size_bytes > when["max_bytes"]:
+        return False
+    if "min_pages" in when and profile.page_count < when["min_pages"]:
+        return False
+    if "max_pages" in when and profile.page_count > when["max_pages"]:
+        return False
+    prefixes = when.get("mime_prefix")
+    if prefixes and not any(profile.mime_type.startswith(p) for p in prefixes):
+        return False
+    return True
+
+
+class _Observed:
+    """Rolling latency/error window for one (stage, route, model)."""
+
+    def __init__(self, window: int):
+        self.outcomes: deque[tuple[float, bool]] = deque(maxlen=window)
+
+    def add(self, latency_ms: float, ok: bool) -> None:
+        self.outcomes.append((latency_ms, ok))
+
+    def snapshot(self) -> dict:
+        n = len(self.outcomes)
+        if not n:
+            return {"samples": 0}
+        latencies = sorted(l for l, _ in self.outcomes)
+        errors = sum(1 for _, ok in self.outcomes if not ok)
+        return {
+            "samples": n,
+            "p50LatencyMs": round(latencies[n // 2], 1),
+            "p90LatencyMs": round(latencies[min(n - 1, int(n * 0.9))], 1),
+            "errorRate": round(errors / n, 3),
+        }
+
+
+class ModelRouter:
+    def __init__(self, config: dict, window: int = 50):
+        self.config = config or {}
+        self.default_model = self.config.get("default_model", DEFAULT_MODEL)
+        self.window = window
+        self._observed: dict[tuple[str, str, str], _Observed] = {}
+        self._pending: dict[str, dict[str, tuple[str, str, str, float]]] = {}
+        self._degraded_since: dict[tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: str) -> "ModelRouter":
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                config = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Model routes not loaded from {path} ({e}) — using {DEFAULT_MODEL} everywhere")
+            config = {}
+        return cls(config)
+
+    def _stage_routes(self, stage: str) -> list[dict]:
+        return self.config.get("stages", {}).get(stage, {}).get("routes", [])
+
+    def _over_budget(self, stage: str, name: str, model: str, budget: dict) -> bool:
+        if not budget:
+            return False
+        with self._lock:
+            observed = self._observed.get((stage, name, model))
+            snap = observed.snapshot() if observed else {"samples": 0}
+        if snap["samples"] < budget.get("min_samples", 5):
+            return False
+        if "max_latency_ms" in budget and snap["p50LatencyMs"] > budget["max_latency_ms"]:
+            return True
+        if "max_error_rate" in budget and snap["errorRate"] > budget["max_error_rate"]:
+            return True
+        return False
+
+    def route(self, stage: str, profile: DocumentProfile | None = None) -> Route:
+        """Pick the model + generation config overrides for one stage of one document."""
+        for spec in self._stage_routes(stage):
+            if not _matches(spec.get("when", {}), profile):
+                continue
+            name = spec.get("name", "default")
+            model = spec.get("model", self.default_model)
+            fallback = spec.get("fallback")
+            budget = spec.get("budget", {})
+            if fallback and self._over_budget(stage, name, model, budget):
+                if not self._retry_primary(stage, name, model, budget):
+                    return Route(stage, name, fallback.get("model", model), dict(fallback.get("config", {})), degraded=True)
+            return Route(stage, name, model, dict(spec.get("config", {})))
+        return Route(stage, "default", self.default_model)
+
+    def _retry_primary(self, stage: str, name: str, model: str, budget: dict) -> bool:
+        """After ``retry_after_s`` on the fallback, reset the primary's window and try it again."""
+        now = time.monotonic()
+        with self._lock:
+            since = self._degraded_since.setdefault((stage, name), now)
+            if now - since < budget.get("retry_after_s", 60):
+                return False
+            self._degraded_since.pop((stage, name), None)
+            self._observed.pop((stage, name, model), None)
+        logger.info(f"Model route {stage}/{name}: retrying primary model {model}")
+        return True
+
+    def generate_config(self, route: Route, **base):
+        """GenerateContentConfig from call-site defaults overlaid with the route's config.
+
+        Inside a request with a deadline, the HTTP timeout is capped at its remaining time.
+        """
+        from google.genai import types
+
+        options = deadline.http_options()
+        if options is not None:
+            base.setdefault("http_options", options)
+        return types.GenerateContentConfig(**{**base, **route.config})
+
+    # -- observations ------------------------------------------------------
+
+    def record(self, route: Route, latency_ms: float, ok: bool) -> None:
+        key = (route.stage, route.name, route.model)
+        with self._lock:
+            observed = self._observed.get(key)
+            if observed is None:
+                observed = self._observed[key] = _Observed(self.window)
+            observed.add(latency_ms, ok)
+
+    @contextmanager
+    def observe(self, route: Route):
+        """Time a model call; exceptions and timeouts count as errors.
+
+        Cancellation (client disconnect, outer deadline) records nothing: it says
+        nothing about the model, and counting it would push healthy routes to fallback.
+        """
+        t0 = time.perf_counter()
+        try:
+            yield
+        except (asyncio.CancelledError, GeneratorExit):
+            raise
+        except BaseException:
+            self.record(route, (time.perf_counter() - t0) * 1000, False)
+            raise
+        else:
+            self.record(route, (time.perf_counter() - t0) * 1000, True)
+
+    def begin(self, run_key: str, route: Route) -> None:
+        """Start timing a call whose outcome is reported later (ADK callbacks)."""
+        with self._lock:
+            self._pending.setdefault(run_key, {})[route.stage] = (route.stage, route.name, route.model, time.perf_counter())
+
+    def finish(self, run_key: str, stage: str, ok: bool = True) -> None:
+        with self._lock:
+            item = self._pending.get(run_key, {}).pop(stage, None)
+        if item:
+            stage, name, model, t0 = item
+            self.record(Route(stage, name, model), (time.perf_counter() - t0) * 1000, ok)
+
+    def settle(self, run_key: str, cancelled: bool = False) -> None:
+        """Count calls that never finished (errors, timeouts) as failures.
+
+        A run that ended by cancellation only drops its pending calls (see observe()).
+        """
+        with self._lock:
+            pending = self._pending.pop(run_key, {})
+        if cancelled:
+            return
+        for stage, name, model, t0 in pending.values():
+            self.record(Route(stage, name, model), (time.perf_counter() - t0) * 1000, False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                f"{stage}/{name}/{model}": observed.snapshot()
+                for (stage, name, model), observed in sorted(self._observed.items())
+            }
+
+
+_router: ModelRouter | None = None
+
+
+def get_router() -> ModelRouter:
+    global _router
+    if _router is None:
+        _router = ModelRouter.from_file(os.environ.get("MODEL_ROUTES_PATH", DEFAULT_ROUTES_PATH))
+    return _router
+
+
+# ---------------------------------------------------------------------------
+# ADK integration
+# ---------------------------------------------------------------------------
+
+# ADK agent name → router stage
+AGENT_STAGES = {
+    "document_parser": "parse",
+    "risk_analyzer": "analyze",
+    "unified_translator_action": "translate",
+}
+
+
+def adk_before_model(callback_context, llm_request):
+    """before_model_callback: swap in the routed model/config for this agent and document."""
+    stage = AGENT_STAGES.get(callback_context.agent_name)
+    if not stage:
+        return None
+    router = get_router()
+    profile = DocumentProfile.from_dict(callback_context.state.get("route_profile"))
+    route = router.route(stage, profile)
+    llm_request.model = route.model
+    if route.config and llm_request.config is not None:
+        from google.genai import types
+
+        merged = llm_request.config.model_dump(exclude_none=True)
+        merged.update(route.config)
+        llm_request.config = types.GenerateContentConfig.model_validate(merged)
+    options = deadline.http_options()
+    if options is not None and llm_request.config is not None:
+        if llm_request.config.http_options is None:
+            llm_request.config.http_options = options
+        else:
+            llm_request.config.http_options.timeout = options.timeout
+    run_key = callback_context.state.get("route_key")
+    if run_key:
+        router.begin(run_key, route)
+    return None
+
+
+def adk_after_model(callback_context, llm_response):
+    """after_model_callback: record the observed latency/outcome for the routed model."""
+    stage = AGENT_STAGES.get(callback_context.agent_name)
+    run_key = callback_context.state.get("route_key")
+    if stage and run_key:
+        get_router().finish(run_key, stage, ok=not getattr(llm_response, "error_code", None))
+    return None
@@ -0,0 +1,392 @@
+"""Rule-based offline analysis — 모델 장애 시 실제 업로드를 규칙(data/risk_patterns.json)으로 분석"""
+
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+
+from build_assets import DATA_DIR
+from clauses import load_standard_clauses, match_by_title, normalize_number, split_clauses
+from tiered import core_action
+
+logger = logging.getLogger("clearsign.offline")
+
+DEFAULT_RULES_PATH = os.path.join(DATA_DIR, "risk_patterns.json")
+
+MAX_SCORE = 95  # rules never claim the certainty of a full analysis
+DEVIATED_SCORE = 41  # same cut-off as the analyzer prompt ("41 이상인 조항만 deviated_clauses")
+RULE_BASELINE_SCORE = 10  # a clause a rule covers, with none of its signals
+BASELINE_SCORE = 5
+DEFAULT_RISK_AMOUNT = 1_000_000  # ensure_risk_amounts' default when no amount is known
+# 전월세 전환율 연 6% — monthly equivalent of a jeonse deposit when the contract has no rent
+RENT_CONVERSION_MONTHLY = 0.005
+
+# "₩250,000,000", "5,000만원", "1억 2,000만원", "50만원", "300,000원"
+_AMOUNT_RE = re.compile(
+    r"₩ ?\d[\d,]*"
+    r"|\d[\d,]* ?(?:억|천만|백만|만)(?: ?\d[\d,]* ?(?:천만|백만|만))? ?원?"
+    r"|\d[\d,]* ?원"
+)
+_UNIT_RE = re.compile(r"(\d+)(억|천만|백만|만)?")
+_UNITS = {"억": 100_000_000, "천만": 10_000_000, "백만": 1_000_000, "만": 10_000, "": 1}
+_DEPOSIT_RE = re.compile(r"보증금")
+_RENT_RE = re.compile(r"차임|월세")
+_PERCENT_RE = re.compile(r"(\d+(?:\.\d+)?) ?%")
+_SENTENCE_RE = re.compile(r"(?<=[.。])\s+|\n")
+
+_SAFETY_CHECKLIST = (
+    "① 등기부등본 열람 (인터넷등기소: iros.go.kr)\n"
+    "② 전입신고 + 확정일자 (주민센터)\n"
+    "③ 대한법률구조공단 무료 상담 (☎ 132)\n"
+    "④ 주택임대차분쟁조정위원회 (☎ 1533-8119)"
+)
+_OFFLINE_NOTE = (
+    "ℹ️ AI 분석을 일시적으로 사용할 수 없어 주요 위험 유형(보증금 반환·계약 해지·수리 책임·위약금·권리 포기)만 "
+    "규칙으로 확인했습니다. 다른 조항도 직접 읽어 보시고, 잠시 후 다시 분석해 보세요."
+)
+
+
+# ---------------------------------------------------------------------------
+# Amounts
+# ---------------------------------------------------------------------------
+
+def parse_won(text: str) -> int:
+    """"1억 2,000만원" → 120000000 (digits with 억/만 units; Hangul numerals are not read)."""
+    compact = re.sub(r"[₩원,\s]", "", text)
+    return sum(int(n) * _UNITS[unit] for n, unit in _UNIT_RE.findall(compact))
+
+
+def format_won(amount: int) -> str:
+    """120000000 → "1억 2,000만원", 5000000 → "500만원"."""
+    if amount >= 100_000_000:
+        eok, man = divmod(amount // 10_000, 10_000)
+        return f"{eok}억 {man:,}만원" if man else f"{eok}억원"
+    if amount >= 10_000 and amount % 10_000 == 0:
+        return f"{amount // 10_000:,}만원"
+    return f"{amount:,}원"
+
+
+def find_amount(text: str, label: re.Pattern, minimum: int = 10_000) -> int:
+    """First amount written on the same line shortly after ``label`` (0 if none)."""
+    for m in label.finditer(text):
+        window = text[m.end():m.end() + 60].split("\n", 1)[0]
+        for amount in _AMOUNT_RE.finditer(window):
+            value = parse_won(amount.group())
+            if value >= minimum:
+                return value
+    return 0
+
+
+def risk_amount(score: int, deposit: int, rent: int) -> int:
+    """Worst-case loss for a clause — the analyzer prompt's table (위험 금액 직접 계산 기준)."""
+    monthly = rent or round(deposit * RENT_CONVERSION_MONTHLY)
+    if score >= 90:
+        amount = deposit * 0.20
+    elif score >= 80:
+        amount = deposit * 0.10
+    elif score >= 70:
+        amount = deposit * 0.15
+    elif score >= 60:
+        amount = monthly * 12
+    elif score >= 40:
+        amount = monthly * 6
+    else:
+        amount = monthly * 3
+    return int(round(amount, -3)) or DEFAULT_RISK_AMOUNT
+
+
+# ---------------------------------------------------------------------------
+# Rules
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Signal:
+    id: str
+    score: int
+    direction: str
+    easy: str
+    pattern: re.Pattern | None = None
+    absent: re.Pattern | None = None
+    unless: re.Pattern | None = None
+    rate_above: float | None = None
+    per_point: float = 0
+
+    def match(self, body: str, rate: float | None) -> int:
+        """Score this signal contributes for a clause body (0 = not found)."""
+        if self.rate_above is not None:
+            if rate is None or rate <= self.rate_above:
+                return 0
+            return self.score + round((rate - self.rate_above) * self.per_point)
+        if self.absent is not None and self.absent.search(body):
+            return 0
+        if self.pattern is not None and not self.pattern.search(body):
+            return 0
+        if self.unless is not None and self.unless.search(body):
+            return 0
+        return self.score
+
+
+@dataclass
+class RiskRule:
+    id: str
+    name: str
+    standard: str
+    standard_title: str
+    title: re.Pattern
+    body: re.Pattern | None
+    signals: list[Signal]
+    texts: dict = field(default_factory=dict, repr=False)
+
+    def applies(self, clause: dict) -> bool:
+        if self.title.search(clause.get("title", "")):
+            return True
+        return self.body is not None and bool(self.body.search(clause.get("body", "")))
+
+    def evaluate(self, clause: dict) -> tuple[int, list[tuple[Signal, int]]]:
+        """Deviation score of a clause under this rule, with the signals that matched."""
+        body = clause.get("body", "")
+        rate = penalty_rate(body) if any(s.rate_above is not None for s in self.signals) else None
+        hits = [(s, points) for s in self.signals if (points := s.match(body, rate))]
+        if not hits:
+            return RULE_BASELINE_SCORE, []
+        return min(MAX_SCORE, sum(points for _, points in hits)), hits
+
+
+def penalty_rate(body: str) -> float | None:
+    """Highest percentage written in the sentences that mention 위약금."""
+    rates = [
+        float(p)
+        for sentence in _SENTENCE_RE.split(body) if "위약금" in sentence
+        for p in _PERCENT_RE.findall(sentence)
+    ]
+    return max(rates) if rates else None
+
+
+def _compile(pattern: str | None) -> re.Pattern | None:
+    return re.compile(pattern) if pattern else None
+
+
+def load_rules(path: str = DEFAULT_RULES_PATH) -> list[RiskRule]:
+    """Risk rules from data/risk_patterns.json, regexes compiled once (bad patterns fail at startup)."""
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    rules = []
+    for spec in config.get("rules", []):
+        signals = [
+            Signal(
+                id=s["id"],
+                score=s["score"],
+                direction=s["direction"],
+                easy=s["easy"],
+                pattern=_compile(s.get("pattern")),
+                absent=_compile(s.get("absent")),
+                unless=_compile(s.get("unless")),
+                rate_above=s.get("rate_above"),
+                per_point=s.get("per_point", 0),
+            )
+            for s in spec["signals"]
+        ]
+        texts = {k: v for k, v in spec.items() if k not in ("id", "name", "standard", "standard_title", "title", "body", "signals")}
+        rules.append(RiskRule(
+            id=spec["id"],
+            name=spec["name"],
+            standard=normalize_number(spec["standard"]),
+            standard_title=spec["standard_title"],
+            title=re.compile(spec["title"]),
+            body=_compile(spec.get("body")),
+            signals=signals,
+            texts=texts,
+        ))
+    logger.info(f"Loaded {len(rules)} offline risk rule(s): {', '.join(r.id for r in rules)}")
+    return rules
+
+
+_rules: list[RiskRule] | None = None
+
+
+def get_rules() -> list[RiskRule]:
+    global _rules
+    if _rules is None:
+        _rules = load_rules()
+    return _rules
+
+
+# ---------------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------------
+
+def _standard_clause(rule: RiskRule, reference: dict[str, dict]) -> dict | None:
+    """The reference clause a rule compares against: same number, same topic by title, else the 주택 표준."""
+    std = reference.get(rule.standard)
+    if std and match_by_title(rule.standard_title, {"x": std}):
+        return std
+    return match_by_title(rule.standard_title, reference) or load_standard_clauses().get(rule.standard)
+
+
+def _legal_lines(std: dict | None) -> str:
+    if not std:
+        return ""
+    lines = []
+    if std.get("key_protection"):
+        lines.append(f"📚 표준 기준: {std['key_protection']}")
+    basis = std.get("legal_basis") or {}
+    if basis.get("law"):
+        lines.append(f"⚖️ 근거: {basis['law']} {basis.get('article', '')} — {basis.get('protection') or basis.get('content', '')}")
+    return "\n\n" + "\n".join(lines) if lines else ""
+
+
+def _deviated_clause(clause: dict, rule: RiskRule, score: int, hits, values: dict, std: dict | None) -> dict:
+    direction = " + ".join(s.direction.format_map(values) for s, _ in hits[:3])
+    values = {**values, "direction": direction}
+    texts = rule.texts
+    return {
+        "number": clause["number"],
+        "title": clause.get("title") or rule.name,
+        "deviationScore": score,
+        "riskAmount": values["riskAmount"],
+        "direction": direction,
+        "original": clause.get("body", ""),
+        "standard": (std or {}).get("body", ""),
+        "easyKorean": {
+            "level1": " ".join(s.easy.format_map(values) for s, _ in hits[:2]),
+            "level2": texts["level2"].format_map(values),
+            "level3": texts["level3"].format_map(values),
+        },
+        "structuredBreakdown": dict(texts.get("breakdown", {})),
+        "termGlossary": list(texts.get("glossary", [])),
+        "action": {
+            **core_action(score),
+            "message": texts["action"].format_map(values) + _legal_lines(std),
+        },
+    }
+
+
+def _comprehension(flagged: list[tuple[dict, RiskRule]], values_by_number: dict[str, dict]) -> dict:
+    """Quiz from the rules behind the riskiest clauses (one question per rule)."""
+    cloze, scenario, ideas, seen = [], [], [], set()
+    for clause, rule in flagged:
+        if rule.id in seen:
+            continue
+        seen.add(rule.id)
+        values = values_by_number[clause["number"]]
+        if "cloze" in rule.texts and len(cloze) < 3:
+            q = rule.texts["cloze"]
+            cloze.append({
+                "clauseNumber": clause["number"],
+                "questionType": "cloze",
+                "sentence": q["sentence"],
+                "question": "빈칸에 들어갈 알맞은 말은 무엇인가요?",
+                "answer": q["answer"],
+                "acceptableSynonyms": list(q.get("acceptableSynonyms", [])),
+                "scoringNote": "의미 일치 여부만 판단. 철자·조사 오류 허용.",
+            })
+        if "scenario" in rule.texts and len(scenario) < 2:
+            q = rule.texts["scenario"]
+            scenario.append({
+                "clauseNumber": clause["number"],
+                "questionType": "scenario",
+                "scenario": q["scenario"].format_map(values),
+                "question": q["question"],
+                "choices": [dict(c) for c in q["choices"]],
+                "correctAnswer": q["correctAnswer"],
+                "explanation": q["explanation"],
+            })
+        if rule.texts.get("recall"):
+            ideas.append(rule.texts["recall"])
+    result = {"clozeQuestions": cloze, "scenarioQuestions": scenario, "recallQuestions": []}
+    if len(ideas) >= 2:
+        required = max(1, (len(ideas) + 1) // 2)
+        result["recallQuestions"].append({
+            "questionType": "recall",
+            "question": f"이 계약서에서 위험한 점 {required}가지는 무엇인가요?",
+            "goldStandardIdeas": ideas,
+            "scoringNote": f"{len(ideas)}가지 중 {required}가지 이상 언급하면 충분히 이해한 것으로 판단",
+        })
+    return result
+
+
+def analyze_text(text: str, reference: dict[str, dict] | None = None, rules: list[RiskRule] | None = None,
+                 min_clauses: int = 3) -> dict | None:
+    """Full frontend-schema report for contract text; None when the clauses cannot be split reliably.
+
+    ``reference`` is the selected reference contract's clause index (ReferenceTemplate.clauses).
+    """
+    clauses = split_clauses(text or "")
+    if len(clauses) < min_clauses:
+        return None
+    rules = rules if rules is not None else get_rules()
+    reference = reference if reference is not None else load_standard_clauses()
+    deposit = find_amount(text, _DEPOSIT_RE, minimum=1_000_000)
+    rent = find_amount(text, _RENT_RE)
+
+    flagged, safe, values_by_number = [], [], {}
+    for clause in clauses:
+        best = None  # (score, rule, hits) — first rule wins ties, so library order is the priority
+        for rule in rules:
+            if rule.applies(clause):
+                score, hits = rule.evaluate(clause)
+                if best is None or score > best[0]:
+                    best = (score, rule, hits)
+        score = best[0] if best else BASELINE_SCORE
+        if score < DEVIATED_SCORE:
+            safe.append({
+                "number": clause["number"],
+                "title": clause.get("title", ""),
+                "deviationScore": score,
+                "status": "caution" if score > 20 else "safe",
+                "body": clause.get("body", ""),
+            })
+            continue
+        _, rule, hits = best
+        rate = penalty_rate(clause.get("body", ""))
+        amount = risk_amount(score, deposit, rent)
+        values = {
+            "number": clause["number"],
+            "riskAmount": amount,
+            "amount": format_won(amount),
+            "deposit": format_won(deposit) if deposit else "전액",
+            "rate": f"{rate:g}" if rate is not None else "",
+            "penalty": format_won(int(deposit * rate / 100)) if deposit and rate else "큰 금액",
+        }
+        values_by_number[clause["number"]] = values
+        flagged.append((_deviated_clause(clause, rule, score, hits, values, _standard_clause(rule, reference)), rule))
+
+    flagged.sort(key=lambda item: item[0]["deviationScore"], reverse=True)
+    deviated = [clause for clause, _ in flagged]
+    total = sum(c["riskAmount"] for c in deviated)
+    top = max((c["deviationScore"] for c in deviated), default=0)
+    level, grade = ("high", "위험") if top > 60 else ("medium", "주의") if deviated else ("low", "안전")
+
+    if deviated:
+        numbers = ", ".join(c["number"] for c in deviated)
+        message = (
+            "⚠️ 이 계약서는 표준 대비 임차인에게 불리한 조항이 감지되었습니다.\n\n"
+            f"🔴 위험 조항 {len(deviated)}개 발견 ({numbers})\n"
+            f"💰 최대 예상 손실: ₩{total:,}\n\n"
+            f"계약 전 반드시 확인하세요:\n{_SAFETY_CHECKLIST}"
+        )
+        overall = {"type": "warning", "message": f"{message}\n\n{_OFFLINE_NOTE}"}
+    else:
+        caution = [s["number"] for s in safe if s["status"] == "caution"]
+        message = "✅ 규칙으로 확인한 주요 위험 유형에서 임차인에게 불리한 조항이 발견되지 않았습니다."
+        if caution:
+            message += f"\n\n🟡 경미한 차이가 있는 조항: {', '.join(caution)}"
+        overall = {"type": "info", "message": f"{message}\n\n계약 전 확인하세요:\n{_SAFETY_CHECKLIST}\n\n{_OFFLINE_NOTE}"}
+
+    report = {
+        "summary": {
+            "totalMaxRisk": total,
+            "riskLevel": level,
+            "deviatedClauseCount": len(deviated),
+            "totalClauseCount": len(clauses),
+            "riskGrade": grade,
+            "headline": "이 계약서에서 잃을 수 있는 최대 금액",
+        },
+        "clauses": deviated,
+        "safeClausesSummary": safe,
+        "overallAction": overall,
+    }
+    if flagged:
+        report["comprehension"] = _comprehension(flagged, values_by_number)
+    return report
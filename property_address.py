@@ -0,0 +1,65 @@
+"""Leased property address (소재지) from contract text or parser output, for the fraud-check prefetch."""
+
+import json
+import re
+
+# "1. 부동산의 표시", "제1조 (목적물의 표시)", "임차주택의 표시"
+_SECTION_RE = re.compile(r"(?:부동산|목적물|임대주택|임차주택)의?\s*표시")
+# 소재지 label: value on the same line ("소재지: 서울 ...") or on the next one (table cells)
+_LABEL_RE = re.compile(r"(?:^|\n)[ \t]*소재지[ \t]*[:：]?[ \t]*([^\n]*)")
+_REGION_RE = re.compile(
+    r"^(?:서울|부산|대구|인천|광주|대전|울산|세종|경기|강원|충청|충북|충남|전라|전북|전남|경상|경북|경남|제주)\S*\s+\S+"
+)
+# Unit detail after the building address: "○○빌라 제3층 제301호", "101동 1203호"
+_UNIT_RE = re.compile(r"\s+(?:제\s*\S+?(?:층|호)|\d[\d-]*\s*(?:동|층|호))(?:\s.*)?$")
+MAX_ADDRESS_LENGTH = 120
+
+
+def clean_address(value) -> str | None:
+    """Building-level address (region … road/lot number), or None if ``value`` isn't one."""
+    if not isinstance(value, str):
+        return None
+    address = " ".join(value.split())
+    address = re.split(r"[,，(（]", address, maxsplit=1)[0].strip()
+    address = _UNIT_RE.sub("", address).strip()
+    if not address or len(address) > MAX_ADDRESS_LENGTH or len(address.split()) < 2:
+        return None
+    return address
+
+
+def cache_key(address: str) -> str:
+    """Shared-store key of one fraud-check result (whitespace-insensitive)."""
+    return " ".join(address.split())
+
+
+def extract_property_address(text: str | None) -> str | None:
+    """Leased property's address from contract text (소재지 under 부동산/목적물의 표시).
+
+    Party and broker addresses come later in the standard layout, so the first 소재지 after the
+    property section heading wins; without a heading, the first 소재지 line is used.
+    """
+    if not text:
+        return None
+    section = _SECTION_RE.search(text)
+    starts = [section.start()] if section else []
+    starts.append(0)
+    for start in starts:
+        m = _LABEL_RE.search(text, start)
+        if m is None:
+            continue
+        value = m.group(1).strip() or text[m.end():].lstrip("\n").split("\n", 1)[0].strip()
+        if _REGION_RE.match(value):
+            return clean_address(value)
+    return None
+
+
+def address_from_parsed(parsed) -> str | None:
+    """Address the parser agent returned (parsed_document.property_address; dict or JSON text)."""
+    if isinstance(parsed, str):
+        try:
+            parsed = json.loads(parsed)
+        except ValueError:
+            return None
+    if not isinstance(parsed, dict):
+        return None
+    return clean_address(parsed.get("property_address"))
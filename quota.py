@@ -0,0 +1,185 @@
+"""Per-identity token-bucket quotas with a shared global bucket and fair share ("N/S" = N per S seconds).
+
+Buckets live in worker memory, so limits apply per worker process.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+
+logger = logging.getLogger("clearsign.quota")
+
+
+@dataclass
+class Limit:
+    requests: int
+    period: float
+
+    @property
+    def rate(self) -> float:
+        return self.requests / self.period
+
+    @property
+    def policy(self) -> str:
+        return f"{self.requests};w={int(self.period)}"
+
+
+def parse_limit(spec: str) -> Limit:
+    """"10/60" → 10 requests per 60 seconds."""
+    count, _, period = (spec or "").strip().partition("/")
+    limit = Limit(int(count), float(period or 60))
+    if limit.requests <= 0 or limit.period <= 0:
+        raise ValueError(f"Invalid quota limit: {spec!r}")
+    return limit
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, capacity: float, now: float):
+        self.tokens = capacity
+        self.updated = now
+
+    def refill(self, limit: Limit, now: float) -> None:
+        self.tokens = min(limit.requests, self.tokens + (now - self.updated) * limit.rate)
+        self.updated = now
+
+    def wait_seconds(self, limit: Limit) -> float:
+        """Seconds until one token is available."""
+        return max(0.0, (1 - self.tokens) / limit.rate)
+
+
+class _Usage:
+    """Exponentially decayed request count for one identity (fair-share input)."""
+
+    __slots__ = ("count", "updated")
+
+    def __init__(self, now: float):
+        self.count = 0.0
+        self.updated = now
+
+    def decay(self, window: float, now: float) -> float:
+        self.count *= math.exp(-(now - self.updated) / window)
+        self.updated = now
+        return self.count
+
+
+@dataclass
+class Decision:
+    allowed: bool
+    limit: Limit
+    remaining: int
+    reset_seconds: int
+    retry_after: int = 0
+    reason: str = ""
+
+    def headers(self) -> dict[str, str]:
+        headers = {
+            "RateLimit-Limit": str(self.limit.requests),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(self.reset_seconds),
+            "RateLimit-Policy": self.limit.policy,
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(self.retry_after)
+        return headers
+
+
+class QuotaLimiter:
+    def __init__(
+        self,
+        limits: dict[str, Limit],
+        global_limit: Limit,
+        max_keys: int = 10000,
+        idle_seconds: float = 600,
+        tight_fraction: float = 0.25,
+    ):
+        self.limits = limits
+        self.global_limit = global_limit
+        self.max_keys = max_keys
+        self.idle_seconds = idle_seconds
+        self.tight_fraction = tight_fraction
+        self._buckets: OrderedDict[tuple[str, str], _Bucket] = OrderedDict()
+        self._usage: OrderedDict[str, _Usage] = OrderedDict()
+        self._global = _Bucket(global_limit.requests, time.monotonic())
+        self._lock = threading.Lock()
+        self.counters: Counter = Counter()
+
+    def check(self, endpoint: str, identity: str) -> Decision:
+        """Take one token for ``identity`` on ``endpoint`` if its bucket and the shared quota allow."""
+        limit = self.limits[endpoint]
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            bucket = self._buckets.get((endpoint, identity))
+            if bucket is None:
+                bucket = self._buckets[(endpoint, identity)] = _Bucket(limit.requests, now)
+            else:
+                self._buckets.move_to_end((endpoint, identity))
+            bucket.refill(limit, now)
+
+            usage = self._usage.get(identity)
+            if usage is None:
+                usage = self._usage[identity] = _Usage(now)
+            else:
+                self._usage.move_to_end(identity)
+            used = usage.decay(self.global_limit.period, now)
+
+            self._global.refill(self.global_limit, now)
+            reason = ""
+            if bucket.tokens < 1:
+                reason, wait = "identity", bucket.wait_seconds(limit)
+            elif self._global.tokens < 1:
+                reason, wait = "global", self._global.wait_seconds(self.global_limit)
+            elif self._global.tokens < self.global_limit.requests * self.tight_fraction:
+                # Shared quota is tight: only identities under their fair share may proceed
+                fair_share = self.global_limit.requests / max(1, len(self._usage))
+                if used >= fair_share:
+                    reason, wait = "fair_share", self._global.wait_seconds(self.global_limit) or 1.0
+
+            if reason:
+                self.counters[f"rejected_{reason}"] += 1
+                return Decision(
+                    allowed=False,
+                    limit=limit,
+                    remaining=int(bucket.tokens),
+                    reset_seconds=math.ceil((limit.requests - bucket.tokens) / limit.rate),
+                    retry_after=max(1, math.ceil(wait)),
+                    reason=reason,
+                )
+
+            bucket.tokens -= 1
+            self._global.tokens -= 1
+            usage.count += 1
+            self.counters["allowed"] += 1
+            return Decision(
+                allowed=True,
+                limit=limit,
+                remaining=int(bucket.tokens),
+                reset_seconds=math.ceil((limit.requests - bucket.tokens) / limit.rate),
+            )
+
+    def _evict(self, now: float) -> None:
+        """Drop least-recently-used keys that are idle or beyond ``max_keys`` (amortized O(1))."""
+        for entries in (self._buckets, self._usage):
+            while entries:
+                oldest = next(iter(entries.values()))
+                if now - oldest.updated <= self.idle_seconds and len(entries) <= self.max_keys:
+                    break
+                entries.popitem(last=False)
+                self.counters["evicted"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._global.refill(self.global_limit, time.monotonic())
+            return {
+                "limits": {name: limit.policy for name, limit in self.limits.items()},
+                "global": self.global_limit.policy,
+                "globalRemaining": int(self._global.tokens),
+                "trackedKeys": len(self._buckets),
+                "activeIdentities": len(self._usage),
+                **self.counters,
+            }
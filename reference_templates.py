@@ -0,0 +1,157 @@
+"""Reference contract registry (data/reference_templates.json) and local contract-type detection."""
+
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+
+from build_assets import BUILD_DIR, DATA_DIR, read_if_fresh
+from clauses import normalize_number, split_clauses
+
+logger = logging.getLogger("clearsign.templates")
+
+DEFAULT_REGISTRY_PATH = os.path.join(DATA_DIR, "reference_templates.json")
+
+# Keyword weights by where they appear in the contract
+_WEIGHTS = {"title": 3, "headings": 2, "body": 1}
+_SPACE_RE = re.compile(r"\s+")
+
+
+@dataclass
+class ReferenceTemplate:
+    id: str
+    name: str
+    source: str
+    key_points: list[str] = field(default_factory=list)
+    detect: dict = field(default_factory=dict)
+    document: dict = field(default_factory=dict, repr=False)
+    prompt_text: str = field(default="", repr=False)
+    clauses: dict[str, dict] = field(default_factory=dict, repr=False)
+    sources: list[str] = field(default_factory=list)
+
+    def score(self, title: str, headings: str, body: str) -> tuple[int, list[str]]:
+        """Weighted count of distinct detect keywords found in each part of the contract."""
+        text = {"title": title, "headings": headings, "body": body}
+        score, signals = 0, []
+        for part, weight in _WEIGHTS.items():
+            for keyword in self.detect.get(part, []):
+                if _compact(keyword) in text[part]:
+                    score += weight
+                    signals.append(f"{part}:{keyword}")
+        return score, signals
+
+    def summary(self) -> dict:
+        return {"id": self.id, "name": self.name}
+
+
+def _compact(text: str) -> str:
+    return _SPACE_RE.sub("", text or "").lower()
+
+
+def load_template_document(path: str, _seen: tuple[str, ...] = ()) -> tuple[dict, list[str]]:
+    """Template JSON with ``extends`` resolved; also returns every file it was built from."""
+    path = os.path.normpath(path)
+    if path in _seen:
+        raise ValueError(f"Circular template extends: {path}")
+    with open(path, "r", encoding="utf-8") as f:
+        doc = json.load(f)
+    base_ref = doc.pop("extends", None)
+    if not base_ref:
+        return doc, [path]
+    base, sources = load_template_document(os.path.join(os.path.dirname(path), base_ref), (*_seen, path))
+    merged = {normalize_number(c["number"]): c for c in base.get("clauses", [])}
+    for clause in doc.get("clauses", []):
+        merged[normalize_number(clause["number"])] = clause
+    return {**base, **doc, "clauses": list(merged.values())}, [*sources, path]
+
+
+def render_template(doc: dict) -> str:
+    """Prompt fragment inlined into the analyzer prompt (agents.analyzer_instruction)."""
+    return json.dumps(doc, ensure_ascii=False, indent=2)
+
+
+def prompt_build_path(template_id: str) -> str:
+    return os.path.join(BUILD_DIR, f"template_{template_id}.prompt.txt")
+
+
+class TemplateRegistry:
+    def __init__(self, templates: list[ReferenceTemplate], default_id: str):
+        self.templates = {t.id: t for t in templates}
+        if default_id not in self.templates:
+            raise ValueError(f"Default reference template {default_id!r} is not defined")
+        self.default = self.templates[default_id]
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_REGISTRY_PATH) -> "TemplateRegistry":
+        with open(path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        templates = []
+        for spec in config.get("templates", []):
+            source = os.path.join(os.path.dirname(path), spec["source"])
+            doc, sources = load_template_document(source)
+            build_path = prompt_build_path(spec["id"])
+            # The Docker build precomputes the prompt text (build_assets.py); render it only if missing/stale
+            prompt_text = read_if_fresh(build_path, sources, "r") or render_template(doc)
+            templates.append(ReferenceTemplate(
+                id=spec["id"],
+                name=spec.get("name") or doc.get("title", spec["id"]),
+                source=source,
+                key_points=list(spec.get("key_points", [])),
+                detect=dict(spec.get("detect", {})),
+                document=doc,
+                prompt_text=prompt_text,
+                clauses={normalize_number(c["number"]): c for c in doc.get("clauses", [])},
+                sources=sources,
+            ))
+        registry = cls(templates, config.get("default", templates[0].id if templates else ""))
+        logger.info(f"Loaded {len(templates)} reference template(s): {', '.join(registry.templates)}")
+        return registry
+
+    def get(self, template_id: str | None) -> ReferenceTemplate:
+        return self.templates.get(template_id or "", self.default)
+
+    def classify(self, parsed) -> tuple[ReferenceTemplate, dict]:
+        """Pick the reference for a parsed contract (dict/JSON text with title + clauses).
+
+        Returns the template and the detection details (score, matched signals).
+        """
+        if isinstance(parsed, str):
+            try:
+                parsed = json.loads(parsed)
+            except ValueError:
+                parsed = None
+        if not isinstance(parsed, dict):
+            return self.default, {"score": 0, "signals": []}
+        clauses = [c for c in parsed.get("clauses", []) or [] if isinstance(c, dict)]
+        title = _compact(parsed.get("title", ""))
+        headings = _compact(" ".join(f"{c.get('number', '')} {c.get('title', '')}" for c in clauses))
+        body = _compact(" ".join(c.get("body", "") or "" for c in clauses))
+
+        best, best_score, best_signals = self.default, 0, []
+        for template in self.templates.values():
+            if not template.detect:
+                continue
+            score, signals = template.score(title, headings, body)
+            if score >= template.detect.get("min_score", 1) and score > best_score:
+                best, best_score, best_signals = template, score, signals
+        return best, {"score": best_score, "signals": best_signals}
+
+    def classify_text(self, text: str) -> tuple[ReferenceTemplate, dict]:
+        """Same as classify() for raw contract text (text uploads, PDF text layer)."""
+        title = next((line for line in text.splitlines() if line.strip()), "")[:60]
+        clauses = split_clauses(text) or [{"number": "", "title": "", "body": text}]
+        return self.classify({"title": title, "clauses": clauses})
+
+    def stats(self) -> dict:
+        return {"default": self.default.id, "templates": {t.id: t.name for t in self.templates.values()}}
+
+
+_registry: TemplateRegistry | None = None
+
+
+def get_registry() -> TemplateRegistry:
+    global _registry
+    if _registry is None:
+        _registry = TemplateRegistry.load(os.environ.get("REFERENCE_TEMPLATES_PATH", DEFAULT_REGISTRY_PATH))
+    return _registry
@@ -0,0 +1,256 @@
+"""Local comprehension quiz scoring — 자모 단위 유사 일치, 조사·동의어 허용 (no LLM call)"""
+
+import re
+import unicodedata
+from functools import lru_cache
+
+# Hangul compatibility jamo for syllable decomposition (U+AC00 + (L*21 + V)*28 + T)
+_LEADS = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_VOWELS = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+_TAILS = ("", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ", "ㄿ", "ㅀ",
+          "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ")
+
+# Trailing particles (조사) and copula endings, longest first
+_PARTICLES = sorted(
+    {
+        "에게서", "으로서", "으로써", "에서는", "에게는", "으로는", "이라고", "이라는", "입니다", "이에요",
+        "에서", "에게", "한테", "께서", "으로", "부터", "까지", "처럼", "보다", "마다", "이나", "이랑",
+        "하고", "라고", "라는", "이다", "예요", "에요", "이요", "은", "는", "이", "가", "을", "를",
+        "에", "의", "도", "로", "와", "과", "만", "나", "랑", "요",
+    },
+    key=len,
+    reverse=True,
+)
+
+# Built-in equivalents for the plain-language terms the pipeline itself uses (agents.py 7대 원칙)
+_GLOSSARY_TERMS = [
+    ("집주인", "임대인"),
+    ("세입자", "임차인"),
+    ("보증금", "전세금", "임대차보증금"),
+    ("월세", "차임"),
+    ("연장", "갱신"),
+    ("계약 끝내기", "해지", "해약"),
+    ("벌금", "위약금"),
+    ("다시 빌려주기", "전대"),
+    ("처음 상태로 고치기", "원상회복", "원상복구"),
+    ("권리 주장 힘", "대항력"),
+    ("약속 안 지키기", "채무불이행"),
+    ("한 달", "1달", "1개월", "30일"),
+    ("두 달", "2달", "2개월"),
+    ("석 달", "3달", "3개월"),
+]
+
+_WORD_RE = re.compile(r"[0-9a-z가-힣]+")
+_DIGITS_RE = re.compile(r"\d+")
+_STOPWORDS = {"것", "수", "등", "때", "경우", "및", "그", "저", "더", "안", "못", "모두", "모든", "너무", "정말", "아주"}
+# Predicates ("없습니다", "높게", "나가면") carry little of an idea's meaning for recall matching
+_PREDICATE_ENDINGS = ("니다", "다", "요", "게", "고", "면", "서", "야", "지")
+
+
+@lru_cache(maxsize=4096)
+def to_jamo(text: str) -> str:
+    """"보증금" → "ㅂㅗㅈㅡㅇㄱㅡㅁ" (non-Hangul characters are kept as-is)."""
+    out = []
+    for ch in text:
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            out.append(_LEADS[code // 588])
+            out.append(_VOWELS[(code % 588) // 28])
+            out.append(_TAILS[code % 28])
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def strip_particle(word: str) -> str:
+    # Up to two stacked particles: "세입자에게만" → "세입자"
+    for _ in range(2):
+        for particle in _PARTICLES:
+            if word.endswith(particle) and len(word) - len(particle) >= (2 if len(particle) == 1 else 1):
+                word = word[: -len(particle)]
+                break
+        else:
+            break
+    return word
+
+
+@lru_cache(maxsize=4096)
+def words(text: str) -> tuple[str, ...]:
+    """Lowercased words with trailing particles removed."""
+    text = unicodedata.normalize("NFC", text or "").lower()
+    return tuple(strip_particle(w) for w in _WORD_RE.findall(text))
+
+
+def normalize(text: str) -> str:
+    """Spacing-, punctuation- and particle-insensitive form."""
+    return "".join(words(text))
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, stopping early once it must exceed ``limit``."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        best = i
+        for j, cb in enumerate(b, 1):
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            current.append(value)
+            best = min(best, value)
+        if best > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def _fuzzy_limit(jamo: str) -> int:
+    # ~1 jamo error per 5 (one mistyped syllable in a 3-4 syllable word)
+    return max(1, len(jamo) // 5)
+
+
+_GLOSSARY = [{normalize(term) for term in group} for group in _GLOSSARY_TERMS]
+
+
+def _glossary_variants(target: str) -> set[str]:
+    for group in _GLOSSARY:
+        if target in group:
+            return set(group)
+    return set()
+
+
+def same_numbers(a: str, b: str) -> bool:
+    """Whole numbers must agree: "2개월" is never "1개월", and "11개월" doesn't contain it."""
+    return _DIGITS_RE.findall(a) == _DIGITS_RE.findall(b)
+
+
+def fuzzy_equal(response: str, target: str) -> bool:
+    if not same_numbers(response, target):
+        return False
+    a, b = to_jamo(response), to_jamo(target)
+    return edit_distance(a, b, _fuzzy_limit(b)) <= _fuzzy_limit(b)
+
+
+def _contains_fuzzy(response_words: tuple[str, ...], target: str) -> bool:
+    """Whether any run of response words matches ``target`` within the jamo edit budget."""
+    for size in (1, 2, 3):
+        for i in range(len(response_words) - size + 1):
+            if fuzzy_equal("".join(response_words[i:i + size]), target):
+                return True
+    return False
+
+
+def score_cloze(question: dict, response: str) -> dict:
+    answer = normalize(question.get("answer", ""))
+    synonyms = [normalize(s) for s in question.get("acceptableSynonyms", []) or []]
+    targets = [t for t in [answer, *synonyms] if t]
+    for t in list(targets):
+        targets.extend(v for v in _glossary_variants(t) if v not in targets)
+    given = normalize(response)
+    result = {"correct": False, "matchedBy": "none", "expected": question.get("answer", "")}
+    # Checked before every match path: containment and synonyms must not turn "11개월" into "1개월"
+    targets = [t for t in targets if same_numbers(given, t)]
+    if not given or not targets:
+        return result
+
+    if given == answer:
+        match = "exact"
+    elif given in targets:
+        match = "synonym"
+    elif any(t in given for t in targets if len(t) >= 2):
+        match = "contains"
+    elif any(fuzzy_equal(given, t) for t in targets):
+        match = "fuzzy"
+    elif any(_contains_fuzzy(words(response), t) for t in targets if len(t) >= 2):
+        match = "fuzzy"
+    else:
+        return result
+    return {**result, "correct": True, "matchedBy": match}
+
+
+def score_scenario(question: dict, response: str) -> dict:
+    correct_label = str(question.get("correctAnswer", "")).strip().upper()
+    given = (response or "").strip()
+    label = given.upper().rstrip(".)")
+    if len(label) != 1:
+        # Free-text answer: match it against the choice texts
+        norm = normalize(given)
+        label = next(
+            (str(c.get("label", "")).upper() for c in question.get("choices", []) if normalize(c.get("text", "")) == norm),
+            "",
+        )
+    return {"correct": bool(label) and label == correct_label, "given": label, "expected": correct_label}
+
+
+def _key_terms(idea: str) -> list[str]:
+    return [
+        w for w in words(idea)
+        if len(w) >= 2 and w not in _STOPWORDS and not w.endswith(_PREDICATE_ENDINGS)
+    ]
+
+
+def _term_found(term: str, response_text: str, response_words: tuple[str, ...]) -> bool:
+    if term in response_text or any(v in response_text for v in _glossary_variants(term)):
+        return True
+    if len(term) >= 3 and any(w.startswith(term[:2]) for w in response_words):
+        return True  # shared stem: "돌려주는" / "돌려받을"
+    return _contains_fuzzy(response_words, term)
+
+
+def _required_ideas(question: dict, total: int) -> int:
+    match = re.search(r"(\d+)\s*가지\s*(?:중\s*(\d+)\s*가지)?\s*이상", question.get("scoringNote", ""))
+    if match:
+        return min(total, int(match.group(2) or match.group(1)))
+    return max(1, -(-total * 2 // 3))
+
+
+def score_recall(question: dict, response: str, threshold: float = 0.4) -> dict:
+    """An idea counts when its key terms — weighted by 1 / (number of gold ideas
+    sharing the term) so "보증금" alone can't match every idea — cover ``threshold``."""
+    response_words = words(response)
+    response_text = normalize(response)
+    gold = [(idea, _key_terms(idea)) for idea in question.get("goldStandardIdeas", []) or []]
+    shared: dict[str, int] = {}
+    for _, terms in gold:
+        for t in set(terms):
+            shared[t] = shared.get(t, 0) + 1
+    ideas = []
+    for idea, terms in gold:
+        hits = [t for t in terms if _term_found(t, response_text, response_words)]
+        weight = sum(1 / shared[t] for t in terms)
+        coverage = sum(1 / shared[t] for t in hits) / weight if weight else 0.0
+        ideas.append({"idea": idea, "matched": coverage >= threshold, "matchedTerms": hits})
+    required = _required_ideas(question, len(ideas))
+    matched_count = sum(1 for i in ideas if i["matched"])
+    return {
+        "correct": bool(ideas) and matched_count >= required,
+        "matchedIdeas": matched_count,
+        "requiredIdeas": required,
+        "ideas": ideas,
+    }
+
+
+def score_quiz(comprehension: dict, answers: dict) -> dict:
+    """Grade a whole quiz; ``answers`` holds lists aligned with each question list."""
+    sections = {
+        "cloze": ("clozeQuestions", score_cloze),
+        "scenario": ("scenarioQuestions", score_scenario),
+        "recall": ("recallQuestions", score_recall),
+    }
+    result = {}
+    correct = total = 0
+    for name, (key, scorer) in sections.items():
+        questions = comprehension.get(key, []) or []
+        given = answers.get(name, []) or []
+        graded = [scorer(q, given[i] if i < len(given) else "") for i, q in enumerate(questions)]
+        result[name] = graded
+        correct += sum(1 for g in graded if g["correct"])
+        total += len(graded)
+    result["summary"] = {
+        "correct": correct,
+        "total": total,
+        "score": round(correct / total * 100) if total else 0,
+    }
+    return result
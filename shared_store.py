@@ -0,0 +1,190 @@
+"""Cross-worker key-value store with TTL (SQLite WAL file, in-process dict if the file can't be opened)."""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter
+
+logger = logging.getLogger("clearsign.shared_store")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    expires_at REAL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS kv_expires ON kv (expires_at);
+"""
+
+
+class SharedStore:
+    """Namespaced bytes store with per-entry TTL, safe across worker processes."""
+
+    def __init__(self, path: str, max_entries: int = 10000, purge_interval: float = 60):
+        self.path = path
+        self.max_entries = max_entries
+        self.purge_interval = purge_interval
+        self._last_purge = time.monotonic()
+        self.counters: Counter = Counter()
+        self._lock = threading.Lock()
+        self._memory: dict[tuple[str, str], tuple[bytes, float | None]] = {}
+        self._conn = None
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        except sqlite3.Error as e:
+            logger.warning(f"Shared store unavailable at {path} ({e}) — using process-local memory")
+
+    @property
+    def backend(self) -> str:
+        return "sqlite" if self._conn is not None else "memory"
+
+    # -- raw bytes ---------------------------------------------------------
+
+    def get(self, namespace: str, key: str) -> bytes | None:
+        now = time.time()
+        with self._lock:
+            if self._conn is None:
+                item = self._memory.get((namespace, key))
+                if item is None or (item[1] is not None and item[1] <= now):
+                    return None
+                return item[0]
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM kv WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+        if row is None or (row[1] is not None and row[1] <= now):
+            return None
+        return bytes(row[0])
+
+    def set(self, namespace: str, key: str, value: bytes, ttl: float | None = None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            if self._conn is None:
+                self._memory[(namespace, key)] = (value, expires_at)
+            else:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO kv (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                    (namespace, key, sqlite3.Binary(value), expires_at),
+                )
+        if time.monotonic() - self._last_purge >= self.purge_interval:
+            self._last_purge = time.monotonic()
+            self.purge_expired()
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            if self._conn is None:
+                self._memory.pop((namespace, key), None)
+                return
+            self._conn.execute("DELETE FROM kv WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def claim(self, namespace: str, key: str, ttl: float) -> bool:
+        """Atomically take a lease; True only for the first caller until it expires.
+
+        Used so that one worker builds shared artifacts while the others reuse them.
+        """
+        now = time.time()
+        with self._lock:
+            if self._conn is None:
+                item = self._memory.get((namespace, key))
+                if item is not None and (item[1] is None or item[1] > now):
+                    return False
+                self._memory[(namespace, key)] = (str(os.getpid()).encode(), now + ttl)
+                return True
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "DELETE FROM kv WHERE namespace = ? AND key = ? AND expires_at <= ?",
+                    (namespace, key, now),
+                )
+                cur = self._conn.execute(
+                    "INSERT OR IGNORE INTO kv (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                    (namespace, key, str(os.getpid()).encode(), now + ttl),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return cur.rowcount == 1
+
+    def purge_expired(self) -> int:
+        """Delete expired entries, then evict the soonest-expiring ones above max_entries."""
+        now = time.time()
+        with self._lock:
+            if self._conn is None:
+                expired = [k for k, (_, exp) in self._memory.items() if exp is not None and exp <= now]
+                for k in expired:
+                    del self._memory[k]
+                purged = len(expired)
+                excess = len(self._memory) - self.max_entries
+                if excess > 0:
+                    expiring = sorted((exp, k) for k, (_, exp) in self._memory.items() if exp is not None)
+                    for _, k in expiring[:excess]:
+                        del self._memory[k]
+                    evicted = min(excess, len(expiring))
+                else:
+                    evicted = 0
+            else:
+                purged = self._conn.execute(
+                    "DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+                ).rowcount
+                excess = self._conn.execute("SELECT COUNT(*) FROM kv").fetchone()[0] - self.max_entries
+                evicted = 0
+                if excess > 0:
+                    evicted = self._conn.execute(
+                        "DELETE FROM kv WHERE rowid IN "
+                        "(SELECT rowid FROM kv WHERE expires_at IS NOT NULL ORDER BY expires_at LIMIT ?)",
+                        (excess,),
+                    ).rowcount
+        self.counters["purged"] += purged
+        if evicted:
+            self.counters["evicted"] += evicted
+            logger.info(f"Shared store over {self.max_entries} entries — evicted {evicted}")
+        return purged
+
+    # -- compressed JSON ---------------------------------------------------
+
+    def get_json(self, namespace: str, key: str):
+        blob = self.get(namespace, key)
+        if blob is None:
+            return None
+        try:
+            return json.loads(zlib.decompress(blob))
+        except (zlib.error, ValueError):
+            return None
+
+    def set_json(self, namespace: str, key: str, value, ttl: float | None = None) -> None:
+        blob = zlib.compress(json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 6)
+        self.set(namespace, key, blob, ttl)
+
+    def stats(self) -> dict:
+        with self._lock:
+            if self._conn is None:
+                rows = {}
+                for (ns, _), (value, _) in self._memory.items():
+                    count, size = rows.get(ns, (0, 0))
+                    rows[ns] = (count + 1, size + len(value))
+            else:
+                rows = {
+                    ns: (count, size or 0)
+                    for ns, count, size in self._conn.execute(
+                        "SELECT namespace, COUNT(*), SUM(LENGTH(value)) FROM kv GROUP BY namespace"
+                    )
+                }
+        return {
+            "backend": self.backend,
+            "maxEntries": self.max_entries,
+            **self.counters,
+            "namespaces": {ns: {"entries": c, "bytes": b} for ns, (c, b) in sorted(rows.items())},
+        }
@@ -0,0 +1,89 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import adk_sessions
+from adk_sessions import BoundedInMemorySessionService, SessionRegistry
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    # Only the registry's clock: asyncio's event loop keeps the real time.monotonic
+    monkeypatch.setattr(adk_sessions, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def registry(**kwargs):
+    options = {"ttl_seconds": 600, "max_sessions": 2, **kwargs}
+    return SessionRegistry(BoundedInMemorySessionService(), "clearsign", **options)
+
+
+async def stored(reg, user_id, session_id):
+    return await reg.service.get_session(app_name=reg.app_name, user_id=user_id, session_id=session_id)
+
+
+def test_release_deletes_the_session_and_its_user_map(clock):
+    async def scenario():
+        reg = registry()
+        session = await reg.create("u1", state={"document": "x"})
+        assert reg.stats()["active"] == 1
+        await reg.release("u1", session.id)
+        assert await stored(reg, "u1", session.id) is None
+        assert reg.service.sessions["clearsign"] == {}
+        assert reg.stats()["live"] == 0 and reg.stats()["released"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_unreleased_sessions_expire_after_the_ttl(clock):
+    async def scenario():
+        reg = registry()
+        leaked = await reg.create("u1")
+        clock.now += 601
+        await reg.create("u2")
+        assert await stored(reg, "u1", leaked.id) is None
+        assert reg.stats()["evicted"] == 1 and reg.stats()["live"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_retained_sessions_are_evicted_oldest_first_and_counted_once(clock):
+    async def scenario():
+        reg = registry(retain=True)
+        first = await reg.create("u1", state={"report": "가" * 100})
+        await reg.release("u1", first.id)
+        second = await reg.create("u2")
+        await reg.release("u2", second.id)
+        assert reg.stats()["retainedBytes"] > 300
+        await reg.create("u3")
+        assert await stored(reg, "u1", first.id) is None
+        assert await stored(reg, "u2", second.id) is not None
+        assert reg.stats()["retainedBytes"] < 100
+
+    asyncio.run(scenario())
+
+
+def test_create_waits_while_every_slot_is_in_flight(clock):
+    async def scenario():
+        reg = registry(max_sessions=1)
+        running = await reg.create("u1")
+        waiter = asyncio.create_task(reg.create("u2"))
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        assert await stored(reg, "u1", running.id) is not None  # in-flight runs are never evicted
+        await reg.release("u1", running.id)
+        session = await asyncio.wait_for(waiter, 1)
+        assert session.user_id == "u2"
+        assert reg.stats()["waited"] == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,41 @@
+import json
+from types import SimpleNamespace
+
+from agents import build_clean_report, skip_translation_if_clean
+
+PARSED = {"clauses": [{"number": "제1조"}, {"number": "제2조"}, {"number": "제3조"}]}
+CLEAN_RISK = {
+    "deviated_clauses": [],
+    "safe_clauses": [
+        {"number": "제1조", "title": "목적", "deviationScore": 0, "status": "safe", "reason": "표준과 같음"},
+        {"number": "제2조", "title": "보증금", "deviationScore": 15, "status": "caution"},
+    ],
+}
+
+
+def context(risk):
+    return SimpleNamespace(state={"risk_analysis": json.dumps(risk, ensure_ascii=False), "parsed_document": PARSED})
+
+
+def test_clean_contract_skips_the_translator_call():
+    ctx = context(CLEAN_RISK)
+    content = skip_translation_if_clean(ctx)
+    assert content is not None and content.role == "model"
+    report = json.loads(content.parts[0].text)
+    assert json.loads(ctx.state["final_result"]) == report
+    assert report["clauses"] == []
+    assert report["summary"]["riskLevel"] == "low"
+    assert report["summary"]["totalClauseCount"] == 3
+    assert report["safeClausesSummary"][0] == {"number": "제1조", "title": "목적", "deviationScore": 0, "status": "safe"}
+
+
+def test_deviated_or_unreadable_analysis_runs_the_translator():
+    assert skip_translation_if_clean(context({**CLEAN_RISK, "deviated_clauses": [{"number": "제4조"}]})) is None
+    assert skip_translation_if_clean(SimpleNamespace(state={"risk_analysis": "not json"})) is None
+    assert skip_translation_if_clean(SimpleNamespace(state={})) is None
+
+
+def test_clean_report_uses_the_neutral_overall_action():
+    report = build_clean_report(CLEAN_RISK, PARSED)
+    assert report["overallAction"]["type"] == "info"  # rendered as a neutral box, not the red alert
+    assert "제2조" in report["overallAction"]["message"]  # caution clauses are still named
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from bench.fake_gemini import create_app, detect_stage, parse_latency
+from bench.loadtest import _is_fallback, _percentile, compare
+
+
+def request_body(text):
+    return {"systemInstruction": {"parts": [{"text": text}]}, "contents": [{"role": "user", "parts": [{"text": "계약서"}]}]}
+
+
+def test_parse_latency_specs():
+    assert parse_latency("fixed:0.5")() == 0.5
+    assert 0.2 <= parse_latency("uniform:0.2,1.5")() <= 1.5
+    assert parse_latency("normal:mean=1.0,sd=0")() == 1.0
+    assert parse_latency("lognormal:median=2.0,sigma=0.4")() > 0
+    with pytest.raises(ValueError):
+        parse_latency("gamma:1")
+
+
+def test_detect_stage_from_the_prompt():
+    assert detect_stage(request_body("당신은 임대차 계약서 파싱 전문가입니다.")) == "parse"
+    assert detect_stage(request_body("당신은 임대차 계약서 위험 분석 AI입니다.")) == "single"
+    assert detect_stage({"contents": []}) == "ping"
+
+
+def test_fake_server_returns_canned_json_per_stage():
+    client = TestClient(create_app(seed=1))
+    r = client.post("/v1beta/models/gemini-x:generateContent", json=request_body("임대차 계약서 파싱 전문가"))
+    assert r.status_code == 200
+    parsed = json.loads(r.json()["candidates"][0]["content"]["parts"][0]["text"])
+    assert parsed["clauses"]
+    fraud = client.post("/v1beta/models/gemini-x:generateContent", json=request_body("전세사기 검색")).json()
+    assert fraud["candidates"][0]["groundingMetadata"]["groundingChunks"]
+    assert client.get("/__stats").json()["requests"] == {"parse": 1, "fraud": 1}
+
+
+def test_fake_server_simulates_errors():
+    client = TestClient(create_app(error_rate=1.0, seed=1))
+    r = client.post("/v1beta/models/gemini-x:generateContent", json=request_body("임대차 계약서 파싱 전문가"))
+    assert r.status_code in (429, 500, 503)
+    assert r.json()["error"]["code"] == r.status_code
+
+
+def test_percentile_and_fallback_detection():
+    assert _percentile([], 50) is None
+    assert _percentile([10.0, 20.0, 30.0, 40.0, 50.0], 50) == 30.0
+    assert _percentile([10.0, 20.0, 30.0, 40.0, 50.0], 99) == 50.0
+    assert _is_fallback("analyze", 200, {"analysisMode": "fallback"})
+    assert not _is_fallback("analyze", 200, {"analysisMode": "real"})
+    assert _is_fallback("fraud-check", 503, None)
+    assert not _is_fallback("demo", 200, {})
+
+
+def test_compare_reports_per_endpoint_deltas(tmp_path):
+    def result(rps, p95):
+        return {"results": {"analyze": {"throughputRps": rps, "latencyMs": {"p50": 100, "p95": p95, "p99": p95}, "fallbackRate": 0.0}}, "peakRssMb": 200}
+
+    base, new = tmp_path / "base.json", tmp_path / "new.json"
+    base.write_text(json.dumps(result(10.0, 400)))
+    new.write_text(json.dumps(result(12.0, 300)))
+    diff = compare(str(base), str(new))
+    analyze = diff["endpoints"]["analyze"]
+    assert analyze["throughputRps"] == {"base": 10.0, "new": 12.0, "change": 2.0, "pct": 20.0}
+    assert analyze["p95"]["change"] == -100
+    assert analyze["fallbackRate"]["pct"] is None
+    assert diff["peakRssMb"]["change"] == 0
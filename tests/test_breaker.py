@@ -0,0 +1,144 @@
+import pytest
+
+import breaker
+from breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(breaker.time, "monotonic", clock)
+    return clock
+
+
+class ApiError(Exception):
+    def __init__(self, code):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+def fail(b, exc=None):
+    with pytest.raises(type(exc) if exc else RuntimeError):
+        with b.guard():
+            raise exc or RuntimeError("model down")
+
+
+def succeed(b):
+    with b.guard():
+        pass
+
+
+def tripped(clock, **kwargs):
+    b = CircuitBreaker("t", min_calls=2, open_seconds=30, **kwargs)
+    fail(b)
+    fail(b)
+    assert b.state == OPEN
+    return b
+
+
+def test_opens_once_failure_rate_and_min_calls_are_reached(clock):
+    b = CircuitBreaker("t", min_calls=4, failure_rate=0.5)
+    succeed(b)
+    fail(b)
+    succeed(b)
+    assert b.state == CLOSED
+    fail(b)
+    assert b.state == OPEN
+    with pytest.raises(CircuitOpenError) as info:
+        succeed(b)
+    assert info.value.retry_after == pytest.approx(30)
+
+
+def test_failures_outside_the_window_are_forgotten(clock):
+    b = CircuitBreaker("t", min_calls=2, window_seconds=60)
+    fail(b)
+    clock.now += 61
+    fail(b)
+    assert b.state == CLOSED
+
+
+def test_bad_requests_do_not_count_as_outages(clock):
+    b = CircuitBreaker("t", min_calls=2)
+    fail(b, ApiError(400))
+    fail(b, ApiError(400))
+    assert b.state == CLOSED
+    fail(b, ApiError(429))
+    fail(b, ApiError(429))
+    assert b.state == OPEN
+
+
+def test_half_open_probe_success_closes(clock):
+    b = tripped(clock)
+    clock.now += 30
+    probe, generation = b.acquire()
+    assert probe and b.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        b.acquire()  # only one probe at a time
+    b.record(True, probe, generation=generation)
+    assert b.state == CLOSED
+
+
+def test_half_open_probe_failure_doubles_cooldown(clock):
+    b = tripped(clock)
+    clock.now += 30
+    fail(b)
+    assert b.state == OPEN
+    clock.now += 30
+    with pytest.raises(CircuitOpenError):
+        succeed(b)
+    clock.now += 30
+    succeed(b)
+    assert b.state == CLOSED
+
+
+def test_late_success_from_before_the_outage_is_ignored(clock):
+    b = CircuitBreaker("t", min_calls=2, open_seconds=30)
+    slow_probe, slow_generation = b.acquire()  # admitted while closed, answers late
+    fail(b)
+    fail(b)
+    clock.now += 30
+    probe, generation = b.acquire()
+    b.record(True, slow_probe, generation=slow_generation)
+    assert b.state == HALF_OPEN
+    assert b.stats()["stale"] == 1
+    b.record(True, probe, generation=generation)
+    assert b.state == CLOSED
+
+
+def test_timeouts_are_ignored_after_the_state_moved_on(clock):
+    b = tripped(clock)
+    generation = b.generation
+    clock.now += 30
+    succeed(b)  # probe closes the circuit
+    b.record_timeout(generation)
+    assert b.state == CLOSED
+    assert b.stats()["stale"] == 1
+
+
+def test_cancelled_probe_gives_its_slot_back(clock):
+    import asyncio
+
+    b = tripped(clock)
+    clock.now += 30
+    with pytest.raises(asyncio.CancelledError):
+        with b.guard():
+            raise asyncio.CancelledError()
+    assert b.state == HALF_OPEN
+    succeed(b)
+    assert b.state == CLOSED
+
+
+def test_disabled_breaker_counts_but_never_opens(clock):
+    b = CircuitBreaker("t", min_calls=2, enabled=False)
+    fail(b)
+    fail(b)
+    assert b.state == CLOSED
+    assert b.stats()["error"] == 2
@@ -0,0 +1,18 @@
+from cassette import request_key
+
+
+def test_request_key_is_stable_and_content_addressed():
+    contents = [{"role": "user", "parts": [{"text": "분석해 주세요"}, {"inline_data": {"data": b"%PDF-1", "mime_type": "application/pdf"}}]}]
+    key = request_key("gemini-2.5-flash", contents, {"temperature": 0.2})
+    assert key == request_key("gemini-2.5-flash", contents, {"temperature": 0.2})
+    other_doc = [{"role": "user", "parts": [{"text": "분석해 주세요"}, {"inline_data": {"data": b"%PDF-2", "mime_type": "application/pdf"}}]}]
+    assert key != request_key("gemini-2.5-flash", other_doc, {"temperature": 0.2})
+    assert key != request_key("gemini-2.5-pro", contents, {"temperature": 0.2})
+    assert key != request_key("gemini-2.5-flash", contents, {"temperature": 0.7})
+
+
+def test_request_key_ignores_transport_options():
+    contents = ["hello"]
+    base = request_key("m", contents, {"temperature": 0})
+    assert request_key("m", contents, {"temperature": 0, "http_options": {"timeout": 30}, "labels": {"run": "1"}}) == base
+    assert request_key("m", contents, None) == request_key("m", contents, {})
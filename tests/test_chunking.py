@@ -0,0 +1,36 @@
+from chunking import merge_parsed
+
+
+def test_merge_joins_articles_split_across_page_groups():
+    merged = merge_parsed([
+        {
+            "title": "주택임대차계약서",
+            "deposit_amount": 100000000,
+            "clauses": [{"number": "제1조", "title": "목적", "body": "임대한다."}, {"number": "제2조", "body": "보증금은"}],
+        },
+        {
+            "property_address": "서울특별시 마포구 월드컵로 1",
+            "monthly_rent": 0,
+            "clauses": [{"number": "제2조 (이어짐)", "body": "계약 종료 시 반환한다."}, {"number": "3", "body": "수선"}],
+        },
+    ])
+    assert [c["number"] for c in merged["clauses"]] == ["제1조", "제2조", "제3조"]
+    assert merged["clauses"][1]["body"] == "보증금은\n계약 종료 시 반환한다."
+    assert merged["title"] == "주택임대차계약서"
+    assert merged["property_address"] == "서울특별시 마포구 월드컵로 1"
+    assert merged["deposit_amount"] == 100000000
+
+
+def test_merge_keeps_one_copy_of_repeated_headers():
+    merged = merge_parsed([
+        {"clauses": [{"number": "제4조", "body": "반환한다."}]},
+        {"clauses": [{"number": "제 4 조", "body": "반환한다."}, {"number": "제4조", "body": "지연 이자를 지급한다."}]},
+    ])
+    assert merged["clauses"] == [{"number": "제4조", "title": "", "body": "반환한다.\n지연 이자를 지급한다."}]
+
+
+def test_merge_defaults_amounts_like_the_parser():
+    merged = merge_parsed([{"clauses": []}, {}])
+    assert merged["deposit_amount"] == 50000000
+    assert merged["monthly_rent"] == 500000
+    assert merged["clauses"] == []
@@ -0,0 +1,55 @@
+from clauses import hydrate_report, normalize_number, split_clauses
+
+STANDARD = {
+    "제2조": {"number": "제2조", "title": "보증금과 차임", "body": "보증금은 금 ___원정으로 한다."},
+    "제4조": {"number": "제4조", "title": "보증금의 반환", "body": "임대인은 계약 종료 시 보증금을 반환한다."},
+    "제7조": {"number": "제7조", "title": "계약의 해지", "body": "중대한 위반이 있을 때 해지할 수 있다."},
+}
+DOCUMENT = [
+    {"number": "제4조", "title": "보증금의 반환", "body": "임대인은 3개월 이내에 보증금을 반환한다."},
+    {"number": "제9조", "title": "해지", "body": "임대인은 언제든지 해지할 수 있다."},
+    {"number": "제1조", "title": "목적", "body": "주택을 임대한다."},
+]
+
+
+def test_normalize_number():
+    assert normalize_number("제 4 조") == "제4조"
+    assert normalize_number("4") == "제4조"
+    assert normalize_number(None) == ""
+
+
+def test_split_clauses_ignores_cross_references():
+    text = "제1조 (목적) 주택을 임대한다.\n제2조 보증금\n보증금은 제1조에 따른 주택의 대가이다.\n특약사항\n애완동물 금지"
+    assert [(c["number"], c["title"]) for c in split_clauses(text)] == [
+        ("제1조", "목적"),
+        ("제2조", "보증금"),
+        ("특약사항", "특약사항"),
+    ]
+
+
+def test_hydrate_fills_text_from_the_source_documents():
+    report = {
+        "clauses": [
+            {"number": "4", "title": "보증금의 반환", "original": "모델이 옮겨 적은 문장"},
+            {"number": "제9조", "title": "해지", "standardRef": "제7조"},
+        ],
+        "safeClausesSummary": [{"number": "제1조", "title": "목적"}],
+        "documentClauses": DOCUMENT,
+    }
+    data = hydrate_report(report, DOCUMENT, STANDARD)
+    deposit, termination = data["clauses"]
+    assert deposit["original"] == DOCUMENT[0]["body"]  # server text wins over the model's echo
+    assert deposit["standard"] == STANDARD["제4조"]["body"]
+    assert termination["original"] == DOCUMENT[1]["body"]
+    assert termination["standard"] == STANDARD["제7조"]["body"]
+    assert "standardRef" not in termination
+    assert data["safeClausesSummary"][0]["body"] == "주택을 임대한다."
+    assert "documentClauses" not in data
+
+
+def test_hydrate_matches_standard_by_title_when_numbers_differ():
+    report = {"clauses": [{"number": "제2조", "title": "계약 해지"}, {"number": "제12조", "title": "관리비"}]}
+    data = hydrate_report(report, [], STANDARD)
+    assert data["clauses"][0]["standard"] == STANDARD["제7조"]["body"]  # 제2조 is 보증금, titles disagree
+    unknown = data["clauses"][1]
+    assert unknown["original"] == "" and unknown["standard"] == ""
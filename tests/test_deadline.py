@@ -0,0 +1,105 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import deadline
+from deadline import RESPONSE_RESERVE_SECONDS, ClientDisconnected, Deadline, detached, run_until_disconnected
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    # Only the deadline's clock: asyncio's event loop keeps the real time.monotonic
+    monkeypatch.setattr(deadline, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+class FakeRequest:
+    def __init__(self, disconnect_after: float | None):
+        self.disconnect_after = disconnect_after
+
+    async def receive(self):
+        if self.disconnect_after is None:
+            await asyncio.Event().wait()
+        await asyncio.sleep(self.disconnect_after)
+        return {"type": "http.disconnect"}
+
+
+def test_allot_shares_what_is_left(clock):
+    budget = Deadline(61)
+    assert budget.remaining() == 61 - RESPONSE_RESERVE_SECONDS
+    assert budget.allot(0.5) == 30
+    assert budget.allot(cap=20) == 20
+    clock.now += 40
+    assert budget.allot(0.5, cap=20) == 10
+    assert budget.elapsed() == 40
+    clock.now += 30
+    assert budget.remaining() == 0 and budget.expired
+    assert budget.allot() == 0
+
+
+def test_http_options_follow_the_active_deadline(clock):
+    assert deadline.http_options() is None
+    token = Deadline(31).activate()
+    try:
+        assert deadline.http_options().timeout == 30_000
+        clock.now += 40
+        assert deadline.http_options().timeout == 1_000  # floor, never zero
+    finally:
+        Deadline.reset(token)
+    assert deadline.current() is None
+
+
+def test_detached_tasks_get_their_own_deadline():
+    async def seen():
+        return deadline.current()
+
+    async def scenario():
+        request_deadline = Deadline(30)
+        token = request_deadline.activate()
+        try:
+            inherited = await asyncio.create_task(seen())
+            own = await detached(seen(), 60)
+            unbounded = await detached(seen())
+        finally:
+            Deadline.reset(token)
+        assert inherited is request_deadline
+        assert own is not request_deadline and own.budget == 60
+        assert unbounded is None
+
+    asyncio.run(scenario())
+
+
+def test_run_until_disconnected_returns_the_result():
+    async def work():
+        await asyncio.sleep(0.01)
+        return "report"
+
+    assert asyncio.run(run_until_disconnected(FakeRequest(None), work())) == "report"
+
+
+def test_disconnect_cancels_the_work():
+    async def scenario():
+        state = {"cancelled": False}
+
+        async def work():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                state["cancelled"] = True
+                raise
+
+        with pytest.raises(ClientDisconnected):
+            await run_until_disconnected(FakeRequest(0.01), work())
+        assert state["cancelled"]
+
+    asyncio.run(scenario())
+
+
+def test_errors_from_the_work_propagate():
+    async def work():
+        raise ValueError("bad upload")
+
+    with pytest.raises(ValueError):
+        asyncio.run(run_until_disconnected(FakeRequest(None), work()))
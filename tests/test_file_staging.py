@@ -0,0 +1,81 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from file_staging import FileStager
+from shared_store import SharedStore
+
+PDF = b"%PDF-1.7 " + b"x" * 2048
+
+
+class FakeFiles:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.uploads = 0
+
+    async def upload(self, *, file, config):
+        self.uploads += 1
+        await asyncio.sleep(self.delay)
+        name = f"files/f{self.uploads}"
+        return SimpleNamespace(name=name, uri=f"https://files.example/{name}", state=None)
+
+
+def fake_client(delay: float = 0.0):
+    return SimpleNamespace(vertexai=False, aio=SimpleNamespace(files=FakeFiles(delay)))
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SharedStore(str(tmp_path / "shared.db"))
+
+
+def test_small_documents_are_inlined(store):
+    stager = FileStager(store, min_bytes=4096)
+    part = asyncio.run(stager.part(fake_client(), PDF, "application/pdf"))
+    assert part.inline_data.data == PDF
+    assert stager.stats()["inline"] == 1
+
+
+def test_concurrent_requests_share_one_upload(store):
+    async def scenario():
+        client = fake_client(delay=0.05)
+        stager = FileStager(store, min_bytes=1024)
+        parts = await asyncio.gather(*(stager.part(client, PDF, "application/pdf", timeout=5) for _ in range(3)))
+        assert client.aio.files.uploads == 1
+        assert {p.file_data.file_uri for p in parts} == {"https://files.example/files/f1"}
+        assert stager.stats()["reused"] == 2
+        # Later requests (any worker sharing the store) reuse the cached handle
+        again = await FileStager(store, min_bytes=1024).part(client, PDF, "application/pdf", timeout=5)
+        assert again.file_data.file_uri == parts[0].file_data.file_uri
+        assert client.aio.files.uploads == 1
+
+    asyncio.run(scenario())
+
+
+def test_waiter_gives_up_at_its_own_timeout(store):
+    async def scenario():
+        client = fake_client(delay=0.3)
+        stager = FileStager(store, min_bytes=1024)
+        first = asyncio.create_task(stager.part(client, PDF, "application/pdf", timeout=5))
+        await asyncio.sleep(0.01)
+        t0 = asyncio.get_running_loop().time()
+        hurried = await stager.part(client, PDF, "application/pdf", timeout=0.05)
+        assert asyncio.get_running_loop().time() - t0 < 0.25
+        assert hurried.inline_data.data == PDF  # inlined instead of waiting past its deadline
+        assert (await first).file_data.file_uri.endswith("files/f1")  # the shared upload carried on
+        assert client.aio.files.uploads == 1
+
+    asyncio.run(scenario())
+
+
+def test_upload_failure_falls_back_to_inline(store):
+    async def failing_upload(**kwargs):
+        raise RuntimeError("quota")
+
+    client = fake_client()
+    client.aio.files.upload = failing_upload
+    stager = FileStager(store, min_bytes=1024)
+    part = asyncio.run(stager.part(client, PDF, "application/pdf", timeout=5))
+    assert part.inline_data.data == PDF
+    assert stager.stats()["uploadFailed"] == 1
@@ -0,0 +1,92 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+import google_certs
+from bench.fake_google_certs import create_app
+from google_certs import GoogleCertCache, cache_lifetime
+
+AUDIENCE = "client-id.apps.googleusercontent.com"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    # Only the cache's clock: asyncio's event loop keeps the real time.monotonic
+    monkeypatch.setattr(google_certs, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+def harness():
+    transport = httpx.ASGITransport(app=create_app(max_age=3600, latency=0))
+    google = httpx.AsyncClient(transport=transport, base_url="http://certs")
+    cache = GoogleCertCache(url="http://certs/oauth2/v1/certs", unknown_kid_interval=30)
+    cache._client = httpx.AsyncClient(transport=transport)
+    return google, cache
+
+
+async def token(google):
+    return (await google.get("/__token", params={"aud": AUDIENCE})).json()["credential"]
+
+
+def test_cache_lifetime():
+    assert cache_lifetime({"cache-control": "public, max-age=19000"}, 60) == 19000
+    assert cache_lifetime({"cache-control": "max-age=300", "age": "100"}, 60) == 200
+    assert cache_lifetime({"cache-control": "no-store"}, 60) == 0
+    assert cache_lifetime({}, 60) == 60
+
+
+def test_tokens_verify_locally_from_cached_keys(clock):
+    async def scenario():
+        google, cache = harness()
+        claims = await cache.verify(await token(google), AUDIENCE)
+        assert claims["aud"] == AUDIENCE
+        await cache.verify(await token(google), AUDIENCE)
+        with pytest.raises(ValueError):
+            await cache.verify(await token(google), "someone-else")
+        assert (await google.get("/__stats")).json()["certRequests"] == 1
+        await cache.close()
+
+    asyncio.run(scenario())
+
+
+def test_unknown_kid_refetches_at_most_once_per_interval(clock):
+    async def scenario():
+        google, cache = harness()
+        await cache.get_certs()
+        await google.post("/__rotate")
+        rotated = await token(google)
+        with pytest.raises(ValueError):
+            await cache.verify(rotated, AUDIENCE)  # fetched too recently: no refetch
+        clock.now += 31
+        assert (await cache.verify(rotated, AUDIENCE))["aud"] == AUDIENCE
+        assert (await google.get("/__stats")).json()["certRequests"] == 2
+        await cache.close()
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_misses_share_one_fetch(clock):
+    async def scenario():
+        google, cache = harness()
+        results = await asyncio.gather(*(cache.get_certs() for _ in range(5)))
+        assert all(r == results[0] for r in results)
+        assert cache.counters["fetches"] == 1 and cache.counters["coalesced"] == 4
+        await cache.close()
+
+    asyncio.run(scenario())
+
+
+def test_stale_keys_are_used_when_google_is_unreachable(clock):
+    async def scenario():
+        google, cache = harness()
+        certs = await cache.get_certs()
+        clock.now += 4000
+        cache.url = "http://certs/unreachable"
+        assert await cache.get_certs() == certs
+        assert cache.counters["fetchErrors"] == 1
+        await cache.close()
+
+    asyncio.run(scenario())
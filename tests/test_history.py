@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+
+import pytest
+
+import history
+from history import HistoryStore
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1_700_000_000.0)
+    monkeypatch.setattr(history, "time", SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+@pytest.fixture
+def store(tmp_path, clock):
+    return HistoryStore(str(tmp_path / "history.db"), max_per_user=5, retention_days=90)
+
+
+def report(risk):
+    return {"summary": {"riskLevel": "high", "totalMaxRisk": risk, "deviatedClauseCount": 2}, "clauses": []}
+
+
+def add_many(store, clock, user_id, count):
+    ids = []
+    for i in range(count):
+        clock.now += 1
+        ids.append(store.add(user_id, report(i), doc_sha256=f"{user_id}-{i}", filename=f"{i}.pdf"))
+    return ids
+
+
+def test_pages_are_newest_first_and_cursors_do_not_overlap(store, clock):
+    ids = add_many(store, clock, "u1", 5)
+    first = store.list("u1", limit=2)
+    second = store.list("u1", limit=2, cursor=first["nextCursor"])
+    last = store.list("u1", limit=2, cursor=second["nextCursor"])
+    assert [item["id"] for item in first["items"] + second["items"] + last["items"]] == ids[::-1]
+    assert last["nextCursor"] is None
+    assert first["items"][0]["totalMaxRisk"] == 4 and first["items"][0]["storedBytes"] > 0
+
+
+def test_reanalyzing_a_document_keeps_its_id(store, clock):
+    first = store.add("u1", report(100), doc_sha256="same")
+    clock.now += 10
+    second = store.add("u1", report(200), doc_sha256="same")
+    assert first == second
+    assert store.get("u1", first)["summary"]["totalMaxRisk"] == 200
+    assert len(store.list("u1")["items"]) == 1
+
+
+def test_entries_belong_to_their_user(store, clock):
+    (analysis_id,) = add_many(store, clock, "u1", 1)
+    assert store.get("u2", analysis_id) is None
+    assert not store.delete("u2", analysis_id)
+    assert store.list("u2")["items"] == []
+    assert store.delete("u1", analysis_id)
+    assert store.get("u1", analysis_id) is None
+
+
+def test_only_the_newest_entries_per_user_are_kept(store, clock):
+    ids = add_many(store, clock, "u1", 7)
+    add_many(store, clock, "u2", 1)
+    assert [item["id"] for item in store.list("u1", limit=10)["items"]] == ids[:1:-1]
+    assert store.stats()["entries"] == 6
+
+
+def test_entries_past_retention_are_hidden_then_purged(store, clock):
+    old, recent = add_many(store, clock, "u1", 2)
+    clock.now += 89 * 86400
+    store.add("u1", report(9), doc_sha256="new")
+    clock.now += 86400 + 10  # the first two are now past 90 days
+    assert store.get("u1", old) is None
+    assert [item["totalMaxRisk"] for item in store.list("u1")["items"]] == [9]
+    assert store.purge_expired() == 2
+    assert store.stats()["entries"] == 1
+
+
+def test_invalid_cursor_starts_from_the_top(store, clock):
+    add_many(store, clock, "u1", 2)
+    assert len(store.list("u1", cursor="not-a-cursor")["items"]) == 2
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from model_router import ModelRouter
+
+CONFIG = {
+    "default_model": "flash",
+    "stages": {
+        "single": {
+            "routes": [
+                {
+                    "name": "default",
+                    "model": "pro",
+                    "budget": {"max_error_rate": 0.5, "min_samples": 2, "retry_after_s": 60},
+                    "fallback": {"model": "flash"},
+                }
+            ]
+        }
+    },
+}
+
+
+def test_errors_move_the_route_to_its_fallback():
+    router = ModelRouter(CONFIG)
+    route = router.route("single")
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            with router.observe(route):
+                raise RuntimeError("503")
+    fallback = router.route("single")
+    assert fallback.model == "flash" and fallback.degraded
+
+
+def test_cancelled_calls_are_not_route_failures():
+    router = ModelRouter(CONFIG)
+    route = router.route("single")
+    for _ in range(3):
+        with pytest.raises(asyncio.CancelledError):
+            with router.observe(route):
+                raise asyncio.CancelledError()
+    with router.observe(route):
+        pass
+    assert router.stats()["single/default/pro"]["errorRate"] == 0
+    assert router.route("single").model == "pro"
+
+
+def test_settle_drops_cancelled_runs_and_fails_abandoned_ones():
+    router = ModelRouter(CONFIG)
+    route = router.route("single")
+    router.begin("run-1", route)
+    router.settle("run-1", cancelled=True)
+    assert router.stats() == {}
+    router.begin("run-2", route)
+    router.settle("run-2")
+    assert router.stats()["single/default/pro"]["errorRate"] == 1
@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+from clauses import document_text
+from offline_engine import analyze_text, format_won, get_rules, parse_won, risk_amount
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+CONTRACT = """주택임대차계약서
+보증금 금 5,000만원정, 차임 월 50만원
+제1조 (목적) 임대인은 주택을 임차인에게 임대한다.
+제4조 (보증금의 반환) 임대인은 새로운 임차인이 입주한 후 3개월 이내에 보증금을 반환한다.
+제7조 (계약의 해지) 임대인은 필요한 경우 언제든지 계약을 해지할 수 있다.
+제8조 (수선) 주택의 모든 수선 비용은 임차인이 부담한다.
+제9조 (위약금) 임차인이 계약을 위반하면 보증금의 30%를 위약금으로 지급한다.
+제12조 (분쟁해결) 분쟁은 임대주택 소재지 관할 법원에서 해결한다.
+"""
+
+
+@pytest.mark.parametrize(
+    "text, amount",
+    [("1억 2,000만원", 120_000_000), ("₩50,000,000", 50_000_000), ("5천만원", 50_000_000), ("500만원", 5_000_000)],
+)
+def test_parse_won(text, amount):
+    assert parse_won(text) == amount
+
+
+def test_format_won():
+    assert format_won(120_000_000) == "1억 2,000만원"
+    assert format_won(100_000_000) == "1억원"
+    assert format_won(5_000_000) == "500만원"
+    assert format_won(12_345) == "12,345원"
+
+
+def test_risk_amount_follows_the_analyzer_table():
+    assert risk_amount(95, 50_000_000, 500_000) == 10_000_000  # 20% of the deposit
+    assert risk_amount(65, 50_000_000, 500_000) == 6_000_000  # 12 months of rent
+    assert risk_amount(45, 200_000_000, 0) == 6_000_000  # jeonse: deposit x 0.5% as monthly rent
+
+
+def test_analyze_text_flags_deviated_clauses():
+    report = analyze_text(CONTRACT, rules=get_rules())
+    numbers = [c["number"] for c in report["clauses"]]
+    assert {"제4조", "제7조", "제8조", "제9조"} <= set(numbers)
+    assert "제1조" in [s["number"] for s in report["safeClausesSummary"]]
+    scores = [c["deviationScore"] for c in report["clauses"]]
+    assert scores == sorted(scores, reverse=True)
+    assert report["summary"]["deviatedClauseCount"] == len(numbers)
+    assert report["summary"]["totalMaxRisk"] == sum(c["riskAmount"] for c in report["clauses"])
+    for clause in report["clauses"]:
+        assert clause["easyKorean"]["level1"] and clause["action"]["message"]
+    assert report["comprehension"]["clozeQuestions"]
+
+
+def test_analyze_text_on_the_sample_contract():
+    with open(os.path.join(DATA_DIR, "test_risky_contract_v2.html"), "rb") as f:
+        text = document_text(f.read(), "text/html")
+    report = analyze_text(text)
+    assert report["summary"]["riskLevel"] == "high"
+    assert report["summary"]["deviatedClauseCount"] >= 3
+
+
+def test_analyze_text_needs_splittable_clauses():
+    assert analyze_text("계약서 사진입니다") is None
+    assert analyze_text("") is None
@@ -0,0 +1,51 @@
+import json
+
+from property_address import address_from_parsed, cache_key, clean_address, extract_property_address
+
+CONTRACT = """주택임대차표준계약서
+임대인 주소: 부산 해운대구 센텀중앙로 55
+1. 부동산의 표시
+소재지: 서울특별시 마포구 월드컵북로 12 ○○빌라 제3층 제301호
+임대할부분: 301호 전체
+임차인
+소재지: 경기도 성남시 분당구 판교역로 10
+"""
+
+
+def test_section_heading_address_wins_over_party_addresses():
+    assert extract_property_address(CONTRACT) == "서울특별시 마포구 월드컵북로 12 ○○빌라"
+
+
+def test_value_on_next_line_is_used_for_table_cells():
+    text = "목적물의 표시\n소재지\n서울 강남구 테헤란로 152 101동 1203호\n면적 84㎡"
+    assert extract_property_address(text) == "서울 강남구 테헤란로 152"
+
+
+def test_first_label_is_used_without_section_heading():
+    assert extract_property_address("소재지: 인천 연수구 송도동 1-1\n") == "인천 연수구 송도동 1-1"
+
+
+def test_missing_or_invalid_address_is_none():
+    assert extract_property_address(None) is None
+    assert extract_property_address("") is None
+    assert extract_property_address("1. 부동산의 표시\n소재지: 계약서 참조") is None
+    assert clean_address(None) is None
+    assert clean_address("서울") is None
+    assert clean_address("서울 " + "가" * 200) is None
+
+
+def test_clean_address_drops_parenthesised_detail():
+    assert clean_address("서울 종로구  세종대로 175 (세종로)") == "서울 종로구 세종대로 175"
+
+
+def test_address_from_parsed_accepts_dict_or_json_text():
+    parsed = {"property_address": "대전 유성구 대학로 99, 2층"}
+    assert address_from_parsed(parsed) == "대전 유성구 대학로 99"
+    assert address_from_parsed(json.dumps(parsed, ensure_ascii=False)) == "대전 유성구 대학로 99"
+    assert address_from_parsed("not json") is None
+    assert address_from_parsed(["대전 유성구 대학로 99"]) is None
+    assert address_from_parsed({}) is None
+
+
+def test_cache_key_ignores_whitespace():
+    assert cache_key(" 서울 강남구\t테헤란로  152 ") == cache_key("서울 강남구 테헤란로 152")
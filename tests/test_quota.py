@@ -0,0 +1,77 @@
+import pytest
+
+import quota
+from quota import Limit, QuotaLimiter, parse_limit
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(quota.time, "monotonic", clock)
+    return clock
+
+
+def test_parse_limit():
+    assert parse_limit("10/60") == Limit(10, 60.0)
+    assert parse_limit("5") == Limit(5, 60.0)
+    for spec in ("0/60", "10/0", "abc"):
+        with pytest.raises(ValueError):
+            parse_limit(spec)
+
+
+def test_identity_bucket_exhausts_and_refills(clock):
+    limiter = QuotaLimiter({"analyze": Limit(2, 60)}, Limit(100, 60))
+    assert limiter.check("analyze", "ip:a").allowed
+    assert limiter.check("analyze", "ip:a").remaining == 0
+    denied = limiter.check("analyze", "ip:a")
+    assert not denied.allowed and denied.reason == "identity"
+    assert denied.retry_after == 30
+    assert denied.headers()["Retry-After"] == "30"
+    assert limiter.check("analyze", "ip:b").allowed  # other identities have their own bucket
+    clock.now += 30
+    assert limiter.check("analyze", "ip:a").allowed
+
+
+def test_endpoints_have_separate_buckets(clock):
+    limiter = QuotaLimiter({"analyze": Limit(1, 60), "fraud-check": Limit(1, 60)}, Limit(100, 60))
+    assert limiter.check("analyze", "ip:a").allowed
+    assert limiter.check("fraud-check", "ip:a").allowed
+    assert not limiter.check("analyze", "ip:a").allowed
+
+
+def test_global_limit_is_shared(clock):
+    limiter = QuotaLimiter({"analyze": Limit(10, 60)}, Limit(3, 60), tight_fraction=0)
+    for identity in ("ip:a", "ip:b", "ip:c"):
+        assert limiter.check("analyze", identity).allowed
+    denied = limiter.check("analyze", "ip:d")
+    assert not denied.allowed and denied.reason == "global"
+
+
+def test_tight_global_quota_favours_identities_under_their_fair_share(clock):
+    limiter = QuotaLimiter({"analyze": Limit(100, 60)}, Limit(10, 60), tight_fraction=0.5)
+    assert limiter.check("analyze", "ip:light").allowed
+    for _ in range(5):
+        assert limiter.check("analyze", "ip:heavy").allowed
+    # 4 of 10 global tokens left (< 50%) and two identities share it: 5 requests each is fair
+    heavy = limiter.check("analyze", "ip:heavy")
+    assert not heavy.allowed and heavy.reason == "fair_share"
+    assert limiter.check("analyze", "ip:light").allowed
+
+
+def test_idle_and_excess_keys_are_evicted(clock):
+    limiter = QuotaLimiter({"analyze": Limit(5, 60)}, Limit(100, 60), max_keys=2, idle_seconds=600)
+    for identity in ("ip:a", "ip:b", "ip:c", "ip:d"):
+        limiter.check("analyze", identity)
+    assert limiter.stats()["trackedKeys"] <= 3
+    clock.now += 601
+    limiter.check("analyze", "ip:e")
+    assert limiter.stats()["trackedKeys"] == 1
+    assert limiter.stats()["activeIdentities"] == 1
@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from reference_templates import TemplateRegistry, load_template_document
+
+
+def write(path, data):
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+
+@pytest.fixture
+def registry(tmp_path):
+    write(tmp_path / "base.json", {
+        "title": "기본 계약서",
+        "clauses": [
+            {"number": "제4조", "title": "보증금의 반환", "body": "1개월 이내 반환"},
+            {"number": "제9조", "title": "위약금", "body": "보증금의 10%"},
+        ],
+    })
+    (tmp_path / "extra").mkdir()
+    write(tmp_path / "extra" / "store.json", {
+        "extends": "../base.json",
+        "title": "상가 계약서",
+        "clauses": [
+            {"number": "4", "title": "보증금의 반환", "body": "상가: 1개월 이내 반환"},
+            {"number": "특약사항", "title": "권리금", "body": "권리금 회수기회 보호"},
+        ],
+    })
+    write(tmp_path / "registry.json", {
+        "default": "test_base",
+        "templates": [
+            {"id": "test_base", "source": "base.json"},
+            {
+                "id": "test_store",
+                "source": "extra/store.json",
+                "detect": {"title": ["상가"], "headings": ["권리금"], "body": ["영업"], "min_score": 4},
+            },
+        ],
+    })
+    return TemplateRegistry.load(str(tmp_path / "registry.json"))
+
+
+def test_extends_overrides_by_number_and_appends_new_clauses(tmp_path, registry):
+    store = registry.get("test_store")
+    assert store.name == "상가 계약서"
+    assert store.clauses["제4조"]["body"] == "상가: 1개월 이내 반환"
+    assert store.clauses["제9조"]["body"] == "보증금의 10%"
+    assert "특약사항" in store.clauses
+    assert [p.rsplit("/", 1)[-1] for p in store.sources] == ["base.json", "store.json"]
+    assert "상가: 1개월" in store.prompt_text
+
+
+def test_circular_extends_is_rejected(tmp_path):
+    write(tmp_path / "a.json", {"extends": "b.json", "clauses": []})
+    write(tmp_path / "b.json", {"extends": "a.json", "clauses": []})
+    with pytest.raises(ValueError):
+        load_template_document(str(tmp_path / "a.json"))
+
+
+def test_classify_needs_the_minimum_score(registry):
+    store, detection = registry.classify({
+        "title": "상가 임대차 계약서",
+        "clauses": [{"number": "제8조", "title": "권리금", "body": "임차인은 영업을 할 수 있다."}],
+    })
+    assert store.id == "test_store"
+    assert detection == {"score": 6, "signals": ["title:상가", "headings:권리금", "body:영업"]}
+    weak, detection = registry.classify({"title": "주택 임대차 계약서", "clauses": [{"body": "영업 금지"}]})
+    assert weak.id == "test_base" and detection["score"] == 0
+
+
+def test_classify_falls_back_to_the_default(registry):
+    assert registry.classify("not json")[0].id == "test_base"
+    assert registry.classify(None)[0].id == "test_base"
+    assert registry.get("unknown").id == "test_base"
+
+
+def test_shipped_registry_detects_contract_types():
+    registry = TemplateRegistry.load()
+    text = "상가건물 임대차 표준계약서\n제1조 (목적) 점포를 임대한다.\n제8조 (권리금의 회수기회 보호) 권리금을 보호한다."
+    assert registry.classify_text(text)[0].id == "commercial"
+    housing = "주택임대차계약서\n제1조 (목적) 주택을 임대한다.\n제4조 (보증금) 반환한다."
+    assert registry.classify_text(housing)[0].id == registry.default.id == "housing"
@@ -0,0 +1,74 @@
+import pytest
+
+from scoring import normalize, score_cloze, score_quiz, score_recall, score_scenario, to_jamo
+
+
+def test_to_jamo_decomposes_syllables():
+    assert to_jamo("보증금") == "ㅂㅗㅈㅡㅇㄱㅡㅁ"
+    assert to_jamo("A1") == "A1"
+
+
+def test_normalize_drops_spacing_punctuation_and_particles():
+    assert normalize("세입자에게만!") == normalize("세입자")
+    assert normalize("한 달") == "한달"
+
+
+@pytest.mark.parametrize(
+    "response, matched_by",
+    [
+        ("1개월", "exact"),
+        ("1 개월이요", "exact"),
+        ("한 달", "synonym"),
+        ("30일", "synonym"),
+        ("1개월 이내", "contains"),
+    ],
+)
+def test_cloze_accepts_equivalent_answers(response, matched_by):
+    result = score_cloze({"answer": "1개월"}, response)
+    assert result["correct"] is True
+    assert result["matchedBy"] == matched_by
+
+
+@pytest.mark.parametrize("response", ["11개월", "21개월", "2개월", "1개월 또는 2개월"])
+def test_cloze_numbers_must_match_exactly(response):
+    assert score_cloze({"answer": "1개월"}, response)["correct"] is False
+
+
+def test_cloze_tolerates_one_typo_and_glossary_terms():
+    assert score_cloze({"answer": "임대인"}, "집주인")["correct"] is True
+    assert score_cloze({"answer": "원상회복"}, "원상회북")["matchedBy"] == "fuzzy"
+    assert score_cloze({"answer": "보증금", "acceptableSynonyms": ["전세금"]}, "전세금을")["correct"] is True
+
+
+def test_cloze_rejects_empty_and_unrelated_answers():
+    assert score_cloze({"answer": "위약금"}, "")["correct"] is False
+    assert score_cloze({"answer": "위약금"}, "관리비")["correct"] is False
+
+
+def test_scenario_by_label_or_choice_text():
+    question = {"correctAnswer": "B", "choices": [{"label": "A", "text": "그냥 나간다"}, {"label": "B", "text": "내용증명을 보낸다"}]}
+    assert score_scenario(question, "b)")["correct"] is True
+    assert score_scenario(question, "내용증명을 보낸다")["correct"] is True
+    assert score_scenario(question, "A")["correct"] is False
+
+
+def test_recall_counts_ideas_against_scoring_note():
+    question = {
+        "goldStandardIdeas": ["보증금을 1개월 안에 돌려받는다", "수리비는 집주인이 낸다", "위약금은 양쪽이 같다"],
+        "scoringNote": "3가지 중 2가지 이상",
+    }
+    result = score_recall(question, "보증금은 한 달 안에 돌려받고 수리비는 집주인이 냅니다")
+    assert result["requiredIdeas"] == 2
+    assert result["matchedIdeas"] >= 2
+    assert result["correct"] is True
+    assert score_recall(question, "잘 모르겠어요")["correct"] is False
+
+
+def test_score_quiz_summary_aligns_answers_with_questions():
+    quiz = {
+        "clozeQuestions": [{"answer": "1개월"}, {"answer": "위약금"}],
+        "scenarioQuestions": [{"correctAnswer": "A", "choices": []}],
+    }
+    result = score_quiz(quiz, {"cloze": ["한 달"], "scenario": ["A"]})
+    assert [g["correct"] for g in result["cloze"]] == [True, False]
+    assert result["summary"] == {"correct": 2, "total": 3, "score": 67}
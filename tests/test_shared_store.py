@@ -0,0 +1,77 @@
+from types import SimpleNamespace
+
+import pytest
+
+import shared_store
+from shared_store import SharedStore
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1_700_000_000.0)
+    monkeypatch.setattr(shared_store, "time", SimpleNamespace(time=lambda: clock.now, monotonic=lambda: clock.now))
+    return clock
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def store(request, tmp_path, clock):
+    store = SharedStore(str(tmp_path / "shared.db"), max_entries=3, purge_interval=60)
+    if request.param == "memory":
+        store._conn.close()
+        store._conn = None  # what a read-only filesystem leaves behind
+    assert store.backend == request.param
+    return store
+
+
+def test_get_set_delete(store):
+    assert store.get("ns", "k") is None
+    store.set("ns", "k", b"v1")
+    store.set("ns", "k", b"v2")
+    assert store.get("ns", "k") == b"v2"
+    assert store.get("other", "k") is None
+    store.delete("ns", "k")
+    assert store.get("ns", "k") is None
+
+
+def test_json_round_trip(store):
+    store.set_json("report", "a1", {"summary": {"riskLevel": "high"}, "주소": "서울"})
+    assert store.get_json("report", "a1") == {"summary": {"riskLevel": "high"}, "주소": "서울"}
+    store.set("report", "broken", b"not zlib")
+    assert store.get_json("report", "broken") is None
+
+
+def test_entries_expire_and_are_purged(store, clock):
+    store.set("ns", "short", b"x", ttl=10)
+    store.set("ns", "forever", b"y")
+    clock.now += 11
+    assert store.get("ns", "short") is None
+    assert store.purge_expired() == 1
+    assert store.stats()["namespaces"] == {"ns": {"entries": 1, "bytes": 1}}
+
+
+def test_writes_purge_opportunistically_and_cap_ttl_entries(store, clock):
+    store.set("asset", "index.html", b"<html>")  # no TTL: never evicted
+    for i in range(4):
+        store.set("analysis", f"k{i}", b"x", ttl=100 + i)
+    clock.now += 61  # next write is past purge_interval
+    store.set("analysis", "k4", b"x", ttl=200)
+    assert store.get("asset", "index.html") == b"<html>"
+    # 6 entries over a cap of 3: the three soonest-expiring TTL entries go
+    assert [store.get("analysis", f"k{i}") for i in range(5)] == [None, None, None, b"x", b"x"]
+    assert store.stats()["evicted"] == 3
+
+
+def test_claim_is_a_lease(store, clock):
+    assert store.claim("startup", "assets", ttl=60)
+    assert not store.claim("startup", "assets", ttl=60)
+    clock.now += 61
+    assert store.claim("startup", "assets", ttl=60)
+
+
+def test_workers_share_one_file(tmp_path, clock):
+    path = str(tmp_path / "shared.db")
+    first, second = SharedStore(path), SharedStore(path)
+    first.set_json("fraud", "서울 마포구 월드컵로 1", {"riskLevel": "low"}, ttl=60)
+    assert second.get_json("fraud", "서울 마포구 월드컵로 1") == {"riskLevel": "low"}
+    assert first.claim("startup", "assets", ttl=60)
+    assert not second.claim("startup", "assets", ttl=60)
@@ -0,0 +1,58 @@
+from tiered import detail_key, find_clause, mark_pending, merge_detail, pending_count, prefetch_targets, validate_detail
+
+
+def core_report():
+    return {
+        "clauses": [
+            {"number": "제4조", "deviationScore": 85, "riskAmount": 5000000, "easyKorean": {"level1": "늦게 돌려줘요"}},
+            {"number": "제7조", "deviationScore": 95, "riskAmount": 10000000, "easyKorean": {"level1": "언제든 해지"}},
+            {
+                "number": "제9조",
+                "deviationScore": 45,
+                "riskAmount": 3000000,
+                "easyKorean": {"level1": "위약금", "level2": "두 배", "level3": "자세히"},
+                "action": {"message": "수정을 요청하세요"},
+            },
+        ]
+    }
+
+
+DETAIL = {
+    "easyKorean": {"level2": "보증금을 3개월 뒤에 돌려받아요", "level3": "법은 즉시 반환을 원칙으로 합니다"},
+    "termGlossary": [{"term": "반환", "definition": "돌려줌"}],
+    "action": {"message": "1개월 이내로 고쳐 달라고 하세요"},
+}
+
+
+def test_mark_pending_flags_clauses_without_detail():
+    data = mark_pending(core_report())
+    assert pending_count(data) == 2
+    assert find_clause(data, "제9조").get("detailPending") is None
+    assert find_clause(data, "7")["action"]["type"]
+
+
+def test_prefetch_targets_riskiest_pending_first():
+    data = mark_pending(core_report())
+    assert [c["number"] for c in prefetch_targets(data, 1)] == ["제7조"]
+    assert [c["number"] for c in prefetch_targets(data, 5)] == ["제7조", "제4조"]
+    assert prefetch_targets(data, 0) == []
+
+
+def test_detail_key_depends_on_clause_content_and_template():
+    clause = core_report()["clauses"][0]
+    assert detail_key(clause, "standard") == detail_key(dict(clause, detailPending=True), "standard")
+    assert detail_key(clause, "standard") != detail_key(clause, "jeonse")
+    assert detail_key(clause, "standard") != detail_key(dict(clause, deviationScore=60), "standard")
+
+
+def test_merge_detail_completes_the_clause():
+    assert validate_detail(DETAIL)
+    assert not validate_detail({"easyKorean": {"level2": "x"}})
+    assert not validate_detail(None)
+    clause = mark_pending(core_report())["clauses"][0]
+    merged = merge_detail(clause, DETAIL)
+    assert "detailPending" not in merged
+    assert merged["easyKorean"]["level1"] == "늦게 돌려줘요"
+    assert merged["easyKorean"]["level3"] == DETAIL["easyKorean"]["level3"]
+    assert merged["action"]["message"] == DETAIL["action"]["message"]
+    assert merged["action"]["type"] == clause["action"]["type"]
@@ -0,0 +1,86 @@
+"""Tiered analysis: core report first, per-clause detail generated when a clause is opened."""
+
+import hashlib
+import json
+
+from clauses import normalize_number
+
+# Bump when the detail prompt or schema changes so cached details are regenerated
+DETAIL_SCHEMA_VERSION = "1"
+
+# Core clause fields a detail is generated from (and keyed by)
+_CORE_KEYS = ("number", "title", "deviationScore", "riskAmount", "direction", "original", "standard")
+
+
+def core_action(score) -> dict:
+    """Action type/priority follow deviationScore, as the analysis prompts define them."""
+    if (score or 0) > 60:
+        return {"type": "danger", "priority": "urgent"}
+    return {"type": "negotiate", "priority": "high"}
+
+
+def has_detail(clause: dict) -> bool:
+    easy = clause.get("easyKorean") or {}
+    return bool(easy.get("level2") and easy.get("level3") and (clause.get("action") or {}).get("message"))
+
+
+def mark_pending(data: dict) -> dict:
+    """Complete a core report: local action type/priority, detailPending on clauses without detail."""
+    for clause in data.get("clauses", []):
+        clause["action"] = {**core_action(clause.get("deviationScore")), **(clause.get("action") or {})}
+        if has_detail(clause):
+            clause.pop("detailPending", None)
+        else:
+            clause["detailPending"] = True
+    return data
+
+
+def pending_count(data: dict) -> int:
+    return sum(1 for clause in data.get("clauses", []) if clause.get("detailPending"))
+
+
+def find_clause(data: dict, number: str) -> dict | None:
+    wanted = normalize_number(number)
+    return next((c for c in data.get("clauses", []) if normalize_number(c.get("number")) == wanted), None)
+
+
+def prefetch_targets(data: dict, count: int) -> list[dict]:
+    """Pending clauses users are most likely to open first: highest risk amount, then score."""
+    pending = [c for c in data.get("clauses", []) if c.get("detailPending")]
+    pending.sort(key=lambda c: (c.get("riskAmount") or 0, c.get("deviationScore") or 0), reverse=True)
+    return pending[:max(0, count)]
+
+
+def detail_key(clause: dict, template_id: str) -> str:
+    """Content address of one clause's detail: same clause + reference → same detail."""
+    payload = {
+        "v": DETAIL_SCHEMA_VERSION,
+        "template": template_id,
+        "level1": (clause.get("easyKorean") or {}).get("level1", ""),
+        **{k: clause.get(k) for k in _CORE_KEYS},
+    }
+    blob = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def validate_detail(detail) -> bool:
+    if not isinstance(detail, dict):
+        return False
+    easy = detail.get("easyKorean") or {}
+    action = detail.get("action") or {}
+    return bool(easy.get("level2") and easy.get("level3") and action.get("message"))
+
+
+def merge_detail(clause: dict, detail: dict) -> dict:
+    """Full clause (frontend schema) from a core clause and its generated detail."""
+    merged = {k: v for k, v in clause.items() if k != "detailPending"}
+    merged["easyKorean"] = {
+        **(clause.get("easyKorean") or {}),
+        "level2": detail["easyKorean"]["level2"],
+        "level3": detail["easyKorean"]["level3"],
+    }
+    if detail.get("structuredBreakdown"):
+        merged["structuredBreakdown"] = detail["structuredBreakdown"]
+    merged["termGlossary"] = detail.get("termGlossary") or []
+    merged["action"] = {**(clause.get("action") or {}), "message": detail["action"]["message"]}
+    return merged